@@ -1,28 +1,79 @@
 import logging
 
 from src.core.config import settings
-from src.core.logging_config import configure_job_logging
+from src.core.http_client import http_clients
+from src.core.job_concurrency import LIMITER_CTX_KEY, AdaptiveConcurrencyLimiter, limit_concurrency
+from src.core.job_offload import shutdown_job_executors
+from src.core.logging_config import configure_job_logging, stop_log_queue
 from src.core.logging_ctx import JobContextFilter
-from src.core.metrics.worker_metrics import instrument_job, start_metrics_http_server_from_env
+from src.core.loop_lag import EventLoopLagMonitor
+from src.core.metrics.worker_metrics import (
+    instrument_job,
+    start_metrics_http_server_from_env,
+    start_queue_metrics,
+    stop_queue_metrics,
+)
 from src.core.redis_lifecycle import redis_settings
 from src.core.sentry import init_sentry
+from src.database import engine, replica_set
+from src.database.cache import create_repository_cache
 
 
 async def startup(ctx):
     init_sentry(for_fastapi=False)
-    configure_job_logging(logging_level=settings.LOGGING_LEVEL, service_name=settings.SERVICE_NAME)
+    configure_job_logging(
+        logging_level=settings.LOGGING_LEVEL,
+        service_name=settings.SERVICE_NAME,
+        log_queue=settings.log_queue_config(),
+        fast_formatter=settings.LOG_FAST_FORMATTER,
+    )
     for handler in logging.getLogger().handlers:
         handler.addFilter(JobContextFilter())
 
+    ctx["repository_cache"] = create_repository_cache(ctx.get("redis"))
+    ctx["loop_lag_monitor"] = EventLoopLagMonitor.from_settings()
+    ctx["loop_lag_monitor"].start()
+    if replica_set:
+        replica_set.start()
+    await http_clients.start()
+    ctx["http_clients"] = http_clients
+    if settings.JOB_CONCURRENCY_ADAPTIVE:
+        ctx[LIMITER_CTX_KEY] = AdaptiveConcurrencyLimiter.from_settings(saturation=engine.sync_engine.pool.saturation)
+    ctx["queue_metrics_task"] = start_queue_metrics(
+        ctx["redis"], [WorkerSettings.queue_name], interval=settings.JOB_QUEUE_METRICS_INTERVAL
+    )
+
     port = start_metrics_http_server_from_env("WORKER_METRICS_PORT", default_port=settings.WORKER_METRICS_PORT)
     logging.getLogger(__name__).info("Worker metrics exporter on port %s", port if port != -1 else "already started")
 
 
+async def shutdown(ctx):
+    logging.getLogger(__name__).info("ARQ worker shutdown")
+    await stop_queue_metrics(ctx.get("queue_metrics_task"))
+    if ctx.get("loop_lag_monitor"):
+        await ctx["loop_lag_monitor"].stop()
+    await http_clients.aclose()
+    if replica_set:
+        await replica_set.stop()
+    shutdown_job_executors()
+    stop_log_queue()
+
+
 class WorkerSettings:
     queue_name = "worker"
     functions = []
     redis_settings = redis_settings
+    # Время выполнения задачи; ARQ ждёт дольше — ещё JOB_SLOT_WAIT_TIMEOUT на ожидание слота limit_concurrency
+    job_run_timeout = 300
+    job_timeout = job_run_timeout + settings.JOB_SLOT_WAIT_TIMEOUT
+    max_jobs = settings.WORKER_MAX_JOBS
     on_startup = startup
+    on_shutdown = shutdown
 
 
-WorkerSettings.functions = [instrument_job(func) for func in WorkerSettings.functions]
+WorkerSettings.functions = [
+    limit_concurrency(
+        instrument_job(func, timeout=WorkerSettings.job_run_timeout), timeout=WorkerSettings.job_run_timeout
+    )
+    for func in WorkerSettings.functions
+]
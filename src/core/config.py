@@ -7,6 +7,8 @@ from typing import List
 from pydantic import AnyHttpUrl, PostgresDsn
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from src.core.logging_queue import LogQueueConfig, OverflowPolicy
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 ENV_PATH = BASE_DIR.parent / ".env"
 
@@ -17,6 +19,12 @@ class AppEnvironment(str, Enum):
     TESTING = "testing"
 
 
+class PrePingStrategy(str, Enum):
+    ALWAYS = "always"
+    IDLE = "idle"
+    NEVER = "never"
+
+
 class Settings(BaseSettings):
     model_config = SettingsConfigDict(
         env_file=ENV_PATH,
@@ -30,8 +38,58 @@ class Settings(BaseSettings):
     SECRET_KEY: str = "secret_api_key"
 
     DATABASE_URL: PostgresDsn
+    DATABASE_REPLICA_URLS: list[PostgresDsn] = []
+    DATABASE_REPLICA_CHECK_INTERVAL: float = 5.0
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 4
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: PrePingStrategy = PrePingStrategy.ALWAYS
+    DB_POOL_PRE_PING_IDLE_SECONDS: float = 30.0
+    DB_SLOW_QUERY_THRESHOLD: float | None = 0.5
+    DB_QUERY_CACHE_SIZE: int = 500
+    DB_PREPARED_STATEMENT_CACHE_SIZE: int = 100
     REDIS_HOST: str = "redis"
     REDIS_PORT: int = 6379
+    REPOSITORY_CACHE_ENABLED: bool = True
+    REPOSITORY_CACHE_DEFAULT_TTL: int = 60
+    REPOSITORY_CACHE_LOCAL_MAX_SIZE: int = 1024
+    REPOSITORY_CACHE_LOCAL_TTL: float = 5.0
+    RESPONSE_CACHE_ENABLED: bool = True
+    RESPONSE_CACHE_REDIS: bool = True
+    RESPONSE_CACHE_LOCAL_MAX_SIZE: int = 1024
+    RESPONSE_CACHE_LOCAL_TTL: float = 5.0
+    RESPONSE_CACHE_MAX_BODY_BYTES: int = 1048576
+    EXPORT_FLUSH_BYTES: int = 65536
+    EXPORT_FLUSH_INTERVAL: float = 1.0
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+    COMPRESSION_CONTENT_TYPES: list[str] = [
+        "application/json",
+        "application/x-ndjson",
+        "application/problem+json",
+        "application/javascript",
+        "application/xml",
+        "text/",
+        "image/svg+xml",
+    ]
+    COMPRESSION_ENCODINGS: list[str] = ["zstd", "br", "gzip"]
+    COMPRESSION_OFFLOAD_THRESHOLD: int = 262144
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    RATE_LIMIT_ENABLED: bool = False
+    RATE_LIMIT_RATE: float = 50.0
+    RATE_LIMIT_BURST: int = 100
+    RATE_LIMIT_KEY: str = "api_key"
+    RATE_LIMIT_LOCAL_MAX_KEYS: int = 10000
+    RATE_LIMIT_CLIENT_IP_HEADER: str | None = None
+    RATE_LIMIT_TRUST_CLIENT_ADDR: bool = False
+    LOAD_SHED_MAX_IN_FLIGHT: int = 0
+    LOAD_SHED_MAX_LOOP_LAG: float = 0.0
+    LOAD_SHED_RETRY_AFTER: float = 1.0
+    EVENT_LOOP_LAG_INTERVAL: float = 0.25
+    EVENT_LOOP_BLOCKING_THRESHOLD: float = 0.0
     ENABLE_SENTRY: bool = False
     SENTRY_DSN: str | None = None
     SENTRY_API_DSN: str | None = None
@@ -52,9 +110,56 @@ class Settings(BaseSettings):
 
     LOG_REQUEST_BODY: bool = True
     LOG_REQUEST_BODY_MAX_BYTES: int = 10_000
-
+    LOG_REQUEST_BODY_STREAMING: bool = False
+    LOG_REQUEST_BODY_CONTENT_TYPES: list[str] = []
+    LOG_REQUEST_BODY_PATHS: list[str] = []
+
+    LOG_FAST_FORMATTER: bool = True
+    LOG_QUEUE_ENABLED: bool = True
+    LOG_QUEUE_MAX_SIZE: int = 10_000
+    LOG_QUEUE_OVERFLOW_POLICY: OverflowPolicy = OverflowPolicy.DROP
+    LOG_QUEUE_BATCH_SIZE: int = 500
+
+    HTTP_CLIENT_HTTP2: bool = False
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 100
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_CLIENT_TIMEOUT: float = 10.0
+    HTTP_CLIENT_POOL_TIMEOUT: float = 5.0
+    HTTP_CLIENT_RETRY_ATTEMPTS: int = 3
+    HTTP_CLIENT_RETRY_BACKOFF_BASE: float = 0.1
+    HTTP_CLIENT_RETRY_BACKOFF_MAX: float = 2.0
+    HTTP_CLIENT_RETRY_AFTER_MAX: float = 10.0
+    HTTP_CLIENT_BREAKER_FAILURE_THRESHOLD: int = 5
+    HTTP_CLIENT_BREAKER_RESET_TIMEOUT: float = 30.0
+    HTTP_REQUEST_BUDGET: float | None = 30.0
+    HTTP_CLIENT_DEADLINE_ORIGINS: list[str] = []
+    HTTP_CLIENT_COALESCE: bool = True
+    HTTP_CLIENT_COALESCE_HEADERS: list[str] = ["Accept", "Accept-Encoding", "Accept-Language", "Authorization"]
+    HTTP_CLIENT_CACHE_TTL: float = 0.0
+    HTTP_CLIENT_CACHE_MAX_ENTRIES: int = 1024
+
+    HTTP_METRICS_ENABLED: bool = True
+    HTTP_METRICS_PATH: str = "/metrics"
+    HEALTHCHECK_PATH: str = "/healthcheck"
     WORKER_METRICS_PORT: int = 9100
     SCHEDULER_METRICS_PORT: int = 9101
+    JOB_QUEUE_METRICS_INTERVAL: float = 5.0
+
+    WORKER_MAX_JOBS: int = 10
+    JOB_CONCURRENCY_ADAPTIVE: bool = True
+    JOB_CONCURRENCY_INITIAL: int = 4
+    JOB_CONCURRENCY_MIN: int = 1
+    JOB_CONCURRENCY_WINDOW: int = 20
+    JOB_CONCURRENCY_LATENCY_TOLERANCE: float = 2.0
+    JOB_CONCURRENCY_ERROR_RATE_THRESHOLD: float = 0.25
+    JOB_CONCURRENCY_DB_SATURATION_THRESHOLD: float = 0.9
+    JOB_SLOT_WAIT_TIMEOUT: float = 300.0
+
+    JOB_DEDUP_TTL: int = 300
+    JOB_PROCESS_POOL_SIZE: int = 0
+    JOB_PROCESS_START_METHOD: str = "spawn"
+    JOB_THREAD_POOL_SIZE: int = 0
 
     def is_dev(self) -> bool:
         return self.FASTAPI_ENV == AppEnvironment.DEV
@@ -62,5 +167,14 @@ class Settings(BaseSettings):
     def is_prod(self) -> bool:
         return self.FASTAPI_ENV == AppEnvironment.PRODUCTION
 
+    def log_queue_config(self) -> LogQueueConfig | None:
+        if not self.LOG_QUEUE_ENABLED:
+            return None
+        return LogQueueConfig(
+            max_size=self.LOG_QUEUE_MAX_SIZE,
+            overflow_policy=self.LOG_QUEUE_OVERFLOW_POLICY,
+            batch_size=self.LOG_QUEUE_BATCH_SIZE,
+        )
+
 
 settings = Settings()
@@ -4,3 +4,13 @@ from fastapi import HTTPException
 class NotFoundException(HTTPException):
     def __init__(self, detail: str = "Not found"):
         super().__init__(status_code=404, detail=detail)
+
+
+class InvalidCursorException(HTTPException):
+    def __init__(self, detail: str = "Invalid cursor"):
+        super().__init__(status_code=400, detail=detail)
+
+
+class InvalidPageSizeException(HTTPException):
+    def __init__(self, detail: str = "Page size must be at least 1"):
+        super().__init__(status_code=422, detail=detail)
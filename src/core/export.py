@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import csv
+import io
+import time
+from collections.abc import AsyncIterable, AsyncIterator, Callable, Mapping, Sequence
+from contextlib import aclosing, asynccontextmanager
+from datetime import date, datetime
+from datetime import time as dt_time
+from enum import Enum
+from typing import Any
+
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.responses import StreamingResponse
+
+from src.core.config import settings
+from src.core.responses import render_json
+
+RowSource = AsyncIterable[Any] | Callable[[AsyncSession], AsyncIterable[Any]]
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+_MEDIA_TYPES = {
+    ExportFormat.NDJSON: "application/x-ndjson",
+    ExportFormat.CSV: "text/csv; charset=utf-8",
+}
+
+
+def export_response(
+    rows: RowSource,
+    *,
+    format: ExportFormat | str = ExportFormat.NDJSON,
+    columns: Sequence[str] | None = None,
+    filename: str | None = None,
+    session_factory: Callable[[], AsyncSession] | None = None,
+    flush_bytes: int | None = None,
+    flush_interval: float | None = None,
+) -> StreamingResponse:
+    """
+    Потоковая выгрузка строк (ORM-объекты или mappings из BaseRepository.stream_all) в NDJSON или CSV.
+
+    rows — готовый async-итератор или функция session -> итератор: тогда сессия открывается внутри
+    потока и закрывается по его окончании, а не при выходе из зависимости get_db до отправки тела.
+    Буфер отправляется по flush_bytes байт или раз в flush_interval секунд; следующая пачка строк
+    читается из курсора только после того, как клиент принял предыдущую.
+    """
+    export_format = ExportFormat(format)
+    chunks = _encode(
+        _open_rows(rows, session_factory),
+        export_format,
+        columns,
+        flush_bytes=flush_bytes or settings.EXPORT_FLUSH_BYTES,
+        flush_interval=flush_interval if flush_interval is not None else settings.EXPORT_FLUSH_INTERVAL,
+    )
+    headers = {}
+    if filename:
+        headers["Content-Disposition"] = f'attachment; filename="{filename}.{export_format.value}"'
+    return StreamingResponse(chunks, media_type=_MEDIA_TYPES[export_format], headers=headers)
+
+
+async def _open_rows(rows: RowSource, session_factory: Callable[[], AsyncSession] | None) -> AsyncIterator[Any]:
+    async with _session(rows, session_factory) as session:
+        source = rows(session) if session is not None else rows
+        iterator = source.__aiter__()
+        try:
+            async for row in iterator:
+                yield row
+        finally:
+            # Отключение клиента: закрыть серверный курсор сразу, а не при сборке мусора
+            if hasattr(iterator, "aclose"):
+                await iterator.aclose()
+
+
+@asynccontextmanager
+async def _session(rows: RowSource, session_factory: Callable[[], AsyncSession] | None):
+    if not callable(rows):
+        yield None
+        return
+    if session_factory is None:
+        # Отложенный импорт: создание движка не нужно модулям, которые выгрузку не используют
+        from src.database import async_session as session_factory
+    async with session_factory() as session:
+        yield session
+
+
+async def _encode(
+    rows: AsyncIterator[Any],
+    export_format: ExportFormat,
+    columns: Sequence[str] | None,
+    *,
+    flush_bytes: int,
+    flush_interval: float,
+) -> AsyncIterator[bytes]:
+    buffer = io.StringIO() if export_format is ExportFormat.CSV else None
+    writer = csv.writer(buffer) if buffer is not None else None
+    parts: list[bytes] = []
+    size = 0
+    # Первая строка уходит сразу, чтобы клиент получил ответ, не дожидаясь полного буфера
+    last_flush = 0.0
+
+    async with aclosing(rows):
+        async for row in rows:
+            if columns is None:
+                columns = _columns(row)
+                if writer is not None:
+                    writer.writerow(columns)
+            values = [_value(row, column) for column in columns]
+
+            if writer is not None:
+                writer.writerow([_csv_value(value) for value in values])
+                size = buffer.tell()
+            else:
+                parts.append(render_json(dict(zip(columns, values, strict=True))) + b"\n")
+                size += len(parts[-1])
+
+            now = time.monotonic()
+            if size >= flush_bytes or now - last_flush >= flush_interval:
+                yield _drain(buffer, parts)
+                size = 0
+                last_flush = now
+
+    chunk = _drain(buffer, parts)
+    if chunk:
+        yield chunk
+
+
+def _drain(buffer: io.StringIO | None, parts: list[bytes]) -> bytes:
+    if buffer is not None:
+        chunk = buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+    chunk = b"".join(parts)
+    parts.clear()
+    return chunk
+
+
+def _columns(row: Any) -> list[str]:
+    if isinstance(row, Mapping):
+        return list(row.keys())
+    return [attr.key for attr in sa_inspect(type(row)).column_attrs]
+
+
+def _value(row: Any, column: str) -> Any:
+    if isinstance(row, Mapping):
+        return row[column]
+    return getattr(row, column)
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (datetime, date, dt_time)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
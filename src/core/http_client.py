@@ -1,13 +1,33 @@
 from __future__ import annotations
 
+import importlib.util
+import logging
+import time
 from functools import partial
-from typing import Any, Mapping
+from typing import Any, Iterable, Mapping
 
 import httpx
 
+from src.core.config import settings
+from src.core.http_coalescing import DEFAULT_KEY_HEADERS, CoalescingTransport
+from src.core.http_resilience import CircuitBreakerRegistry, ResilientTransport, RetryPolicy, origin_of
 from src.core.logging_ctx import get_job_id
+from src.core.metrics.http_client_metrics import (
+    HTTP_CLIENT_CONNECTIONS,
+    HTTP_CLIENT_CONNECTIONS_OPENED_TOTAL,
+    HTTP_CLIENT_POOL_WAIT_SECONDS,
+)
 from src.core.trace import REQUEST_UUID_HEADER, SERVER_UUID_HEADER, get_request_uuid, get_server_uuid
 
+logger = logging.getLogger(__name__)
+
+# Первое событие после получения соединения из пула: новое TCP-соединение или запрос в уже открытое
+_CONNECTION_ACQUIRED_EVENTS = (
+    "connection.connect_tcp.started",
+    "http11.send_request_headers.started",
+    "http2.send_request_headers.started",
+)
+
 
 def inject_trace_headers(
     headers: Mapping[str, str] | None = None,
@@ -61,3 +81,170 @@ def create_traced_async_client(
     event_hooks["request"] = request_hooks
 
     return httpx.AsyncClient(event_hooks=event_hooks, **kwargs)
+
+
+class InstrumentedAsyncHTTPTransport(httpx.AsyncHTTPTransport):
+    """
+    AsyncHTTPTransport, публикующий занятость пула соединений и время ожидания соединения.
+    Метрики помечаются именем клиента (пула), а не хостом запроса: у общего клиента без base_url
+    в одном пуле соединения к разным origin, а число хостов не ограничено.
+    """
+
+    def __init__(self, *args: Any, name: str = "default", **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.name = name
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        start = time.perf_counter()
+        acquired = False
+        parent_trace = request.extensions.get("trace")
+
+        async def trace(event_name: str, info: dict[str, Any]) -> None:
+            nonlocal acquired
+            if not acquired and event_name in _CONNECTION_ACQUIRED_EVENTS:
+                acquired = True
+                if HTTP_CLIENT_POOL_WAIT_SECONDS:
+                    HTTP_CLIENT_POOL_WAIT_SECONDS.labels(client=self.name).observe(time.perf_counter() - start)
+            if event_name == "connection.connect_tcp.complete" and HTTP_CLIENT_CONNECTIONS_OPENED_TOTAL:
+                HTTP_CLIENT_CONNECTIONS_OPENED_TOTAL.labels(client=self.name).inc()
+            if parent_trace is not None:
+                await parent_trace(event_name, info)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        try:
+            response = await super().handle_async_request(request)
+        except BaseException:
+            self.publish_usage()
+            raise
+        self.publish_usage()
+        response.stream = _UsagePublishingStream(response.stream, self.publish_usage)
+        return response
+
+    def publish_usage(self) -> None:
+        if not HTTP_CLIENT_CONNECTIONS:
+            return
+        connections = list(getattr(self._pool, "connections", ()))
+        active = sum(1 for connection in connections if not connection.is_idle())
+        HTTP_CLIENT_CONNECTIONS.labels(client=self.name, state="active").set(active)
+        HTTP_CLIENT_CONNECTIONS.labels(client=self.name, state="idle").set(len(connections) - active)
+
+
+class _UsagePublishingStream(httpx.AsyncByteStream):
+    # Соединение возвращается в пул только после чтения тела ответа
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Any) -> None:
+        self._stream = stream
+        self._on_close = on_close
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            self._on_close()
+
+
+class HttpClientRegistry:
+    """
+    Общие для процесса traced-клиенты httpx: по одному на origin (scheme://host:port) со своим пулом
+    соединений, чтобы медленный upstream не занимал соединения остальных. Клиент без base_url — для
+    произвольных URL. Открывается в lifespan / startup ARQ и закрывается при остановке.
+    """
+
+    def __init__(
+        self,
+        *,
+        http2: bool = False,
+        limits: httpx.Limits | None = None,
+        timeout: httpx.Timeout | None = None,
+        retry_policy: RetryPolicy | None = None,
+        breakers: CircuitBreakerRegistry | None = None,
+        deadline_origins: Iterable[str] = (),
+        coalesce: bool = False,
+        coalesce_headers: Iterable[str] = DEFAULT_KEY_HEADERS,
+        cache_ttl: float = 0.0,
+        cache_max_entries: int = 1024,
+        **client_kwargs: Any,
+    ) -> None:
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 requested but h2 is not installed (pip install 'httpx[http2]'); using HTTP/1.1")
+            http2 = False
+        self.http2 = http2
+        self.limits = limits or httpx.Limits()
+        self.timeout = timeout or httpx.Timeout(10.0)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breakers = breakers or CircuitBreakerRegistry()
+        self.deadline_origins = tuple(deadline_origins)
+        self.coalesce = coalesce
+        self.coalesce_headers = tuple(coalesce_headers)
+        self.cache_ttl = cache_ttl
+        self.cache_max_entries = cache_max_entries
+        self.client_kwargs = client_kwargs
+        self._clients: dict[str, httpx.AsyncClient] = {}
+
+    @classmethod
+    def from_settings(cls, **client_kwargs: Any) -> HttpClientRegistry:
+        return cls(
+            http2=settings.HTTP_CLIENT_HTTP2,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(settings.HTTP_CLIENT_TIMEOUT, pool=settings.HTTP_CLIENT_POOL_TIMEOUT),
+            retry_policy=RetryPolicy.from_settings(),
+            breakers=CircuitBreakerRegistry.from_settings(),
+            deadline_origins=settings.HTTP_CLIENT_DEADLINE_ORIGINS,
+            coalesce=settings.HTTP_CLIENT_COALESCE,
+            coalesce_headers=settings.HTTP_CLIENT_COALESCE_HEADERS,
+            cache_ttl=settings.HTTP_CLIENT_CACHE_TTL,
+            cache_max_entries=settings.HTTP_CLIENT_CACHE_MAX_ENTRIES,
+            **client_kwargs,
+        )
+
+    def get(self, base_url: str | httpx.URL | None = None) -> httpx.AsyncClient:
+        origin = origin_of(base_url) if base_url else ""
+        client = self._clients.get(origin)
+        if client is None or client.is_closed:
+            client = self._clients[origin] = self._create_client(origin)
+        return client
+
+    async def start(self) -> None:
+        self.get()
+
+    async def aclose(self) -> None:
+        clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            try:
+                await client.aclose()
+            except Exception:
+                logger.warning("Failed to close HTTP client", exc_info=True)
+
+    def _create_client(self, origin: str) -> httpx.AsyncClient:
+        kwargs = dict(self.client_kwargs)
+        if origin:
+            kwargs["base_url"] = origin
+        transport: httpx.AsyncBaseTransport = ResilientTransport(
+            InstrumentedAsyncHTTPTransport(http2=self.http2, limits=self.limits, name=origin or "default"),
+            retry_policy=self.retry_policy,
+            breakers=self.breakers,
+            deadline_origins=self.deadline_origins,
+        )
+        if self.coalesce:
+            # Снаружи повторов: одна цепочка попыток на всех ожидающих
+            transport = CoalescingTransport(
+                transport,
+                key_headers=self.coalesce_headers,
+                cache_ttl=self.cache_ttl,
+                cache_max_entries=self.cache_max_entries,
+            )
+        return create_traced_async_client(transport=transport, timeout=self.timeout, **kwargs)
+
+
+http_clients = HttpClientRegistry.from_settings()
+
+
+def get_http_client(base_url: str | httpx.URL | None = None) -> httpx.AsyncClient:
+    return http_clients.get(base_url)
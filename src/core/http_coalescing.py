@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Iterable
+from dataclasses import dataclass, field, replace
+from typing import Any
+
+import httpx
+
+from src.core.http_resilience import DeadlineExceeded, deadline_ctx, remaining_budget
+from src.core.metrics.http_client_metrics import HTTP_CLIENT_COALESCED_TOTAL, HTTP_CLIENT_DEADLINE_EXCEEDED_TOTAL
+from src.core.trace import REQUEST_UUID_HEADER
+
+logger = logging.getLogger(__name__)
+
+COALESCED_METHODS = frozenset({"GET", "HEAD"})
+DEFAULT_KEY_HEADERS = ("Accept", "Accept-Encoding", "Accept-Language", "Authorization")
+
+# Запросы с этими заголовками вызывающий кэширует/докачивает сам — их не объединяем
+_BYPASS_HEADERS = ("If-None-Match", "If-Modified-Since", "Range")
+# Учётные данные вызывающего: если заголовок не входит в ключ, ответ нельзя отдавать другим
+CREDENTIAL_HEADERS = ("authorization", "proxy-authorization", "cookie", "x-api-key")
+# Служебные расширения httpcore ответа не переносятся в копии для других запросов
+_SHARED_EXTENSIONS = ("http_version", "reason_phrase")
+
+
+@dataclass
+class _SharedResponse:
+    status_code: int
+    headers: list[tuple[bytes, bytes]]
+    content: bytes
+    extensions: dict[str, Any]
+    request_uuid: str | None = None
+    expires_at: float = 0.0
+    validators: dict[str, str] = field(default_factory=dict)
+
+    def to_response(self) -> httpx.Response:
+        return httpx.Response(
+            self.status_code, headers=self.headers, content=self.content, extensions=dict(self.extensions)
+        )
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+
+class CoalescingTransport(httpx.AsyncBaseTransport):
+    """
+    Объединяет одновременные одинаковые GET/HEAD (метод, URL и заголовки key_headers) в один
+    запрос к upstream: остальные получают копию того же ответа. Уходит запрос первого вызывающего
+    вместе с его X-Request-UUID. Ответы буферизуются целиком; отключить для запроса —
+    extensions={"coalesce": False}. Запросы с учётными данными (CREDENTIAL_HEADERS), которых нет
+    в key_headers, не объединяются и не кэшируются. Общий запрос идёт без дедлайна первого
+    вызывающего: каждый ожидающий ждёт его в пределах своего бюджета (deadline_ctx).
+
+    При cache_ttl > 0 ответы 200 хранятся до cache_ttl секунд с учётом Cache-Control (no-store,
+    private, no-cache, max-age) и Vary, устаревшие с ETag/Last-Modified перепроверяются условным
+    запросом (304 продлевает запись).
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        *,
+        key_headers: Iterable[str] = DEFAULT_KEY_HEADERS,
+        cache_ttl: float = 0.0,
+        cache_max_entries: int = 1024,
+    ) -> None:
+        self.transport = transport
+        self.key_headers = tuple(header.lower() for header in key_headers)
+        self.cache_ttl = cache_ttl
+        self.cache_max_entries = cache_max_entries
+        self._inflight: dict[tuple[str, ...], asyncio.Future[_SharedResponse]] = {}
+        self._cache: OrderedDict[tuple[str, ...], _SharedResponse] = OrderedDict()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if not self._coalescible(request):
+            return await self.transport.handle_async_request(request)
+
+        key = self._key(request)
+        host = request.url.host
+        cached = self._cache.get(key)
+        if cached is not None and cached.fresh:
+            self._cache.move_to_end(key)
+            _count(host, "cache_hit")
+            return cached.to_response()
+
+        remaining = remaining_budget()
+        if remaining is not None and remaining <= 0:
+            _count_deadline_exceeded(host)
+            raise DeadlineExceeded(f"Deadline exceeded before calling {host}", request=request)
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._inflight[key] = asyncio.ensure_future(self._fetch(key, request, cached))
+            task.add_done_callback(lambda done: self._forget(key, done))
+            _count(host, "leader")
+        else:
+            _count(host, "shared")
+        # Отмена одного из ожидающих не должна отменять общий запрос остальных
+        try:
+            shared = await asyncio.wait_for(asyncio.shield(task), remaining)
+        except TimeoutError:
+            _count_deadline_exceeded(host)
+            raise DeadlineExceeded(f"Deadline exceeded waiting for {host}", request=request) from None
+        if shared.request_uuid and shared.request_uuid != request.headers.get(REQUEST_UUID_HEADER):
+            logger.debug("%s %s served by in-flight request %s", request.method, request.url, shared.request_uuid)
+        return shared.to_response()
+
+    async def aclose(self) -> None:
+        self._cache.clear()
+        await self.transport.aclose()
+
+    def _coalescible(self, request: httpx.Request) -> bool:
+        if request.method not in COALESCED_METHODS or request.extensions.get("coalesce") is False:
+            return False
+        if any(header in request.headers for header in _BYPASS_HEADERS):
+            return False
+        if any(header in request.headers for header in CREDENTIAL_HEADERS if header not in self.key_headers):
+            return False
+        directives = _cache_control(request.headers)
+        return "no-cache" not in directives and "no-store" not in directives
+
+    def _key(self, request: httpx.Request) -> tuple[str, ...]:
+        return (
+            request.method,
+            str(request.url),
+            *(request.headers.get(header, "") for header in self.key_headers),
+        )
+
+    def _forget(self, key: tuple[str, ...], task: asyncio.Future[_SharedResponse]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Ошибку уже получили ожидающие; без них не логировать "exception was never retrieved"
+            task.exception()
+
+    async def _fetch(
+        self, key: tuple[str, ...], request: httpx.Request, cached: _SharedResponse | None
+    ) -> _SharedResponse:
+        # Задача унаследовала контекст первого вызывающего: его дедлайн не должен ограничивать остальных
+        deadline_ctx.set(None)
+        if cached is not None:
+            request.headers.update(cached.validators)
+
+        response = await self.transport.handle_async_request(request)
+        try:
+            content = b"".join([chunk async for chunk in response.stream])
+        finally:
+            await response.aclose()
+
+        if cached is not None and response.status_code == 304:
+            headers = _merge_headers(cached.headers, response.headers)
+            shared = replace(cached, headers=headers, request_uuid=request.headers.get(REQUEST_UUID_HEADER))
+            self._store(key, shared, httpx.Headers(headers))
+            _count(request.url.host, "revalidated")
+            return shared
+
+        shared = _SharedResponse(
+            status_code=response.status_code,
+            headers=response.headers.raw,
+            content=content,
+            extensions={name: response.extensions[name] for name in _SHARED_EXTENSIONS if name in response.extensions},
+            request_uuid=request.headers.get(REQUEST_UUID_HEADER),
+        )
+        if response.status_code == 200:
+            self._store(key, shared, response.headers)
+        else:
+            self._cache.pop(key, None)
+        return shared
+
+    def _store(self, key: tuple[str, ...], shared: _SharedResponse, headers: httpx.Headers) -> None:
+        lifetime = self._lifetime(headers)
+        validators = _validators(headers)
+        if lifetime is None or (lifetime <= 0 and not validators):
+            self._cache.pop(key, None)
+            return
+        shared.expires_at = time.monotonic() + lifetime
+        shared.validators = validators
+        self._cache[key] = shared
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_max_entries:
+            self._cache.popitem(last=False)
+
+    def _lifetime(self, headers: httpx.Headers) -> float | None:
+        """Сколько секунд ответ свежий; None — не хранить."""
+        if self.cache_ttl <= 0:
+            return None
+        directives = _cache_control(headers)
+        if "no-store" in directives or "private" in directives:
+            return None
+        vary = {value.strip().lower() for value in headers.get("Vary", "").split(",") if value.strip()}
+        if "*" in vary or not vary <= set(self.key_headers):
+            return None
+        if "no-cache" in directives:
+            return 0.0
+        for name in ("s-maxage", "max-age"):
+            if name in directives:
+                try:
+                    return min(self.cache_ttl, max(float(directives[name] or 0), 0.0))
+                except ValueError:
+                    return 0.0
+        return self.cache_ttl
+
+
+def _cache_control(headers: httpx.Headers) -> dict[str, str | None]:
+    directives: dict[str, str | None] = {}
+    for item in ",".join(headers.get_list("Cache-Control")).split(","):
+        name, _, value = item.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip('"') if value else None
+    return directives
+
+
+def _validators(headers: httpx.Headers) -> dict[str, str]:
+    validators = {}
+    if "ETag" in headers:
+        validators["If-None-Match"] = headers["ETag"]
+    if "Last-Modified" in headers:
+        validators["If-Modified-Since"] = headers["Last-Modified"]
+    return validators
+
+
+def _merge_headers(stored: list[tuple[bytes, bytes]], updated: httpx.Headers) -> list[tuple[bytes, bytes]]:
+    # Заголовки 304 заменяют сохранённые одноимённые (RFC 9111, 4.3.4); длина тела остаётся прежней
+    replaced = {name for name in updated if name not in ("content-length", "transfer-encoding")}
+    merged = [(name, value) for name, value in stored if name.decode("latin-1").lower() not in replaced]
+    merged.extend((name, value) for name, value in updated.raw if name.decode("latin-1").lower() in replaced)
+    return merged
+
+
+def _count(host: str, result: str) -> None:
+    if HTTP_CLIENT_COALESCED_TOTAL:
+        HTTP_CLIENT_COALESCED_TOTAL.labels(host=host, result=result).inc()
+
+
+def _count_deadline_exceeded(host: str) -> None:
+    if HTTP_CLIENT_DEADLINE_EXCEEDED_TOTAL:
+        HTTP_CLIENT_DEADLINE_EXCEEDED_TOTAL.labels(host=host).inc()
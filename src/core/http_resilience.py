@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import Any
+
+import httpx
+
+from src.core.config import settings
+from src.core.metrics.http_client_metrics import (
+    HTTP_CLIENT_CIRCUIT_STATE,
+    HTTP_CLIENT_DEADLINE_EXCEEDED_TOTAL,
+    HTTP_CLIENT_RETRIES_TOTAL,
+    HTTP_CLIENT_SHORT_CIRCUITED_TOTAL,
+)
+
+REQUEST_TIMEOUT_HEADER = "X-Request-Timeout"
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE", "TRACE"})
+RETRYABLE_STATUS_CODES = frozenset({429, 502, 503, 504})
+
+deadline_ctx: ContextVar[float | None] = ContextVar("request_deadline", default=None)
+
+
+class DeadlineExceeded(httpx.TimeoutException):
+    pass
+
+
+class CircuitOpenError(httpx.TransportError):
+    pass
+
+
+@contextmanager
+def deadline_scope(seconds: float | None) -> Iterator[None]:
+    """Ограничивает все исходящие вызовы внутри блока общим бюджетом времени (не расширяя внешний)."""
+    if seconds is None:
+        yield
+        return
+    deadline = time.monotonic() + seconds
+    current = deadline_ctx.get()
+    token = deadline_ctx.set(deadline if current is None else min(current, deadline))
+    try:
+        yield
+    finally:
+        deadline_ctx.reset(token)
+
+
+def remaining_budget() -> float | None:
+    deadline = deadline_ctx.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    attempts: int = 3
+    backoff_base: float = 0.1
+    backoff_max: float = 2.0
+    # Retry-After длиннее не ждём: у задач ARQ нет дедлайна, который ограничил бы ожидание
+    retry_after_max: float = 10.0
+
+    @classmethod
+    def from_settings(cls) -> RetryPolicy:
+        return cls(
+            attempts=settings.HTTP_CLIENT_RETRY_ATTEMPTS,
+            backoff_base=settings.HTTP_CLIENT_RETRY_BACKOFF_BASE,
+            backoff_max=settings.HTTP_CLIENT_RETRY_BACKOFF_MAX,
+            retry_after_max=settings.HTTP_CLIENT_RETRY_AFTER_MAX,
+        )
+
+    def backoff(self, attempt: int) -> float:
+        # Full jitter: равномерно от 0 до экспоненциального потолка
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+
+class CircuitState(int, Enum):
+    CLOSED = 0
+    HALF_OPEN = 1
+    OPEN = 2
+
+
+class CircuitBreaker:
+    """
+    Размыкается после failure_threshold ошибок подряд и reset_timeout секунд отклоняет вызовы
+    без обращения к upstream; затем пропускает один пробный вызов (half-open).
+    """
+
+    def __init__(self, host: str, *, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    def allow(self) -> bool:
+        if self.state is CircuitState.OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._set_state(CircuitState.HALF_OPEN)
+        if self.state is CircuitState.HALF_OPEN:
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def release_probe(self) -> None:
+        # Пробный вызов завершился без исхода (отмена, чужое исключение): следующий вызов пробует снова
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._probe_in_flight = False
+        if self.state is not CircuitState.CLOSED:
+            self._set_state(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        self._probe_in_flight = False
+        if self.state is CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+            self._set_state(CircuitState.OPEN)
+
+    def _set_state(self, state: CircuitState) -> None:
+        self.state = state
+        if HTTP_CLIENT_CIRCUIT_STATE:
+            HTTP_CLIENT_CIRCUIT_STATE.labels(host=self.host).set(state.value)
+
+
+class CircuitBreakerRegistry:
+    def __init__(self, *, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._breakers: dict[str, CircuitBreaker] = {}
+
+    @classmethod
+    def from_settings(cls) -> CircuitBreakerRegistry:
+        return cls(
+            failure_threshold=settings.HTTP_CLIENT_BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.HTTP_CLIENT_BREAKER_RESET_TIMEOUT,
+        )
+
+    def get(self, host: str) -> CircuitBreaker:
+        breaker = self._breakers.get(host)
+        if breaker is None:
+            breaker = self._breakers[host] = CircuitBreaker(
+                host, failure_threshold=self.failure_threshold, reset_timeout=self.reset_timeout
+            )
+        return breaker
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """
+    Обёртка транспорта httpx: бюджет времени из deadline_ctx (таймауты попытки, а для origin из
+    deadline_origins ещё и заголовок X-Request-Timeout), повторы с jitter только для идемпотентных
+    запросов (или с заголовком Idempotency-Key) и circuit breaker на хост.
+    """
+
+    def __init__(
+        self,
+        transport: httpx.AsyncBaseTransport,
+        *,
+        retry_policy: RetryPolicy | None = None,
+        breakers: CircuitBreakerRegistry | None = None,
+        deadline_origins: Iterable[str] = (),
+    ) -> None:
+        self.transport = transport
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.breakers = breakers
+        # Сторонним сервисам остаток бюджета не раскрываем: заголовок только для своих upstream
+        self.deadline_origins = frozenset(origin_of(origin) for origin in deadline_origins)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        breaker = self.breakers.get(host) if self.breakers else None
+        retryable = _is_retryable(request)
+        attempts = self.retry_policy.attempts if retryable else 1
+
+        attempt = 0
+        while True:
+            remaining = remaining_budget()
+            if remaining is not None and remaining <= 0:
+                if HTTP_CLIENT_DEADLINE_EXCEEDED_TOTAL:
+                    HTTP_CLIENT_DEADLINE_EXCEEDED_TOTAL.labels(host=host).inc()
+                raise DeadlineExceeded(f"Deadline exceeded before calling {host}", request=request)
+            if breaker is not None and not breaker.allow():
+                if HTTP_CLIENT_SHORT_CIRCUITED_TOTAL:
+                    HTTP_CLIENT_SHORT_CIRCUITED_TOTAL.labels(host=host).inc()
+                raise CircuitOpenError(f"Circuit breaker for {host} is open", request=request)
+            if remaining is not None:
+                _apply_budget(request, remaining, propagate=origin_of(request.url) in self.deadline_origins)
+
+            attempt += 1
+            try:
+                response = await self._send(request, breaker)
+            except httpx.TransportError as exc:
+                if breaker is not None:
+                    breaker.record_failure()
+                delay = self._retry_delay(attempt, attempts, None)
+                if delay is None:
+                    raise
+                _count_retry(host, type(exc).__name__)
+            else:
+                failed = response.status_code >= 500
+                if breaker is not None and failed:
+                    breaker.record_failure()
+                elif breaker is not None:
+                    breaker.record_success()
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    return response
+                delay = self._retry_delay(attempt, attempts, response)
+                if delay is None:
+                    return response
+                await response.aclose()
+                _count_retry(host, str(response.status_code))
+            await asyncio.sleep(delay)
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+    async def _send(self, request: httpx.Request, breaker: CircuitBreaker | None) -> httpx.Response:
+        try:
+            return await self.transport.handle_async_request(request)
+        finally:
+            # При отмене (дедлайн, таймаут) или не транспортной ошибке исход не записывается —
+            # без этого half-open breaker ждал бы завершения пробы вечно
+            if breaker is not None:
+                breaker.release_probe()
+
+    def _retry_delay(self, attempt: int, attempts: int, response: httpx.Response | None) -> float | None:
+        if attempt >= attempts:
+            return None
+        delay = self.retry_policy.backoff(attempt - 1)
+        retry_after = _retry_after(response) if response is not None else None
+        if retry_after is not None:
+            delay = min(retry_after, self.retry_policy.retry_after_max)
+        remaining = remaining_budget()
+        if remaining is not None and delay >= remaining:
+            return None
+        return delay
+
+
+def _is_retryable(request: httpx.Request) -> bool:
+    if request.method not in IDEMPOTENT_METHODS and "Idempotency-Key" not in request.headers:
+        return False
+    # Потоковое тело нельзя отправить второй раз
+    return isinstance(request.stream, httpx.ByteStream)
+
+
+def _apply_budget(request: httpx.Request, remaining: float, *, propagate: bool) -> None:
+    timeout = dict(request.extensions.get("timeout") or {})
+    for key in ("connect", "read", "write", "pool"):
+        value = timeout.get(key)
+        timeout[key] = remaining if value is None else min(value, remaining)
+    request.extensions = {**request.extensions, "timeout": timeout}
+    if propagate:
+        request.headers[REQUEST_TIMEOUT_HEADER] = f"{remaining:.3f}"
+
+
+def origin_of(url: str | httpx.URL) -> str:
+    url = httpx.URL(url)
+    port = f":{url.port}" if url.port else ""
+    return f"{url.scheme}://{url.host}{port}"
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _count_retry(host: str, reason: str) -> None:
+    if HTTP_CLIENT_RETRIES_TOTAL:
+        HTTP_CLIENT_RETRIES_TOTAL.labels(host=host, reason=reason).inc()
+
+
+def parse_request_timeout(value: str | None) -> float | None:
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        return None
+    return seconds if seconds > 0 else None
+
+
+def inbound_budget(headers: Any, default: float | None) -> float | None:
+    incoming = parse_request_timeout(headers.get(REQUEST_TIMEOUT_HEADER))
+    if incoming is None:
+        return default
+    return incoming if default is None else min(incoming, default)
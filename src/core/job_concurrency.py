@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import asyncio
+import itertools
+import logging
+import math
+import time
+from collections.abc import Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import IntEnum
+from functools import wraps
+from typing import Any, AsyncIterator, TypeVar
+
+from src.core.config import settings
+from src.core.metrics.worker_metrics import JOB_CONCURRENCY_LIMIT, JOB_CONCURRENCY_WAITING
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=Callable[..., Awaitable[Any]])
+
+LIMITER_CTX_KEY = "concurrency_limiter"
+
+
+class Priority(IntEnum):
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    sequence: int
+    job_name: str = field(compare=False)
+    max_concurrency: int | None = field(compare=False)
+    future: asyncio.Future = field(compare=False)
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Ограничивает число одновременно выполняемых задач воркера и подстраивает лимит (AIMD):
+    раз в window завершений лимит уменьшается в decrease_factor раз, если задачи замедлились
+    относительно своего базового времени больше чем в latency_tolerance раз, доля ошибок выше
+    error_rate_threshold или пул БД занят больше чем на saturation_threshold; иначе, если задачи
+    ждали свободного слота, лимит растёт на 1.
+
+    Ожидающие задачи получают слот по приоритету, затем по порядку прихода; max_concurrency
+    ограничивает задачи одного типа независимо от общего лимита. Приоритет упорядочивает только
+    задачи, которые ARQ уже забрал из очереди (не больше max_jobs): очередь Redis он читает по порядку.
+    """
+
+    def __init__(
+        self,
+        *,
+        initial_limit: int = 4,
+        min_limit: int = 1,
+        max_limit: int = 10,
+        window: int = 20,
+        latency_tolerance: float = 2.0,
+        error_rate_threshold: float = 0.25,
+        saturation_threshold: float = 0.9,
+        decrease_factor: float = 0.75,
+        saturation: Callable[[], float] | None = None,
+    ) -> None:
+        self.min_limit = max(min_limit, 1)
+        self.max_limit = max(max_limit, self.min_limit)
+        self.limit = min(max(initial_limit, self.min_limit), self.max_limit)
+        self.window = window
+        self.latency_tolerance = latency_tolerance
+        self.error_rate_threshold = error_rate_threshold
+        self.saturation_threshold = saturation_threshold
+        self.decrease_factor = decrease_factor
+        self.saturation = saturation
+
+        self.in_flight = 0
+        self._running: dict[str, int] = {}
+        self._waiters: list[_Waiter] = []
+        self._sequence = itertools.count()
+        self._baselines: dict[str, float] = {}
+        self._completed = 0
+        self._errors = 0
+        self._latency_ratio_sum = 0.0
+        self._contended = False
+        self._publish()
+
+    @classmethod
+    def from_settings(cls, *, saturation: Callable[[], float] | None = None) -> AdaptiveConcurrencyLimiter:
+        return cls(
+            initial_limit=settings.JOB_CONCURRENCY_INITIAL,
+            min_limit=settings.JOB_CONCURRENCY_MIN,
+            max_limit=settings.WORKER_MAX_JOBS,
+            window=settings.JOB_CONCURRENCY_WINDOW,
+            latency_tolerance=settings.JOB_CONCURRENCY_LATENCY_TOLERANCE,
+            error_rate_threshold=settings.JOB_CONCURRENCY_ERROR_RATE_THRESHOLD,
+            saturation_threshold=settings.JOB_CONCURRENCY_DB_SATURATION_THRESHOLD,
+            saturation=saturation,
+        )
+
+    @asynccontextmanager
+    async def slot(
+        self, job_name: str, *, priority: Priority = Priority.NORMAL, max_concurrency: int | None = None
+    ) -> AsyncIterator[None]:
+        await self.acquire(job_name, priority=priority, max_concurrency=max_concurrency)
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            # Включая отмену по job_timeout
+            failed = True
+            raise
+        finally:
+            self.release(job_name, time.perf_counter() - start, failed=failed)
+
+    async def acquire(
+        self, job_name: str, *, priority: Priority = Priority.NORMAL, max_concurrency: int | None = None
+    ) -> None:
+        if not self._waiters and self._can_run(job_name, max_concurrency):
+            self._start(job_name)
+            return
+
+        waiter = _Waiter(
+            priority=int(priority),
+            sequence=next(self._sequence),
+            job_name=job_name,
+            max_concurrency=max_concurrency,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        self._waiters.append(waiter)
+        self._waiters.sort()
+        self._wake()
+        if waiter.future.done():
+            return
+
+        self._contended = True
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # Слот уже выдан, но задача отменена — вернуть его
+                self._finish(job_name)
+                self._wake()
+            else:
+                self._waiters.remove(waiter)
+                self._publish()
+            raise
+
+    def release(self, job_name: str, duration: float, *, failed: bool = False) -> None:
+        self._finish(job_name)
+        self._record(job_name, duration, failed)
+        self._wake()
+
+    def _can_run(self, job_name: str, max_concurrency: int | None) -> bool:
+        if self.in_flight >= self.limit:
+            return False
+        return max_concurrency is None or self._running.get(job_name, 0) < max_concurrency
+
+    def _start(self, job_name: str) -> None:
+        self.in_flight += 1
+        self._running[job_name] = self._running.get(job_name, 0) + 1
+
+    def _finish(self, job_name: str) -> None:
+        self.in_flight -= 1
+        self._running[job_name] -= 1
+
+    def _wake(self) -> None:
+        for waiter in list(self._waiters):
+            if self.in_flight >= self.limit:
+                break
+            if waiter.future.done() or not self._can_run(waiter.job_name, waiter.max_concurrency):
+                continue
+            self._waiters.remove(waiter)
+            self._start(waiter.job_name)
+            waiter.future.set_result(None)
+        self._publish()
+
+    def _record(self, job_name: str, duration: float, failed: bool) -> None:
+        self._completed += 1
+        if failed:
+            self._errors += 1
+        else:
+            baseline = self._baselines.get(job_name)
+            if baseline is None or duration < baseline:
+                baseline = duration
+            else:
+                # Базовое время медленно догоняет рост, чтобы не «залипнуть» на случайно быстром прогоне
+                baseline += (duration - baseline) * 0.01
+            self._baselines[job_name] = baseline
+            self._latency_ratio_sum += duration / baseline if baseline > 0 else 1.0
+
+        if self._completed >= self.window:
+            self._adjust()
+
+    def _adjust(self) -> None:
+        succeeded = self._completed - self._errors
+        error_rate = self._errors / self._completed
+        latency_ratio = self._latency_ratio_sum / succeeded if succeeded else 1.0
+        saturation = self._current_saturation()
+
+        previous = self.limit
+        if (
+            latency_ratio > self.latency_tolerance
+            or error_rate > self.error_rate_threshold
+            or saturation >= self.saturation_threshold
+        ):
+            self.limit = max(self.min_limit, math.floor(self.limit * self.decrease_factor))
+        elif self._contended:
+            self.limit = min(self.max_limit, self.limit + 1)
+
+        if self.limit != previous:
+            logger.info(
+                "Job concurrency limit %s -> %s",
+                previous,
+                self.limit,
+                extra={"latency_ratio": round(latency_ratio, 3), "error_rate": error_rate, "saturation": saturation},
+            )
+
+        self._completed = self._errors = 0
+        self._latency_ratio_sum = 0.0
+        self._contended = bool(self._waiters)
+
+    def _current_saturation(self) -> float:
+        if self.saturation is None:
+            return 0.0
+        try:
+            return self.saturation()
+        except Exception:
+            logger.warning("Saturation probe failed", exc_info=True)
+            return 0.0
+
+    def _publish(self) -> None:
+        if JOB_CONCURRENCY_LIMIT:
+            JOB_CONCURRENCY_LIMIT.set(self.limit)
+        if JOB_CONCURRENCY_WAITING:
+            for priority in Priority:
+                waiting = sum(1 for waiter in self._waiters if waiter.priority == priority)
+                JOB_CONCURRENCY_WAITING.labels(priority=priority.name.lower()).set(waiting)
+
+
+def job_concurrency(
+    func: T | None = None, *, priority: Priority | str = Priority.NORMAL, max_concurrency: int | None = None
+) -> Any:
+    """Задаёт приоритет и лимит одновременных запусков для задачи; читается limit_concurrency."""
+
+    job_priority = priority if isinstance(priority, Priority) else Priority[priority.upper()]
+
+    def decorator(func: T) -> T:
+        func._job_priority = job_priority  # type: ignore[attr-defined]
+        func._job_max_concurrency = max_concurrency  # type: ignore[attr-defined]
+        return func
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def limit_concurrency(func: T, *, timeout: float | None = None) -> T:
+    """
+    Пропускает задачу через AdaptiveConcurrencyLimiter из ctx; без него задача выполняется как есть.
+    timeout отсчитывается с момента получения слота: ожидание слота в него не входит. Ставится над
+    instrument_job, чтобы отмена по timeout считалась таймаутом: limit_concurrency(instrument_job(func)).
+    """
+    job_name = getattr(func, "__name__", "job")
+    priority = getattr(func, "_job_priority", Priority.NORMAL)
+    max_concurrency = getattr(func, "_job_max_concurrency", None)
+
+    @wraps(func)
+    async def wrapper(ctx: Any, *args: Any, **kwargs: Any) -> Any:
+        limiter = ctx.get(LIMITER_CTX_KEY) if isinstance(ctx, dict) else None
+        if limiter is None:
+            return await asyncio.wait_for(func(ctx, *args, **kwargs), timeout)
+        async with limiter.slot(job_name, priority=priority, max_concurrency=max_concurrency):
+            return await asyncio.wait_for(func(ctx, *args, **kwargs), timeout)
+
+    return wrapper  # type: ignore[return-value]
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import pickle
+import secrets
+import time
+from collections.abc import Awaitable, Callable
+from functools import wraps
+from typing import Any, TypeVar
+
+from redis.exceptions import RedisError
+
+from src.core.config import settings
+from src.core.metrics.worker_metrics import JOB_DEDUP_TOTAL
+from src.core.trace import TRACE_HEADERS_KWARG
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=Callable[..., Awaitable[Any]])
+
+_KEY_PREFIX = "job_dedup:"
+_LOCK_SUFFIX = ":lock"
+
+# Снимает lock, только если он всё ещё наш: после lock_timeout его мог взять другой воркер
+_RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+def idempotency_key(job_name: str, args: tuple[Any, ...], kwargs: dict[str, Any]) -> str:
+    kwargs = {key: value for key, value in kwargs.items() if key != TRACE_HEADERS_KWARG}
+    raw = json.dumps([args, kwargs], sort_keys=True, default=str, separators=(",", ":"))
+    return f"{_KEY_PREFIX}{job_name}:{hashlib.sha256(raw.encode()).hexdigest()}"
+
+
+def deduplicate_job(
+    func: T | None = None,
+    *,
+    ttl: int | None = None,
+    lock_timeout: float = 300.0,
+    poll_delay: float = 0.1,
+    key: Callable[..., str] | None = None,
+) -> Any:
+    """
+    Выполняет задачу один раз на ключ идемпотентности (имя задачи + аргументы) и хранит
+    результат в Redis ttl секунд. Одновременные дубликаты ждут выполнения-владельца:
+    в процессе — через общий Future, между воркерами — через lock-ключ в Redis.
+    Исключения не кэшируются. Ставится под instrument_job: instrument_job(deduplicate_job(func)).
+    """
+
+    def decorator(func: T) -> T:
+        job_name = getattr(func, "__name__", "job")
+        result_ttl = ttl if ttl is not None else settings.JOB_DEDUP_TTL
+        inflight: dict[str, asyncio.Future] = {}
+
+        @wraps(func)
+        async def wrapper(ctx: Any, *args: Any, **kwargs: Any) -> Any:
+            redis = ctx.get("redis") if isinstance(ctx, dict) else None
+            if redis is None:
+                return await func(ctx, *args, **kwargs)
+
+            cache_key = key(*args, **kwargs) if key else idempotency_key(job_name, args, kwargs)
+            owner = inflight.get(cache_key)
+            if owner is not None:
+                _count(job_name, "collapsed")
+                try:
+                    return await asyncio.shield(owner)
+                except asyncio.CancelledError:
+                    if not owner.cancelled():
+                        raise
+                    # Владелец отменён — выполняем сами
+
+            future = inflight[cache_key] = asyncio.get_running_loop().create_future()
+            try:
+                result = await _run_once(redis, cache_key, func, ctx, args, kwargs)
+            except Exception as exc:
+                future.set_exception(exc)
+                # Исключение уже поднято у владельца; без ожидающих не логировать "never retrieved"
+                future.exception()
+                raise
+            except BaseException:
+                future.cancel()
+                raise
+            else:
+                future.set_result(result)
+                return result
+            finally:
+                if inflight.get(cache_key) is future:
+                    del inflight[cache_key]
+
+        async def _run_once(redis, cache_key: str, func: T, ctx: Any, args: tuple, kwargs: dict) -> Any:
+            lock_key = cache_key + _LOCK_SUFFIX
+            deadline = time.monotonic() + lock_timeout
+            collapsed = False
+            token: str | None = None
+            while True:
+                cached = await _get(redis, cache_key)
+                if cached is not None:
+                    _count(job_name, "collapsed" if collapsed else "hit")
+                    return _loads(redis, cached)
+                token = await _acquire(redis, lock_key, lock_timeout)
+                if token is not None or time.monotonic() >= deadline:
+                    break
+                # Ждём владельца в другом воркере; если он упал без результата, lock снят или истечёт
+                collapsed = True
+                while await _exists(redis, lock_key) and time.monotonic() < deadline:
+                    await asyncio.sleep(poll_delay)
+
+            _count(job_name, "miss")
+            try:
+                result = await func(ctx, *args, **kwargs)
+                await _set(redis, cache_key, _dumps(redis, result), result_ttl)
+                return result
+            finally:
+                if token is not None:
+                    await _release(redis, lock_key, token)
+
+        wrapper._deduplicated = True  # type: ignore[attr-defined]
+        return wrapper  # type: ignore[return-value]
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def _count(job_name: str, result: str) -> None:
+    if JOB_DEDUP_TOTAL:
+        JOB_DEDUP_TOTAL.labels(job_name=job_name, result=result).inc()
+
+
+def _dumps(redis: Any, value: Any) -> bytes:
+    serializer = getattr(redis, "job_serializer", None) or pickle.dumps
+    return serializer(value)
+
+
+def _loads(redis: Any, raw: bytes) -> Any:
+    deserializer = getattr(redis, "job_deserializer", None) or pickle.loads
+    return deserializer(raw)
+
+
+async def _get(redis: Any, cache_key: str) -> bytes | None:
+    try:
+        return await redis.get(cache_key)
+    except RedisError:
+        logger.warning("Job dedup cache read failed", exc_info=True)
+        return None
+
+
+async def _set(redis: Any, cache_key: str, value: bytes, ttl: int) -> None:
+    try:
+        await redis.set(cache_key, value, ex=ttl)
+    except RedisError:
+        logger.warning("Job dedup cache write failed", exc_info=True)
+
+
+async def _acquire(redis: Any, lock_key: str, lock_timeout: float) -> str | None:
+    token = secrets.token_hex(16)
+    try:
+        acquired = await redis.set(lock_key, token, px=int(lock_timeout * 1000), nx=True)
+    except RedisError:
+        logger.warning("Job dedup lock failed", exc_info=True)
+        return token
+    return token if acquired else None
+
+
+async def _exists(redis: Any, lock_key: str) -> bool:
+    try:
+        return bool(await redis.exists(lock_key))
+    except RedisError:
+        return False
+
+
+async def _release(redis: Any, lock_key: str, token: str) -> None:
+    try:
+        await redis.eval(_RELEASE_SCRIPT, 1, lock_key, token)
+    except RedisError:
+        logger.warning("Job dedup unlock failed", exc_info=True)
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+import multiprocessing
+import os
+import time
+from collections.abc import Callable
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from functools import partial, wraps
+from typing import Any
+
+from src.core.config import settings
+from src.core.logging_config import configure_job_logging
+from src.core.logging_ctx import (
+    JobContextFilter,
+    job_context,
+    job_id_ctx,
+    job_name_ctx,
+    job_try_ctx,
+    parent_request_uuid_ctx,
+)
+from src.core.metrics.worker_metrics import JOB_PHASE_DURATION_SECONDS
+from src.core.trace import REQUEST_UUID_HEADER, SERVER_UUID_HEADER, get_server_uuid
+
+
+class OffloadExecutor(str, Enum):
+    PROCESS = "process"
+    THREAD = "thread"
+
+
+_executors: dict[OffloadExecutor, Executor] = {}
+
+
+def shutdown_job_executors(*, wait: bool = True) -> None:
+    executors = list(_executors.values())
+    _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait, cancel_futures=True)
+
+
+def _get_executor(kind: OffloadExecutor) -> Executor:
+    executor = _executors.get(kind)
+    if executor is None:
+        if kind is OffloadExecutor.PROCESS:
+            executor = ProcessPoolExecutor(
+                max_workers=settings.JOB_PROCESS_POOL_SIZE or os.cpu_count(),
+                mp_context=multiprocessing.get_context(settings.JOB_PROCESS_START_METHOD),
+                initializer=_init_child_process,
+                initargs=(settings.LOGGING_LEVEL, settings.SERVICE_NAME, settings.LOG_FAST_FORMATTER),
+            )
+        else:
+            executor = ThreadPoolExecutor(
+                max_workers=settings.JOB_THREAD_POOL_SIZE or None, thread_name_prefix="job-offload"
+            )
+        _executors[kind] = executor
+    return executor
+
+
+def _init_child_process(logging_level: str, service_name: str | None, fast_formatter: bool) -> None:
+    # Поток очереди логов родителя в дочерний процесс не попадает: там пишем синхронно
+    configure_job_logging(logging_level=logging_level, service_name=service_name, fast_formatter=fast_formatter)
+    for handler in logging.getLogger().handlers:
+        handler.addFilter(JobContextFilter())
+
+
+def cpu_bound(func: Callable[..., Any] | None = None, *, executor: OffloadExecutor | str = OffloadExecutor.PROCESS):
+    """
+    Превращает синхронную CPU-bound функцию func(*args, **kwargs) в задачу ARQ, которая
+    выполняется в ProcessPoolExecutor (или ThreadPoolExecutor) и не блокирует event loop воркера.
+
+    ctx в функцию не передаётся. Для пула процессов функция должна быть объявлена на уровне модуля.
+    job_context (job_name/job_id/job_try и трассировка) переносится в дочерний процесс.
+    """
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        kind = OffloadExecutor(executor)
+        # В процесс передаётся ссылка модуль/имя: сама функция в модуле заменена обёрткой
+        target: Any = (func.__module__, func.__qualname__) if kind is OffloadExecutor.PROCESS else func
+        job_name = getattr(func, "__name__", "job")
+
+        @wraps(func)
+        async def wrapper(ctx: Any, *args: Any, **kwargs: Any) -> Any:
+            trace_headers = {}
+            if parent_request_uuid_ctx.get():
+                trace_headers[REQUEST_UUID_HEADER] = parent_request_uuid_ctx.get()
+            if get_server_uuid():
+                trace_headers[SERVER_UUID_HEADER] = get_server_uuid()
+            job_fields = {
+                "job_name": job_name_ctx.get() or job_name,
+                "job_id": job_id_ctx.get(),
+                "job_try": job_try_ctx.get(),
+                "trace_headers": trace_headers,
+            }
+
+            loop = asyncio.get_running_loop()
+            submitted = time.time()
+            started, execution, result = await loop.run_in_executor(
+                _get_executor(kind), partial(_run_offloaded, target, job_fields, args, kwargs)
+            )
+            total = time.time() - submitted
+
+            if JOB_PHASE_DURATION_SECONDS:
+                pool_wait = max(started - submitted, 0.0)
+                JOB_PHASE_DURATION_SECONDS.labels(job_name=job_name, phase="pool_wait").observe(pool_wait)
+                JOB_PHASE_DURATION_SECONDS.labels(job_name=job_name, phase="execution").observe(execution)
+                JOB_PHASE_DURATION_SECONDS.labels(job_name=job_name, phase="ipc").observe(
+                    max(total - pool_wait - execution, 0.0)
+                )
+            return result
+
+        wrapper._offload_executor = kind  # type: ignore[attr-defined]
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
+def _run_offloaded(
+    target: Any, job_fields: dict[str, Any], args: tuple[Any, ...], kwargs: dict[str, Any]
+) -> tuple[float, float, Any]:
+    func = _resolve(target)
+    started = time.time()
+    with job_context(**job_fields):
+        start = time.perf_counter()
+        result = func(*args, **kwargs)
+        execution = time.perf_counter() - start
+    return started, execution, result
+
+
+def _resolve(target: Any) -> Callable[..., Any]:
+    if callable(target):
+        return target
+    module_name, qualname = target
+    func: Any = importlib.import_module(module_name)
+    for attr in qualname.split("."):
+        func = getattr(func, attr)
+    while hasattr(func, "__wrapped__"):
+        func = func.__wrapped__
+    return func
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any
+from uuid import uuid4
+
+from arq.connections import ArqRedis
+from arq.constants import job_key_prefix, result_key_prefix
+from arq.jobs import Job, deserialize_result, serialize_job
+from arq.utils import timestamp_ms, to_ms
+from fastapi import Request
+
+from src.core.http_client import inject_trace_headers
+from src.core.trace import TRACE_HEADERS_KWARG
+
+# Атомарно для всей пачки: задача с уже существующим job/result ключом пропускается, как в ArqRedis.enqueue_job.
+# KEYS: job_key, result_key, queue_name на задачу; ARGV: payload, expires_ms, score, job_id на задачу.
+_ENQUEUE_SCRIPT = """
+local enqueued = {}
+for index = 0, #KEYS / 3 - 1 do
+    local job_key, result_key, queue_name = KEYS[index * 3 + 1], KEYS[index * 3 + 2], KEYS[index * 3 + 3]
+    if redis.call('EXISTS', job_key, result_key) == 0 then
+        redis.call('PSETEX', job_key, ARGV[index * 4 + 2], ARGV[index * 4 + 1])
+        redis.call('ZADD', queue_name, ARGV[index * 4 + 3], ARGV[index * 4 + 4])
+        enqueued[#enqueued + 1] = 1
+    else
+        enqueued[#enqueued + 1] = 0
+    end
+end
+return enqueued
+"""
+
+
+@dataclass(frozen=True)
+class JobSpec:
+    function: str
+    args: tuple[Any, ...] = ()
+    kwargs: dict[str, Any] = field(default_factory=dict)
+    job_id: str | None = None
+    queue_name: str | None = None
+    defer_by: float | timedelta | None = None
+    expires: float | timedelta | None = None
+
+
+async def enqueue_jobs(redis: ArqRedis, jobs: Sequence[JobSpec]) -> list[Job | None]:
+    """
+    Ставит пачку задач в очередь одним вызовом Redis. Как и enqueue_job, возвращает None
+    для задачи, чей job_id уже есть в очереди или в результатах.
+    """
+    if not jobs:
+        return []
+
+    trace_headers = inject_trace_headers()
+    enqueue_time_ms = timestamp_ms()
+    keys: list[str] = []
+    argv: list[Any] = []
+    job_ids: list[tuple[str, str]] = []
+    for spec in jobs:
+        job_id = spec.job_id or uuid4().hex
+        queue_name = spec.queue_name or redis.default_queue_name
+        defer_by_ms = to_ms(spec.defer_by) or 0
+        score = enqueue_time_ms + defer_by_ms
+        expires_ms = to_ms(spec.expires) or defer_by_ms + redis.expires_extra_ms
+
+        kwargs = dict(spec.kwargs)
+        if trace_headers:
+            kwargs[TRACE_HEADERS_KWARG] = trace_headers
+        payload = serialize_job(
+            spec.function, spec.args, kwargs, None, enqueue_time_ms, serializer=redis.job_serializer
+        )
+
+        keys += [job_key_prefix + job_id, result_key_prefix + job_id, queue_name]
+        argv += [payload, expires_ms, score, job_id]
+        job_ids.append((job_id, queue_name))
+
+    enqueued = await redis.eval(_ENQUEUE_SCRIPT, len(keys), *keys, *argv)
+    return [
+        Job(job_id, redis=redis, _queue_name=queue_name, _deserializer=redis.job_deserializer) if created else None
+        for (job_id, queue_name), created in zip(job_ids, enqueued, strict=True)
+    ]
+
+
+async def gather_job_results(
+    redis: ArqRedis,
+    jobs: Sequence[Job | None],
+    *,
+    timeout: float,
+    poll_delay: float = 0.05,
+    return_exceptions: bool = False,
+) -> list[Any]:
+    """
+    Ждёт результаты всех задач до общего дедлайна, опрашивая их одним MGET за итерацию.
+
+    С return_exceptions=True, как в asyncio.gather, ошибка задачи или asyncio.TimeoutError
+    для незавершённой задачи возвращается на её месте; иначе поднимается первая из них.
+    """
+    deadline = time.monotonic() + timeout
+    results: list[Any] = [None] * len(jobs)
+    pending = {index: result_key_prefix + job.job_id for index, job in enumerate(jobs) if job is not None}
+
+    while pending:
+        indexes = list(pending)
+        raw_results = await redis.mget([pending[index] for index in indexes])
+        for index, raw in zip(indexes, raw_results, strict=True):
+            if raw is None:
+                continue
+            del pending[index]
+            job_result = deserialize_result(raw, deserializer=redis.job_deserializer)
+            results[index] = job_result.result
+            if not job_result.success and not return_exceptions:
+                raise job_result.result
+
+        if not pending:
+            break
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            for index in pending:
+                error = asyncio.TimeoutError(f"job {jobs[index].job_id} not finished in {timeout}s")
+                if not return_exceptions:
+                    raise error
+                results[index] = error
+            break
+        await asyncio.sleep(min(poll_delay, remaining))
+
+    return results
+
+
+def get_job_queue(request: Request) -> ArqRedis:
+    return request.app.state.redis
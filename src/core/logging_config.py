@@ -2,13 +2,20 @@ from __future__ import annotations
 
 import json
 import logging
+import math
 from collections.abc import Mapping
 from datetime import datetime, timezone
 from typing import Any
 
 from src.core.logging_ctx import get_job_id
+from src.core.logging_queue import BatchingQueueHandler, LogQueueConfig
 from src.core.trace import get_request_uuid, get_server_uuid
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
 _RESERVED_RECORD_ATTRS = {
     "args",
     "asctime",
@@ -36,6 +43,13 @@ _RESERVED_RECORD_ATTRS = {
 }
 
 
+def _exception_text(formatter: logging.Formatter, record: logging.LogRecord) -> str | None:
+    # BatchingQueueHandler передаёт traceback уже строкой в exc_text, без exc_info
+    if record.exc_info:
+        return formatter.formatException(record.exc_info)
+    return record.exc_text
+
+
 class JsonFormatter(logging.Formatter):
     def __init__(self, *, service_name: str | None = None) -> None:
         super().__init__()
@@ -73,8 +87,9 @@ class JsonFormatter(logging.Formatter):
                 continue
             data[key] = value
 
-        if record.exc_info:
-            data["exception"] = self.formatException(record.exc_info)
+        exception = _exception_text(self, record)
+        if exception:
+            data["exception"] = exception
 
         return json.dumps(data, ensure_ascii=False, default=str)
 
@@ -108,8 +123,9 @@ class JobJsonFormatter(logging.Formatter):
                 continue
             payload[key] = value
 
-        if record.exc_info:
-            payload["exception"] = self.formatException(record.exc_info)
+        exception = _exception_text(self, record)
+        if exception:
+            payload["exception"] = exception
 
         data: dict[str, Any] = {
             "service_name": service_name,
@@ -122,6 +138,152 @@ class JobJsonFormatter(logging.Formatter):
         return json.dumps(data, ensure_ascii=False, default=str)
 
 
+_JOB_PAYLOAD_SKIP_ATTRS = _RESERVED_RECORD_ATTRS | {"service_name", "job_id", "payload"}
+
+if orjson:
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+def _dumps(data: dict[str, Any]) -> str:
+    if orjson:
+        try:
+            return orjson.dumps(data, default=str, option=_ORJSON_OPTIONS).decode()
+        except TypeError:
+            pass
+    return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class _TimestampCache:
+    __slots__ = ("_cached",)
+
+    def __init__(self) -> None:
+        self._cached: tuple[int, str] = (-1, "")
+
+    def isoformat(self, created: float) -> str:
+        fraction, whole = math.modf(created)
+        second = int(whole)
+        microsecond = round(fraction * 1_000_000)
+        if microsecond >= 1_000_000:
+            second += 1
+            microsecond -= 1_000_000
+
+        cached = self._cached
+        if cached[0] != second:
+            prefix = datetime.fromtimestamp(second, tz=timezone.utc).isoformat()[: -len("+00:00")]
+            cached = (second, prefix)
+            self._cached = cached
+
+        if microsecond:
+            return f"{cached[1]}.{microsecond:06d}+00:00"
+        return f"{cached[1]}+00:00"
+
+
+class FastJsonFormatter(JsonFormatter):
+    """
+    Та же схема, что у JsonFormatter, но с кэшем метки времени по секундам,
+    без полного обхода record.__dict__ и с orjson, если он установлен.
+    """
+
+    def __init__(self, *, service_name: str | None = None) -> None:
+        super().__init__(service_name=service_name)
+        self._timestamps = _TimestampCache()
+
+    def format(self, record: logging.LogRecord) -> str:
+        record_dict = record.__dict__
+        data: dict[str, Any] = {
+            "timestamp": self._timestamps.isoformat(record.created),
+            "level": record.levelname,
+            "PID": record.process,
+        }
+
+        service_name = record_dict.get("service_name") or self.service_name
+        if service_name:
+            data["service_name"] = service_name
+
+        request_uuid = record_dict.get("uuid") or get_request_uuid()
+        if request_uuid:
+            data["uuid"] = request_uuid
+
+        server_uuid = record_dict.get("uuid_server") or get_server_uuid()
+        if server_uuid:
+            data["uuid_server"] = server_uuid
+
+        message = record.getMessage()
+        if message:
+            data["message"] = message
+
+        extra_keys = record_dict.keys() - _RESERVED_RECORD_ATTRS
+        if extra_keys:
+            for key, value in record_dict.items():
+                if key not in extra_keys or key in data or value is None or key.startswith("_"):
+                    continue
+                data[key] = value
+
+        exception = _exception_text(self, record)
+        if exception:
+            data["exception"] = exception
+
+        return _dumps(data)
+
+
+class FastJobJsonFormatter(JobJsonFormatter):
+    """Быстрый вариант JobJsonFormatter с той же схемой, см. FastJsonFormatter."""
+
+    def __init__(self, *, service_name: str | None = None) -> None:
+        super().__init__(service_name=service_name)
+        self._timestamps = _TimestampCache()
+
+    def format(self, record: logging.LogRecord) -> str:
+        record_dict = record.__dict__
+        service_name = record_dict.get("service_name") or self.service_name
+        job_id = record_dict.get("job_id") or get_job_id()
+
+        payload: dict[str, Any] = {}
+        record_payload = record_dict.get("payload")
+        if isinstance(record_payload, Mapping):
+            payload.update(record_payload)
+        elif record_payload is not None:
+            payload["data"] = record_payload
+
+        message = record.getMessage()
+        if message:
+            payload.setdefault("message", message)
+
+        extra_keys = record_dict.keys() - _JOB_PAYLOAD_SKIP_ATTRS
+        if extra_keys:
+            for key, value in record_dict.items():
+                if key not in extra_keys or value is None or key.startswith("_"):
+                    continue
+                payload[key] = value
+
+        exception = _exception_text(self, record)
+        if exception:
+            payload["exception"] = exception
+
+        data: dict[str, Any] = {
+            "service_name": service_name,
+            "job_id": job_id,
+            "timestamp": self._timestamps.isoformat(record.created),
+            "PID": record.process,
+            "payload": payload,
+            "level": record.levelname,
+        }
+        return _dumps(data)
+
+
+def _build_handler(formatter: logging.Formatter, log_queue: LogQueueConfig | None) -> logging.Handler:
+    handler = logging.StreamHandler()
+    handler.setFormatter(formatter)
+    if log_queue is None:
+        return handler
+    return BatchingQueueHandler(
+        handler,
+        max_size=log_queue.max_size,
+        overflow_policy=log_queue.overflow_policy,
+        batch_size=log_queue.batch_size,
+    )
+
+
 def _configure_root_logging(*, handler: logging.Handler, logging_level: str, disable_uvicorn_access_log: bool) -> None:
     level = getattr(logging, logging_level.upper(), logging.INFO)
     if not isinstance(level, int):
@@ -143,9 +305,11 @@ def configure_logging(
     logging_level: str = "INFO",
     service_name: str | None = None,
     disable_uvicorn_access_log: bool = True,
+    log_queue: LogQueueConfig | None = None,
+    fast_formatter: bool = False,
 ) -> None:
-    handler = logging.StreamHandler()
-    handler.setFormatter(JsonFormatter(service_name=service_name))
+    formatter_class = FastJsonFormatter if fast_formatter else JsonFormatter
+    handler = _build_handler(formatter_class(service_name=service_name), log_queue)
     _configure_root_logging(
         handler=handler,
         logging_level=logging_level,
@@ -158,11 +322,19 @@ def configure_job_logging(
     logging_level: str = "INFO",
     service_name: str | None = None,
     disable_uvicorn_access_log: bool = True,
+    log_queue: LogQueueConfig | None = None,
+    fast_formatter: bool = False,
 ) -> None:
-    handler = logging.StreamHandler()
-    handler.setFormatter(JobJsonFormatter(service_name=service_name))
+    formatter_class = FastJobJsonFormatter if fast_formatter else JobJsonFormatter
+    handler = _build_handler(formatter_class(service_name=service_name), log_queue)
     _configure_root_logging(
         handler=handler,
         logging_level=logging_level,
         disable_uvicorn_access_log=disable_uvicorn_access_log,
     )
+
+
+def stop_log_queue() -> None:
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, BatchingQueueHandler):
+            handler.stop()
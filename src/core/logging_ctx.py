@@ -3,13 +3,14 @@ from __future__ import annotations
 import logging
 from contextlib import contextmanager
 from contextvars import ContextVar
-from typing import Iterator
+from typing import Iterator, Mapping
 
-from src.core.trace import parse_uuid, request_uuid_ctx
+from src.core.trace import REQUEST_UUID_HEADER, SERVER_UUID_HEADER, parse_uuid, request_uuid_ctx, server_uuid_ctx
 
 job_name_ctx: ContextVar[str | None] = ContextVar("job_name", default=None)
 job_id_ctx: ContextVar[str | None] = ContextVar("job_id", default=None)
 job_try_ctx: ContextVar[int | None] = ContextVar("job_try", default=None)
+parent_request_uuid_ctx: ContextVar[str | None] = ContextVar("parent_request_uuid", default=None)
 
 
 @contextmanager
@@ -18,13 +19,17 @@ def job_context(
     job_name: str | None = None,
     job_id: str | None = None,
     job_try: int | None = None,
+    trace_headers: Mapping[str, str] | None = None,
 ) -> Iterator[None]:
     normalized_job_id = parse_uuid(job_id) or job_id
+    trace_headers = trace_headers or {}
 
     token_name = job_name_ctx.set(job_name)
     token_id = job_id_ctx.set(normalized_job_id)
     token_try = job_try_ctx.set(job_try)
     token_request_uuid = request_uuid_ctx.set(normalized_job_id)
+    token_parent = parent_request_uuid_ctx.set(parse_uuid(trace_headers.get(REQUEST_UUID_HEADER)))
+    token_server_uuid = server_uuid_ctx.set(parse_uuid(trace_headers.get(SERVER_UUID_HEADER)) or server_uuid_ctx.get())
     try:
         yield
     finally:
@@ -32,6 +37,8 @@ def job_context(
         job_id_ctx.reset(token_id)
         job_try_ctx.reset(token_try)
         request_uuid_ctx.reset(token_request_uuid)
+        parent_request_uuid_ctx.reset(token_parent)
+        server_uuid_ctx.reset(token_server_uuid)
 
 
 class JobContextFilter(logging.Filter):
@@ -48,6 +55,10 @@ class JobContextFilter(logging.Filter):
         if job_try is not None and not hasattr(record, "job_try"):
             record.job_try = job_try
 
+        parent_request_uuid = parent_request_uuid_ctx.get()
+        if parent_request_uuid and not hasattr(record, "parent_request_uuid"):
+            record.parent_request_uuid = parent_request_uuid
+
         return True
 
 
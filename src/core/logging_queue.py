@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import contextvars
+import copy
+import logging
+import queue
+import threading
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any
+
+from src.core.metrics.logging_metrics import LOG_QUEUE_SIZE, LOG_RECORDS_DROPPED_TOTAL, LOG_RECORDS_QUEUED_TOTAL
+
+_STOP = object()
+_DEFAULT_FORMATTER = logging.Formatter()
+
+
+class OverflowPolicy(str, Enum):
+    DROP = "drop"
+    BLOCK = "block"
+
+
+@dataclass(frozen=True)
+class LogQueueConfig:
+    max_size: int = 10_000
+    overflow_policy: OverflowPolicy | str = OverflowPolicy.DROP
+    batch_size: int = 500
+
+
+class BatchingQueueHandler(logging.Handler):
+    """
+    Ставит записи в ограниченную очередь, а форматирование и запись в поток
+    выполняет пачками фоновый поток.
+
+    Контекст (request/job uuid) снимается через contextvars в момент emit,
+    поэтому форматтеры в фоновом потоке видят те же значения, что и в event loop.
+    Сообщение с аргументами и traceback рендерятся в строки тоже в emit, как в QueueHandler.prepare():
+    к моменту записи объекты из args могут измениться.
+    """
+
+    def __init__(
+        self,
+        target: logging.StreamHandler,
+        *,
+        max_size: int = 10_000,
+        overflow_policy: OverflowPolicy | str = OverflowPolicy.DROP,
+        batch_size: int = 500,
+    ) -> None:
+        super().__init__()
+        self.target = target
+        self.overflow_policy = OverflowPolicy(overflow_policy)
+        self.batch_size = max(1, batch_size)
+        self.queue: queue.Queue[Any] = queue.Queue(maxsize=max(0, max_size))
+        self.processed = 0
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self.start()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="log-queue", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        thread = self._thread
+        if thread is None:
+            return
+        self.queue.put(_STOP)
+        thread.join()
+        self._thread = None
+        self.target.flush()
+
+    def stats(self) -> dict[str, int]:
+        pending = self.queue.qsize()
+        return {"queued": self.processed + pending, "pending": pending, "dropped": self.dropped}
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if self._thread is None:
+            self.target.handle(record)
+            return
+
+        try:
+            record = self._prepare(record)
+        except Exception:
+            self.handleError(record)
+            return
+
+        record._log_context = contextvars.copy_context()
+        try:
+            if self.overflow_policy is OverflowPolicy.BLOCK:
+                self.queue.put(record)
+            else:
+                self.queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+            if LOG_RECORDS_DROPPED_TOTAL:
+                LOG_RECORDS_DROPPED_TOTAL.inc()
+            return
+        if LOG_RECORDS_QUEUED_TOTAL:
+            LOG_RECORDS_QUEUED_TOTAL.inc()
+
+    def _prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Копия, как в QueueHandler.prepare (bpo-35726): исходную запись после handlers ещё читают
+        # другие (например, LoggingIntegration Sentry берёт из неё exc_info)
+        message = record.getMessage()
+        record = copy.copy(record)
+        record.msg = message
+        record.args = None
+        if record.exc_info:
+            formatter = self.target.formatter or _DEFAULT_FORMATTER
+            record.exc_text = formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def flush(self) -> None:
+        if self._thread is not None:
+            self.queue.join()
+        self.target.flush()
+
+    def close(self) -> None:
+        self.stop()
+        self.target.close()
+        super().close()
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            batch: list[logging.LogRecord] = []
+            stop = item is _STOP
+            if not stop:
+                batch.append(item)
+            while not stop and len(batch) < self.batch_size:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stop = True
+                else:
+                    batch.append(item)
+
+            try:
+                self._write_batch(batch)
+            finally:
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self.queue.task_done()
+
+            if stop:
+                return
+
+    def _write_batch(self, batch: list[logging.LogRecord]) -> None:
+        if not batch:
+            return
+
+        lines: list[str] = []
+        for record in batch:
+            context = record.__dict__.pop("_log_context", None)
+            try:
+                lines.append(context.run(self.target.format, record) if context else self.target.format(record))
+            except Exception:
+                self.handleError(record)
+
+        if lines:
+            terminator = self.target.terminator
+            self.target.acquire()
+            try:
+                self.target.stream.write(terminator.join(lines) + terminator)
+                self.target.flush()
+            except Exception:
+                self.handleError(batch[-1])
+            finally:
+                self.target.release()
+
+        self.processed += len(batch)
+        if LOG_QUEUE_SIZE:
+            LOG_QUEUE_SIZE.set(self.queue.qsize())
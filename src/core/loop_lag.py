@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import logging
+import sys
+import threading
+import time
+import traceback
+from contextvars import Context
+from types import FrameType
+
+from src.core.config import settings
+from src.core.logging_ctx import job_id_ctx
+from src.core.metrics.loop_metrics import EVENT_LOOP_BLOCKED_TOTAL, EVENT_LOOP_LAG_SECONDS
+from src.core.trace import request_uuid_ctx
+
+logger = logging.getLogger(__name__)
+
+# Колбэки loop (в том числе шаги задач) выполняются в Handle._run внутри контекста задачи
+_HANDLE_RUN_CODE = asyncio.events.Handle._run.__code__
+
+
+class EventLoopLagMonitor:
+    """
+    Раз в interval секунд засыпает на interval и считает задержку пробуждения: насколько event loop
+    не успевает обработать готовые колбэки. Последнее значение — в lag, все — в event_loop_lag_seconds.
+
+    С blocking_threshold > 0 фоновый поток следит, не опаздывает ли пробуждение больше чем на порог,
+    и логирует стек потока loop в этот момент с UUID запроса или задачи ARQ, в контексте которых
+    выполняется заблокировавший loop колбэк. Один раз на каждую блокировку.
+
+    interval = 0 выключает монитор: start ничего не запускает, lag остаётся 0.
+    """
+
+    def __init__(self, *, interval: float = 0.25, blocking_threshold: float = 0.0) -> None:
+        if interval < 0:
+            raise ValueError("interval must be >= 0 (0 disables the monitor)")
+        if blocking_threshold < 0:
+            raise ValueError("blocking_threshold must be >= 0 (0 disables the watchdog)")
+        self.interval = interval
+        self.blocking_threshold = blocking_threshold
+        self.lag = 0.0
+        self._task: asyncio.Task | None = None
+        self._watchdog: threading.Thread | None = None
+        self._stopped = threading.Event()
+        self._loop_thread_id: int | None = None
+        self._expected_wakeup = 0.0
+        self._reported_wakeup = 0.0
+
+    @classmethod
+    def from_settings(cls) -> EventLoopLagMonitor:
+        return cls(interval=settings.EVENT_LOOP_LAG_INTERVAL, blocking_threshold=settings.EVENT_LOOP_BLOCKING_THRESHOLD)
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0
+
+    def start(self) -> None:
+        # Без проб сторожевому потоку нечего проверять: он смотрит на ожидаемое время пробуждения _run
+        if not self.enabled:
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="event-loop-lag-monitor")
+        if self.blocking_threshold > 0 and self._watchdog is None:
+            self._loop_thread_id = threading.get_ident()
+            self._stopped.clear()
+            self._watchdog = threading.Thread(target=self._watch, name="event-loop-watchdog", daemon=True)
+            self._watchdog.start()
+
+    async def stop(self) -> None:
+        watchdog, self._watchdog = self._watchdog, None
+        if watchdog is not None:
+            self._stopped.set()
+            watchdog.join()
+        task, self._task = self._task, None
+        if task is None:
+            return
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            self._expected_wakeup = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            self.lag = max(loop.time() - start - self.interval, 0.0)
+            self._expected_wakeup = 0.0
+            if EVENT_LOOP_LAG_SECONDS:
+                EVENT_LOOP_LAG_SECONDS.observe(self.lag)
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(max(self.blocking_threshold / 2, 0.005)):
+            expected = self._expected_wakeup
+            if not expected or expected == self._reported_wakeup:
+                continue
+            blocked = time.monotonic() - expected
+            if blocked < self.blocking_threshold:
+                continue
+            self._reported_wakeup = expected
+            self._report(blocked)
+
+    def _report(self, blocked: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        context = _running_context(frame)
+        request_uuid = context.get(request_uuid_ctx) if context is not None else None
+        job_id = context.get(job_id_ctx) if context is not None else None
+        if EVENT_LOOP_BLOCKED_TOTAL:
+            EVENT_LOOP_BLOCKED_TOTAL.inc()
+        logger.warning(
+            "Event loop blocked for more than %.3fs (request %s, job %s), loop thread stack:\n%s",
+            blocked,
+            request_uuid,
+            job_id,
+            "".join(traceback.format_stack(frame)),
+            extra={"uuid": request_uuid, "job_id": job_id},
+        )
+
+
+def _running_context(frame: FrameType | None) -> Context | None:
+    # Контекст колбэка, который сейчас выполняет loop (под uvloop кадров Handle._run нет)
+    while frame is not None:
+        if frame.f_code is _HANDLE_RUN_CODE:
+            handle = frame.f_locals.get("self")
+            return getattr(handle, "_context", None)
+        frame = frame.f_back
+    return None
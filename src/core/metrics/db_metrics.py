@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:  # pragma: no cover
+    Counter = None
+    Gauge = None
+    Histogram = None
+
+if Counter and Gauge and Histogram:
+    REPOSITORY_CACHE_REQUESTS_TOTAL = Counter(
+        "repository_cache_requests_total",
+        "Repository cache lookups by model, cache layer and result",
+        labelnames=("model", "layer", "result"),
+    )
+    DB_POOL_CHECKED_OUT = Gauge(
+        "db_pool_checked_out_connections",
+        "Connections currently checked out of the pool",
+        labelnames=("pool",),
+        multiprocess_mode="livesum",
+    )
+    DB_POOL_OVERFLOW = Gauge(
+        "db_pool_overflow_connections",
+        "Connections opened above pool_size",
+        labelnames=("pool",),
+        multiprocess_mode="livesum",
+    )
+    DB_POOL_CHECKOUT_WAIT_SECONDS = Histogram(
+        "db_pool_checkout_wait_seconds",
+        "Time spent waiting for a pooled connection",
+        labelnames=("pool",),
+        buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+    )
+    DB_POOL_CHECKOUT_TIMEOUTS_TOTAL = Counter(
+        "db_pool_checkout_timeouts_total",
+        "Pool checkouts that failed with a timeout",
+        labelnames=("pool",),
+    )
+    DB_QUERY_DURATION_SECONDS = Histogram(
+        "db_query_duration_seconds",
+        "Database statement execution time in seconds",
+        labelnames=("pool",),
+    )
+    DB_SLOW_QUERIES_TOTAL = Counter(
+        "db_slow_queries_total",
+        "Statements slower than DB_SLOW_QUERY_THRESHOLD",
+        labelnames=("pool",),
+    )
+    DB_COMPILED_CACHE_TOTAL = Counter(
+        "db_compiled_cache_total",
+        "SQLAlchemy compiled statement cache lookups by result",
+        labelnames=("pool", "result"),
+    )
+else:  # pragma: no cover
+    REPOSITORY_CACHE_REQUESTS_TOTAL = None
+    DB_POOL_CHECKED_OUT = None
+    DB_POOL_OVERFLOW = None
+    DB_POOL_CHECKOUT_WAIT_SECONDS = None
+    DB_POOL_CHECKOUT_TIMEOUTS_TOTAL = None
+    DB_QUERY_DURATION_SECONDS = None
+    DB_SLOW_QUERIES_TOTAL = None
+    DB_COMPILED_CACHE_TOTAL = None
@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram
+except ImportError:  # pragma: no cover
+    Counter = None
+    Gauge = None
+    Histogram = None
+
+if Counter and Gauge and Histogram:
+    HTTP_CLIENT_CONNECTIONS = Gauge(
+        "http_client_connections",
+        "Outbound HTTP pool connections by client and state (active, idle)",
+        labelnames=("client", "state"),
+        multiprocess_mode="livesum",
+    )
+    HTTP_CLIENT_CONNECTIONS_OPENED_TOTAL = Counter(
+        "http_client_connections_opened_total",
+        "New outbound TCP connections by client",
+        labelnames=("client",),
+    )
+    HTTP_CLIENT_POOL_WAIT_SECONDS = Histogram(
+        "http_client_pool_wait_seconds",
+        "Time until an outbound request got a pooled connection, by client",
+        labelnames=("client",),
+        buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+    )
+    HTTP_CLIENT_RETRIES_TOTAL = Counter(
+        "http_client_retries_total",
+        "Outbound HTTP retries by host and reason (status code or error type)",
+        labelnames=("host", "reason"),
+    )
+    HTTP_CLIENT_CIRCUIT_STATE = Gauge(
+        "http_client_circuit_state",
+        "Circuit breaker state by host: 0 closed, 1 half-open, 2 open",
+        labelnames=("host",),
+        multiprocess_mode="max",
+    )
+    HTTP_CLIENT_SHORT_CIRCUITED_TOTAL = Counter(
+        "http_client_short_circuited_total",
+        "Outbound HTTP calls rejected by an open circuit breaker",
+        labelnames=("host",),
+    )
+    HTTP_CLIENT_DEADLINE_EXCEEDED_TOTAL = Counter(
+        "http_client_deadline_exceeded_total",
+        "Outbound HTTP calls not made because the request deadline had passed",
+        labelnames=("host",),
+    )
+    HTTP_CLIENT_COALESCED_TOTAL = Counter(
+        "http_client_coalesced_total",
+        "Coalesced outbound GET/HEAD by host and result (leader, shared, cache_hit, revalidated)",
+        labelnames=("host", "result"),
+    )
+else:  # pragma: no cover
+    HTTP_CLIENT_CONNECTIONS = None
+    HTTP_CLIENT_CONNECTIONS_OPENED_TOTAL = None
+    HTTP_CLIENT_POOL_WAIT_SECONDS = None
+    HTTP_CLIENT_RETRIES_TOTAL = None
+    HTTP_CLIENT_CIRCUIT_STATE = None
+    HTTP_CLIENT_SHORT_CIRCUITED_TOTAL = None
+    HTTP_CLIENT_DEADLINE_EXCEEDED_TOTAL = None
+    HTTP_CLIENT_COALESCED_TOTAL = None
@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import os
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+try:
+    from prometheus_client import (
+        CONTENT_TYPE_LATEST,
+        REGISTRY,
+        CollectorRegistry,
+        Counter,
+        Gauge,
+        Histogram,
+        generate_latest,
+        multiprocess,
+    )
+except ImportError:  # pragma: no cover
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+    REGISTRY = None
+    CollectorRegistry = None
+    Counter = None
+    Gauge = None
+    Histogram = None
+    generate_latest = None
+    multiprocess = None
+
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+_SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000, 100_000_000)
+
+if Counter and Gauge and Histogram:
+    HTTP_REQUESTS_TOTAL = Counter(
+        "http_requests_total",
+        "Total HTTP requests by route template and status class",
+        labelnames=("method", "route", "status_class"),
+    )
+    HTTP_REQUEST_DURATION_SECONDS = Histogram(
+        "http_request_duration_seconds",
+        "HTTP request duration in seconds",
+        labelnames=("method", "route"),
+    )
+    HTTP_REQUEST_SIZE_BYTES = Histogram(
+        "http_request_size_bytes",
+        "HTTP request body size in bytes",
+        labelnames=("method", "route"),
+        buckets=_SIZE_BUCKETS,
+    )
+    HTTP_RESPONSE_SIZE_BYTES = Histogram(
+        "http_response_size_bytes",
+        "HTTP response body size in bytes",
+        labelnames=("method", "route"),
+        buckets=_SIZE_BUCKETS,
+    )
+    HTTP_REQUESTS_IN_PROGRESS = Gauge(
+        "http_requests_in_progress",
+        "HTTP requests currently being processed",
+        labelnames=("method", "route"),
+        multiprocess_mode="livesum",
+    )
+    HTTP_RESPONSE_CACHE_TOTAL = Counter(
+        "http_response_cache_total",
+        "Cached GET routes by route template and result (hit, not_modified, miss)",
+        labelnames=("route", "result"),
+    )
+    HTTP_RESPONSE_COMPRESSION_RATIO = Histogram(
+        "http_response_compression_ratio",
+        "Original to compressed response size ratio by encoding",
+        labelnames=("encoding",),
+        buckets=(1, 1.5, 2, 3, 4, 6, 8, 12, 16, 32),
+    )
+    HTTP_RESPONSE_COMPRESSION_SECONDS = Histogram(
+        "http_response_compression_seconds",
+        "CPU time spent compressing a response by encoding",
+        labelnames=("encoding",),
+        buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1),
+    )
+    HTTP_RATE_LIMITED_TOTAL = Counter(
+        "http_rate_limited_total",
+        "Requests rejected with 429 by route template and rate limit key type",
+        labelnames=("route", "key"),
+    )
+    HTTP_REQUESTS_SHED_TOTAL = Counter(
+        "http_requests_shed_total",
+        "Requests rejected with 503 by the load shedder by reason (in_flight, loop_lag)",
+        labelnames=("reason",),
+    )
+else:  # pragma: no cover
+    HTTP_REQUESTS_TOTAL = None
+    HTTP_REQUEST_DURATION_SECONDS = None
+    HTTP_REQUEST_SIZE_BYTES = None
+    HTTP_RESPONSE_SIZE_BYTES = None
+    HTTP_REQUESTS_IN_PROGRESS = None
+    HTTP_RESPONSE_CACHE_TOTAL = None
+    HTTP_RESPONSE_COMPRESSION_RATIO = None
+    HTTP_RESPONSE_COMPRESSION_SECONDS = None
+    HTTP_RATE_LIMITED_TOTAL = None
+    HTTP_REQUESTS_SHED_TOTAL = None
+
+
+def is_multiprocess_mode() -> bool:
+    return bool(os.getenv(MULTIPROC_DIR_ENV))
+
+
+def collect_metrics() -> bytes:
+    if not generate_latest:  # pragma: no cover
+        return b""
+
+    if is_multiprocess_mode():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry)
+    return generate_latest(REGISTRY)
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    return Response(collect_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
+def mark_metrics_process_dead() -> None:
+    if multiprocess and is_multiprocess_mode():
+        multiprocess.mark_process_dead(os.getpid())
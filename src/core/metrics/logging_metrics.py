@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+try:
+    from prometheus_client import Counter, Gauge
+except ImportError:  # pragma: no cover
+    Counter = None
+    Gauge = None
+
+if Counter and Gauge:
+    LOG_RECORDS_QUEUED_TOTAL = Counter(
+        "log_records_queued_total",
+        "Log records accepted by the background logging queue",
+    )
+    LOG_RECORDS_DROPPED_TOTAL = Counter(
+        "log_records_dropped_total",
+        "Log records dropped because the background logging queue was full",
+    )
+    LOG_QUEUE_SIZE = Gauge(
+        "log_queue_size",
+        "Log records waiting in the background logging queue",
+        multiprocess_mode="livesum",
+    )
+else:  # pragma: no cover
+    LOG_RECORDS_QUEUED_TOTAL = None
+    LOG_RECORDS_DROPPED_TOTAL = None
+    LOG_QUEUE_SIZE = None
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+try:
+    from prometheus_client import Counter, Histogram
+except ImportError:  # pragma: no cover
+    Counter = None
+    Histogram = None
+
+if Counter and Histogram:
+    EVENT_LOOP_LAG_SECONDS = Histogram(
+        "event_loop_lag_seconds",
+        "Delay between the scheduled and the actual wakeup of the event loop lag probe",
+        buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+    )
+    EVENT_LOOP_BLOCKED_TOTAL = Counter(
+        "event_loop_blocked_total",
+        "Times the event loop was blocked longer than EVENT_LOOP_BLOCKING_THRESHOLD",
+    )
+else:  # pragma: no cover
+    EVENT_LOOP_LAG_SECONDS = None
+    EVENT_LOOP_BLOCKED_TOTAL = None
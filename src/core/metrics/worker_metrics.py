@@ -1,28 +1,36 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
 import logging
 import os
 import time
-from collections.abc import Awaitable, Callable
+from collections.abc import Awaitable, Callable, Sequence
+from datetime import datetime
 from functools import wraps
 from typing import Any, TypeVar
 
 import sentry_sdk
 
 from src.core.logging_ctx import job_context
+from src.core.trace import TRACE_HEADERS_KWARG
 
 logger = logging.getLogger(__name__)
 
 try:
-    from prometheus_client import Counter, Histogram, start_http_server
+    from prometheus_client import Counter, Gauge, Histogram, start_http_server
 except ImportError:  # pragma: no cover
     Counter = None
+    Gauge = None
     Histogram = None
     start_http_server = None
 
 _METRICS_STARTED_PORTS: set[int] = set()
 
-if Counter and Histogram:
+# asyncio.wait_for в ARQ отменяет задачу ровно по job_timeout; отмена раньше — это shutdown
+_TIMEOUT_TOLERANCE_SECONDS = 0.05
+
+if Counter and Gauge and Histogram:
     JOBS_TOTAL = Counter(
         "jobs_total",
         "Total processed jobs",
@@ -33,9 +41,67 @@ if Counter and Histogram:
         "Job duration in seconds",
         labelnames=("job_name",),
     )
+    JOB_PHASE_DURATION_SECONDS = Histogram(
+        "job_phase_duration_seconds",
+        "Offloaded job time by phase: pool_wait, execution, ipc",
+        labelnames=("job_name", "phase"),
+    )
+    JOB_DEDUP_TOTAL = Counter(
+        "job_dedup_total",
+        "Deduplicated job lookups by result (hit, miss, collapsed)",
+        labelnames=("job_name", "result"),
+    )
+    JOB_QUEUE_LENGTH = Gauge(
+        "job_queue_length",
+        "Jobs in the ARQ queue: ready to run or deferred",
+        labelnames=("queue", "state"),
+        multiprocess_mode="max",
+    )
+    JOB_QUEUE_WAIT_SECONDS = Histogram(
+        "job_queue_wait_seconds",
+        "Time from the job's scheduled (enqueue or defer) time to its start",
+        labelnames=("job_name",),
+        buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+    )
+    JOB_RETRIES_TOTAL = Counter(
+        "job_retries_total",
+        "Job starts with job_try > 1",
+        labelnames=("job_name", "job_try"),
+    )
+    JOBS_IN_FLIGHT = Gauge(
+        "jobs_in_flight",
+        "Jobs currently executing",
+        labelnames=("job_name",),
+        multiprocess_mode="livesum",
+    )
+    JOB_TIMEOUTS_TOTAL = Counter(
+        "job_timeouts_total",
+        "Jobs cancelled by the worker's job_timeout",
+        labelnames=("job_name",),
+    )
+    JOB_CONCURRENCY_LIMIT = Gauge(
+        "job_concurrency_limit",
+        "Current adaptive limit of concurrently running jobs",
+        multiprocess_mode="livesum",
+    )
+    JOB_CONCURRENCY_WAITING = Gauge(
+        "job_concurrency_waiting",
+        "Jobs waiting for a concurrency slot by priority",
+        labelnames=("priority",),
+        multiprocess_mode="livesum",
+    )
 else:  # pragma: no cover
     JOBS_TOTAL = None
     JOB_DURATION_SECONDS = None
+    JOB_PHASE_DURATION_SECONDS = None
+    JOB_DEDUP_TOTAL = None
+    JOB_QUEUE_LENGTH = None
+    JOB_QUEUE_WAIT_SECONDS = None
+    JOB_RETRIES_TOTAL = None
+    JOBS_IN_FLIGHT = None
+    JOB_TIMEOUTS_TOTAL = None
+    JOB_CONCURRENCY_LIMIT = None
+    JOB_CONCURRENCY_WAITING = None
 
 T = TypeVar("T", bound=Callable[..., Awaitable[Any]])
 
@@ -66,7 +132,60 @@ def start_metrics_http_server_from_env(env_var: str, *, default_port: int) -> in
     return port
 
 
-def instrument_job(func: T) -> T:
+async def sample_queue_lengths(redis: Any, queue_names: Sequence[str]) -> None:
+    if not JOB_QUEUE_LENGTH:  # pragma: no cover
+        return
+    now_ms = int(time.time() * 1000)
+    async with redis.pipeline(transaction=False) as pipe:
+        for queue_name in queue_names:
+            pipe.zcount(queue_name, "-inf", now_ms)
+            pipe.zcard(queue_name)
+        counts = await pipe.execute()
+    for index, queue_name in enumerate(queue_names):
+        ready, total = counts[index * 2], counts[index * 2 + 1]
+        JOB_QUEUE_LENGTH.labels(queue=queue_name, state="ready").set(ready)
+        JOB_QUEUE_LENGTH.labels(queue=queue_name, state="deferred").set(total - ready)
+
+
+def start_queue_metrics(redis: Any, queue_names: Sequence[str], *, interval: float) -> asyncio.Task | None:
+    if not JOB_QUEUE_LENGTH or interval <= 0:
+        return None
+
+    async def run() -> None:
+        while True:
+            try:
+                await sample_queue_lengths(redis, queue_names)
+            except Exception:
+                logger.warning("Queue length sampling failed", exc_info=True)
+            await asyncio.sleep(interval)
+
+    return asyncio.create_task(run())
+
+
+async def stop_queue_metrics(task: asyncio.Task | None) -> None:
+    if task is not None:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+def _observe_start(ctx: Any, job_name: str, job_try: int | None) -> None:
+    if JOB_QUEUE_WAIT_SECONDS and isinstance(ctx, dict):
+        score = ctx.get("score")
+        enqueue_time = ctx.get("enqueue_time")
+        if score is not None:
+            JOB_QUEUE_WAIT_SECONDS.labels(job_name=job_name).observe(max(time.time() - score / 1000, 0.0))
+        elif isinstance(enqueue_time, datetime):
+            JOB_QUEUE_WAIT_SECONDS.labels(job_name=job_name).observe(max(time.time() - enqueue_time.timestamp(), 0.0))
+    if JOB_RETRIES_TOTAL and job_try and job_try > 1:
+        JOB_RETRIES_TOTAL.labels(job_name=job_name, job_try=str(job_try)).inc()
+
+
+def instrument_job(func: T, *, timeout: float | None = None) -> T:
+    """
+    timeout — job_timeout воркера: отмена задачи к этому сроку считается таймаутом
+    (job_timeouts_total, status="timeout"), более ранняя — status="cancelled".
+    """
     if getattr(func, "_instrumented", False):
         return func
 
@@ -79,8 +198,15 @@ def instrument_job(func: T) -> T:
             job_id = ctx.get("job_id")
             job_try = ctx.get("job_try")
 
+        trace_headers = kwargs.pop(TRACE_HEADERS_KWARG, None)
+        _observe_start(ctx, job_name, job_try)
+        if JOBS_IN_FLIGHT:
+            JOBS_IN_FLIGHT.labels(job_name=job_name).inc()
+
         start = time.perf_counter()
-        with job_context(job_name=job_name, job_id=str(job_id) if job_id else None, job_try=job_try):
+        with job_context(
+            job_name=job_name, job_id=str(job_id) if job_id else None, job_try=job_try, trace_headers=trace_headers
+        ):
             try:
                 result = await func(ctx, *args, **kwargs)
             except Exception as exc:
@@ -88,6 +214,13 @@ def instrument_job(func: T) -> T:
                 if JOBS_TOTAL:
                     JOBS_TOTAL.labels(job_name=job_name, status="error").inc()
                 raise
+            except asyncio.CancelledError:
+                timed_out = timeout is not None and time.perf_counter() - start >= timeout - _TIMEOUT_TOLERANCE_SECONDS
+                if timed_out and JOB_TIMEOUTS_TOTAL:
+                    JOB_TIMEOUTS_TOTAL.labels(job_name=job_name).inc()
+                if JOBS_TOTAL:
+                    JOBS_TOTAL.labels(job_name=job_name, status="timeout" if timed_out else "cancelled").inc()
+                raise
             else:
                 if JOBS_TOTAL:
                     JOBS_TOTAL.labels(job_name=job_name, status="success").inc()
@@ -96,6 +229,8 @@ def instrument_job(func: T) -> T:
                 duration = time.perf_counter() - start
                 if JOB_DURATION_SECONDS:
                     JOB_DURATION_SECONDS.labels(job_name=job_name).observe(duration)
+                if JOBS_IN_FLIGHT:
+                    JOBS_IN_FLIGHT.labels(job_name=job_name).dec()
 
     wrapper._instrumented = True  # type: ignore[attr-defined]
     return wrapper  # type: ignore[return-value]
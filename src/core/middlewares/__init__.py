@@ -1,3 +1,17 @@
+from src.core.middlewares.compression import CompressionMiddleware
+from src.core.middlewares.deadline import DeadlineMiddleware
+from src.core.middlewares.http_metrics import HttpMetricsMiddleware
+from src.core.middlewares.load_shedding import LoadSheddingMiddleware
+from src.core.middlewares.rate_limit import RateLimitMiddleware
 from src.core.middlewares.request_logging import RequestLoggingMiddleware
+from src.core.middlewares.response_cache import ResponseCacheMiddleware
 
-__all__ = ["RequestLoggingMiddleware"]
+__all__ = [
+    "CompressionMiddleware",
+    "DeadlineMiddleware",
+    "HttpMetricsMiddleware",
+    "LoadSheddingMiddleware",
+    "RateLimitMiddleware",
+    "RequestLoggingMiddleware",
+    "ResponseCacheMiddleware",
+]
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import gzip
+import logging
+import time
+import zlib
+from collections.abc import Callable, Sequence
+from typing import Any
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.metrics.http_metrics import HTTP_RESPONSE_COMPRESSION_RATIO, HTTP_RESPONSE_COMPRESSION_SECONDS
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONTENT_TYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "application/problem+json",
+    "application/javascript",
+    "application/xml",
+    "text/",
+    "image/svg+xml",
+)
+
+
+class _GzipStream:
+    def __init__(self, level: int) -> None:
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        # Sync flush: каждый кусок потока (например, сброс выгрузки) сразу доходит до клиента
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliStream:
+    def __init__(self, quality: int) -> None:
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level: int) -> None:
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class Codec:
+    def __init__(self, name: str, compress: Callable[[bytes], bytes], stream: Callable[[], Any]) -> None:
+        self.name = name
+        self.compress = compress
+        self.stream = stream
+
+
+def available_codecs(*, gzip_level: int = 6, brotli_quality: int = 4, zstd_level: int = 3) -> dict[str, Codec]:
+    codecs = {
+        "gzip": Codec(
+            "gzip", lambda data: gzip.compress(data, compresslevel=gzip_level, mtime=0), lambda: _GzipStream(gzip_level)
+        )
+    }
+    if brotli is not None:
+        codecs["br"] = Codec(
+            "br", lambda data: brotli.compress(data, quality=brotli_quality), lambda: _BrotliStream(brotli_quality)
+        )
+    if zstandard is not None:
+        codecs["zstd"] = Codec(
+            "zstd",
+            lambda data: zstandard.ZstdCompressor(level=zstd_level).compress(data),
+            lambda: _ZstdStream(zstd_level),
+        )
+    return codecs
+
+
+class CompressionMiddleware:
+    """
+    Сжимает ответы по Accept-Encoding (zstd, br, gzip — те, что установлены, в порядке encodings).
+    Не сжимает ответы меньше minimum_size, с типом не из content_types, уже закодированные и с
+    Cache-Control: no-transform. StreamingResponse сжимается по кускам с flush после каждого.
+    Тела от offload_threshold байт сжимаются в пуле потоков, чтобы не блокировать event loop.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        content_types: Sequence[str] = DEFAULT_CONTENT_TYPES,
+        encodings: Sequence[str] = ("zstd", "br", "gzip"),
+        offload_threshold: int = 256 * 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        zstd_level: int = 3,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.content_types = tuple(content_type.lower() for content_type in content_types)
+        self.offload_threshold = offload_threshold
+        codecs = available_codecs(gzip_level=gzip_level, brotli_quality=brotli_quality, zstd_level=zstd_level)
+        self.codecs = [codecs[name] for name in encodings if name in codecs]
+        missing = [name for name in encodings if name not in codecs]
+        if missing:
+            logger.info("Response compression without %s: codec is not installed", ", ".join(missing))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        codec = self._negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if codec is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressionResponder(self, codec, send).run(scope, receive)
+
+    def _negotiate(self, accept_encoding: str) -> Codec | None:
+        if not accept_encoding or not self.codecs:
+            return None
+        weights: dict[str, float] = {}
+        for item in accept_encoding.split(","):
+            name, _, params = item.strip().partition(";")
+            weight = 1.0
+            params = params.strip()
+            if params.startswith("q="):
+                try:
+                    weight = float(params[2:])
+                except ValueError:
+                    weight = 0.0
+            weights[name.strip().lower()] = weight
+        best: Codec | None = None
+        best_weight = 0.0
+        for codec in self.codecs:
+            weight = weights.get(codec.name, weights.get("*", 0.0))
+            # При равном q выигрывает порядок encodings
+            if weight > best_weight:
+                best, best_weight = codec, weight
+        return best
+
+    def compressible(self, headers: Headers, status: int) -> bool:
+        if status < 200 or status in (204, 206, 304) or "content-encoding" in headers:
+            return False
+        if "no-transform" in headers.get("cache-control", "").lower():
+            return False
+        content_type = headers.get("content-type", "").lower()
+        return any(content_type.startswith(allowed) or allowed in content_type for allowed in self.content_types)
+
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, codec: Codec, send: Send) -> None:
+        self.middleware = middleware
+        self.codec = codec
+        self.send = send
+        self.start: Message | None = None
+        self.stream: Any = None
+        self.passthrough = False
+        self.original_size = 0
+        self.compressed_size = 0
+        self.cpu_time = 0.0
+
+    async def run(self, scope: Scope, receive: Receive) -> None:
+        await self.middleware.app(scope, receive, self.send_wrapper)
+
+    async def send_wrapper(self, message: Message) -> None:
+        if self.passthrough:
+            await self.send(message)
+            return
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            if not self.middleware.compressible(headers, message["status"]):
+                self.passthrough = True
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.stream is None and not more_body:
+            await self._send_whole(body)
+            return
+
+        if self.stream is None:
+            self.stream = self.codec.stream()
+            headers = self._encoded_headers()
+            del headers["content-length"]
+            await self.send(self.start)
+        chunk = await self._compress(self.stream.compress, body) if body else b""
+        if not more_body:
+            chunk += await self._compress(lambda _: self.stream.finish(), b"")
+            self._observe()
+        await self.send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+    async def _send_whole(self, body: bytes) -> None:
+        if len(body) < self.middleware.minimum_size:
+            self.passthrough = True
+            await self.send(self.start)
+            await self.send({"type": "http.response.body", "body": body})
+            return
+        compressed = await self._compress(self.codec.compress, body)
+        self._observe()
+        headers = self._encoded_headers()
+        headers["content-length"] = str(len(compressed))
+        await self.send(self.start)
+        await self.send({"type": "http.response.body", "body": compressed})
+
+    def _encoded_headers(self) -> MutableHeaders:
+        headers = MutableHeaders(scope=self.start)
+        headers["content-encoding"] = self.codec.name
+        headers.add_vary_header("Accept-Encoding")
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            # Сжатое представление побайтно другое: сильный ETag ослабляется
+            headers["etag"] = "W/" + etag
+        return headers
+
+    async def _compress(self, compress: Callable[[bytes], bytes], data: bytes) -> bytes:
+        self.original_size += len(data)
+        if len(data) >= self.middleware.offload_threshold:
+            compressed, cpu_time = await run_in_threadpool(_timed, compress, data)
+        else:
+            compressed, cpu_time = _timed(compress, data)
+        self.cpu_time += cpu_time
+        self.compressed_size += len(compressed)
+        return compressed
+
+    def _observe(self) -> None:
+        if HTTP_RESPONSE_COMPRESSION_SECONDS:
+            HTTP_RESPONSE_COMPRESSION_SECONDS.labels(encoding=self.codec.name).observe(self.cpu_time)
+        if HTTP_RESPONSE_COMPRESSION_RATIO and self.compressed_size:
+            HTTP_RESPONSE_COMPRESSION_RATIO.labels(encoding=self.codec.name).observe(
+                self.original_size / self.compressed_size
+            )
+
+
+def _timed(compress: Callable[[bytes], bytes], data: bytes) -> tuple[bytes, float]:
+    # CPU-время потока, в котором шло сжатие (в том числе в пуле)
+    start = time.thread_time()
+    compressed = compress(data)
+    return compressed, time.thread_time() - start
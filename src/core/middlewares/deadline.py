@@ -0,0 +1,25 @@
+from __future__ import annotations
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.core.http_resilience import deadline_scope, inbound_budget
+
+
+class DeadlineMiddleware:
+    """
+    Задаёт бюджет времени запроса для исходящих HTTP-вызовов: default_budget секунд или меньше,
+    если вызывающий сервис передал остаток своего бюджета в X-Request-Timeout.
+    """
+
+    def __init__(self, app: ASGIApp, *, default_budget: float | None = None) -> None:
+        self.app = app
+        self.default_budget = default_budget
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with deadline_scope(inbound_budget(Headers(scope=scope), self.default_budget)):
+            await self.app(scope, receive, send)
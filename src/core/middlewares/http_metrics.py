@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Sequence
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.metrics.http_metrics import (
+    HTTP_REQUEST_DURATION_SECONDS,
+    HTTP_REQUEST_SIZE_BYTES,
+    HTTP_REQUESTS_IN_PROGRESS,
+    HTTP_REQUESTS_TOTAL,
+    HTTP_RESPONSE_SIZE_BYTES,
+)
+from src.core.middlewares.routing import route_template
+
+_KNOWN_METHODS = frozenset({"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"})
+
+
+class HttpMetricsMiddleware:
+    def __init__(self, app: ASGIApp, *, excluded_paths: Sequence[str] = ()) -> None:
+        self.app = app
+        self.excluded_paths = frozenset(excluded_paths)
+        self.enabled = HTTP_REQUESTS_TOTAL is not None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.enabled or scope.get("path") in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope.get("method", "GET")
+        if method not in _KNOWN_METHODS:
+            method = "OTHER"
+        route = route_template(scope)
+
+        status_code = 500
+        request_size = 0
+        response_size = 0
+
+        async def receive_wrapper() -> Message:
+            nonlocal request_size
+            message = await receive()
+            if message["type"] == "http.request":
+                request_size += len(message.get("body", b""))
+            return message
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, response_size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                response_size += len(message.get("body", b""))
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method=method, route=route)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            in_progress.dec()
+            HTTP_REQUESTS_TOTAL.labels(method=method, route=route, status_class=f"{status_code // 100}xx").inc()
+            HTTP_REQUEST_DURATION_SECONDS.labels(method=method, route=route).observe(duration)
+            HTTP_REQUEST_SIZE_BYTES.labels(method=method, route=route).observe(
+                max(request_size, _content_length(scope))
+            )
+            HTTP_RESPONSE_SIZE_BYTES.labels(method=method, route=route).observe(response_size)
+
+
+def _content_length(scope: Scope) -> int:
+    value = Headers(scope=scope).get("content-length")
+    if not value or not value.isdigit():
+        return 0
+    return int(value)
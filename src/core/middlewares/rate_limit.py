@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import hashlib
+import math
+import secrets
+from collections.abc import Sequence
+
+from starlette.datastructures import Headers
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.core.config import settings
+from src.core.dependencies import api_key_header
+from src.core.metrics.http_metrics import HTTP_RATE_LIMITED_TOTAL
+from src.core.middlewares.routing import UNMATCHED_ROUTE, matched_route
+from src.core.rate_limit import POLICY_ATTR, RateLimitPolicy, TokenBucketLimiter
+from src.core.responses import error_response
+
+
+class RateLimitMiddleware:
+    """
+    Ограничивает частоту запросов через TokenBucketLimiter из app.state.rate_limiter: политикой
+    маршрута (@rate_limit) или default_policy. Превышение — 429 с Retry-After.
+
+    Адрес клиента берётся из client_ip_header (его выставляет доверенный прокси) или, при
+    trust_client_addr, из scope["client"]. Без них запросы, которые считались бы по IP, не ограничиваются:
+    за балансировщиком scope["client"] — адрес балансировщика, и все клиенты попали бы в одну корзину.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        default_policy: RateLimitPolicy | None = None,
+        excluded_paths: Sequence[str] = (),
+        client_ip_header: str | None = None,
+        trust_client_addr: bool = False,
+    ) -> None:
+        self.app = app
+        self.default_policy = default_policy
+        self.excluded_paths = frozenset(excluded_paths)
+        self.client_ip_header = client_ip_header or None
+        self.trust_client_addr = trust_client_addr
+        # Маршруты не хэшируются, ключ — id: они живут столько же, сколько приложение
+        self._policies: dict[int, RateLimitPolicy | None] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope.get("path") in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        limiter: TokenBucketLimiter | None = getattr(getattr(scope.get("app"), "state", None), "rate_limiter", None)
+        route = matched_route(scope) if limiter is not None else None
+        route_policy = self._route_policy(route) if route is not None else None
+        policy = route_policy or self.default_policy
+        if limiter is None or policy is None:
+            await self.app(scope, receive, send)
+            return
+
+        route_name = getattr(route, "path_format", None) or UNMATCHED_ROUTE
+        identity = route_name if policy.key == "route" else self._client_identity(scope, policy.key)
+        if identity is None:
+            await self.app(scope, receive, send)
+            return
+        # У политики маршрута своя корзина, общий лимит — одна корзина на клиента для всех маршрутов
+        key = f"{route_name if route_policy else '*'}:{policy.key}:{identity}"
+        result = await limiter.acquire(key, policy)
+        if result.allowed:
+            await self.app(scope, receive, send)
+            return
+
+        if HTTP_RATE_LIMITED_TOTAL:
+            HTTP_RATE_LIMITED_TOTAL.labels(route=route_name, key=policy.key).inc()
+        response = error_response(code="RATE_LIMITED", message="Too many requests", status_code=429)
+        response.headers["Retry-After"] = str(max(math.ceil(result.retry_after), 1))
+        response.headers["X-RateLimit-Limit"] = str(policy.capacity)
+        response.headers["X-RateLimit-Remaining"] = "0"
+        await response(scope, receive, send)
+
+    def _client_identity(self, scope: Scope, key: str) -> str | None:
+        headers = Headers(scope=scope)
+        if key == "api_key":
+            api_key = headers.get(api_key_header.model.name)
+            # Ключ ещё не проверен get_api_key: случайный ключ на каждый запрос не должен давать новую корзину.
+            # Действительный ключ один (SECRET_KEY), поэтому его корзина общая для всех клиентов с ключом
+            if api_key and secrets.compare_digest(api_key.encode(), settings.SECRET_KEY.encode()):
+                return hashlib.sha256(api_key.encode()).hexdigest()[:32]
+        if self.client_ip_header:
+            # Последний адрес в списке добавил наш прокси, предыдущие присылает сам клиент
+            forwarded = headers.get(self.client_ip_header, "").rsplit(",", 1)[-1].strip()
+            return forwarded or None
+        if self.trust_client_addr:
+            client = scope.get("client")
+            return client[0] if client else None
+        return None
+
+    def _route_policy(self, route: BaseRoute) -> RateLimitPolicy | None:
+        if id(route) not in self._policies:
+            self._policies[id(route)] = getattr(getattr(route, "endpoint", None), POLICY_ATTR, None)
+        return self._policies[id(route)]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+from collections.abc import Sequence
 from typing import Any
 
 from starlette.datastructures import Headers, MutableHeaders
@@ -31,6 +32,9 @@ class RequestLoggingMiddleware:
         generate_server_uuid: bool = True,
         log_request_body: bool = True,
         log_request_body_max_bytes: int = 10_000,
+        stream_request_body: bool = False,
+        log_request_body_content_types: Sequence[str] | None = None,
+        log_request_body_paths: Sequence[str] | None = None,
     ) -> None:
         self.app = app
         self.logger = logging.getLogger("http.request")
@@ -41,6 +45,9 @@ class RequestLoggingMiddleware:
         self.server_uuid_header = server_uuid_header
         self.log_request_body = log_request_body
         self.log_request_body_max_bytes = log_request_body_max_bytes
+        self.stream_request_body = stream_request_body
+        self.log_request_body_content_types = tuple(ct.lower() for ct in log_request_body_content_types or ())
+        self.log_request_body_paths = tuple(log_request_body_paths or ())
 
         if server_uuid is not None:
             self.server_uuid = parse_uuid(server_uuid)
@@ -54,11 +61,20 @@ class RequestLoggingMiddleware:
             await self.app(scope, receive, send)
             return
 
-        body_bytes = await _receive_all_body(receive)
-        receive_replay = _build_receive_replay(body_bytes, receive)
-
-        request = Request(scope, receive=receive_replay)
         headers = Headers(scope=scope)
+        capture_body = self._should_capture_body(scope, headers)
+
+        body_capture: _BodyCapture | None = None
+        if self.stream_request_body:
+            if capture_body:
+                body_capture = _BodyCapture(max_bytes=self.log_request_body_max_bytes)
+                receive = _build_receive_capture(body_capture, receive)
+        elif capture_body:
+            body_bytes = await _receive_all_body(receive)
+            body_capture = _BodyCapture.from_body(body_bytes, max_bytes=self.log_request_body_max_bytes)
+            receive = _build_receive_replay(body_bytes, receive)
+
+        request = Request(scope, receive=receive)
 
         request_uuid = self._resolve_request_uuid(headers.get(self.request_uuid_header))
         server_uuid = self._resolve_server_uuid(headers.get(self.server_uuid_header))
@@ -80,9 +96,9 @@ class RequestLoggingMiddleware:
             await send(message)
 
         try:
-            await self.app(scope, receive_replay, send_wrapper)
+            await self.app(scope, receive, send_wrapper)
         finally:
-            self._log_request(request, body_bytes, status_code)
+            self._log_request(request, body_capture, status_code)
             request_uuid_ctx.reset(request_uuid_token)
             server_uuid_ctx.reset(server_uuid_token)
 
@@ -96,10 +112,28 @@ class RequestLoggingMiddleware:
             return None
         return parse_uuid(incoming) or self.server_uuid
 
-    def _log_request(self, request: Request, body: bytes, status_code: int | None) -> None:
+    def _should_capture_body(self, scope: Scope, headers: Headers) -> bool:
+        if not self.log_request_body:
+            return False
+
+        if self.log_request_body_paths:
+            path = scope.get("path", "")
+            if not any(path.startswith(prefix) for prefix in self.log_request_body_paths):
+                return False
+
+        if self.log_request_body_content_types:
+            content_type = headers.get("content-type", "").split(";", 1)[0].strip().lower()
+            if not content_type or not any(
+                content_type.startswith(allowed) for allowed in self.log_request_body_content_types
+            ):
+                return False
+
+        return True
+
+    def _log_request(self, request: Request, body_capture: _BodyCapture | None, status_code: int | None) -> None:
         payload: dict[str, Any] = {"url": str(request.url)}
         if self.log_request_body:
-            payload["body"] = _safe_decode_body(body, max_bytes=self.log_request_body_max_bytes)
+            payload["body"] = body_capture.decode() if body_capture else None
 
         extra: dict[str, Any] = {
             "request_method": request.method,
@@ -134,6 +168,42 @@ async def _receive_all_body(receive: Receive) -> bytes:
     return b"".join(chunks)
 
 
+class _BodyCapture:
+    __slots__ = ("max_bytes", "prefix", "total_length")
+
+    def __init__(self, *, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.prefix = bytearray()
+        self.total_length = 0
+
+    @classmethod
+    def from_body(cls, body: bytes, *, max_bytes: int) -> _BodyCapture:
+        capture = cls(max_bytes=max_bytes)
+        capture.feed(body)
+        return capture
+
+    def feed(self, chunk: bytes) -> None:
+        if not chunk:
+            return
+        self.total_length += len(chunk)
+        remaining = self.max_bytes - len(self.prefix)
+        if remaining > 0:
+            self.prefix += chunk[:remaining]
+
+    def decode(self) -> str | None:
+        return _safe_decode_body(bytes(self.prefix), max_bytes=self.max_bytes, total_length=self.total_length)
+
+
+def _build_receive_capture(body_capture: _BodyCapture, receive: Receive) -> Receive:
+    async def capture() -> Message:
+        message = await receive()
+        if message["type"] == "http.request":
+            body_capture.feed(message.get("body", b""))
+        return message
+
+    return capture
+
+
 def _build_receive_replay(body: bytes, receive: Receive) -> Receive:
     sent = False
 
@@ -147,14 +217,15 @@ def _build_receive_replay(body: bytes, receive: Receive) -> Receive:
     return replay
 
 
-def _safe_decode_body(body: bytes, *, max_bytes: int) -> str | None:
-    if not body:
+def _safe_decode_body(body: bytes, *, max_bytes: int, total_length: int | None = None) -> str | None:
+    length = len(body) if total_length is None else total_length
+    if not length:
         return None
     truncated = body[:max_bytes]
     try:
         decoded = truncated.decode("utf-8")
     except UnicodeDecodeError:
-        return f"<non-utf8 body length={len(body)} bytes>"
-    if len(body) > max_bytes:
-        return f"{decoded}<truncated length={len(body)} bytes>"
+        return f"<non-utf8 body length={length} bytes>"
+    if length > max_bytes:
+        return f"{decoded}<truncated length={length} bytes>"
     return decoded
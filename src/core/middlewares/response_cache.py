@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Any
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.routing import BaseRoute
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.dependencies import api_key_header
+from src.core.metrics.http_metrics import HTTP_RESPONSE_CACHE_TOTAL
+from src.core.middlewares.routing import matched_route
+from src.core.response_cache import (
+    CACHE_KEY_PREFIX,
+    CachedResponse,
+    ResponseCache,
+    ResponseCachePolicy,
+    make_etag,
+    route_policy,
+)
+
+# Заголовки ответа, с которыми он не кэшируется
+_UNCACHEABLE_HEADERS = ("set-cookie",)
+_NOT_MODIFIED_HEADERS = (b"etag", b"cache-control", b"vary", b"expires", b"last-modified", b"content-location")
+
+
+class ResponseCacheMiddleware:
+    """
+    Кэширует ответы 200 GET-маршрутов с ResponseCachePolicy и отвечает 304 на совпавший If-None-Match
+    (ETag — хэш тела, если обработчик не задал свой). При попадании обработчик не вызывается.
+    Хранилище — ResponseCache из app.state.response_cache; без него middleware ничего не делает.
+    Тела больше max_body_size не кэшируются и отдаются потоком. Запросы с Authorization, а с Cookie —
+    если его нет в vary политики, проходят мимо кэша.
+    """
+
+    def __init__(self, app: ASGIApp, *, max_body_size: int = 1024 * 1024) -> None:
+        self.app = app
+        self.max_body_size = max_body_size
+        # Маршруты не хэшируются (__eq__ без __hash__), ключ — id: они живут столько же, сколько приложение
+        self._policies: dict[int, ResponseCachePolicy | None] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        cache: ResponseCache | None = getattr(getattr(scope.get("app"), "state", None), "response_cache", None)
+        match = self._match(scope) if cache is not None else None
+        if match is None:
+            await self.app(scope, receive, send)
+            return
+
+        route, policy = match
+        headers = Headers(scope=scope)
+        if _bypass(headers, policy):
+            await self.app(scope, receive, send)
+            return
+
+        key = _cache_key(scope, headers, policy)
+        if_none_match = headers.get("if-none-match")
+        cached = await cache.get(key)
+        if cached is not None:
+            not_modified = _etag_matches(if_none_match, cached.etag)
+            _count(route, "not_modified" if not_modified else "hit")
+            await _send_cached(send, cached, not_modified=not_modified)
+            return
+
+        _count(route, "miss")
+        await self._call_and_store(scope, receive, send, cache, key, policy, if_none_match)
+
+    def _match(self, scope: Scope) -> tuple[BaseRoute, ResponseCachePolicy] | None:
+        route = matched_route(scope)
+        if route is None:
+            return None
+        if id(route) not in self._policies:
+            self._policies[id(route)] = route_policy(route)
+        policy = self._policies[id(route)]
+        return (route, policy) if policy is not None else None
+
+    async def _call_and_store(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send,
+        cache: ResponseCache,
+        key: str,
+        policy: ResponseCachePolicy,
+        if_none_match: str | None,
+    ) -> None:
+        start: Message | None = None
+        chunks: list[bytes] = []
+        size = 0
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, size, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                response_headers = Headers(raw=message["headers"])
+                if message["status"] != 200 or not _storable(response_headers):
+                    passthrough = True
+                    await send(message)
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            chunks.append(message.get("body", b""))
+            size += len(chunks[-1])
+            more_body = message.get("more_body", False)
+            if size > self.max_body_size:
+                # Слишком большой ответ: отдать накопленное и дальше проксировать как есть
+                passthrough = True
+                await send(start)
+                await send({"type": "http.response.body", "body": b"".join(chunks), "more_body": more_body})
+                return
+            if more_body:
+                return
+
+            cached = _build_cached(start, b"".join(chunks), policy)
+            await _send_cached(send, cached, not_modified=_etag_matches(if_none_match, cached.etag))
+            await cache.set(key, cached, policy.ttl)
+
+        await self.app(scope, receive, send_wrapper)
+
+
+def _bypass(headers: Headers, policy: ResponseCachePolicy) -> bool:
+    if "no-cache" in headers.get("cache-control", "") or "authorization" in headers:
+        return True
+    # Ответ на запрос с cookie может зависеть от сессии: кэшируется, только если Cookie входит в vary
+    return "cookie" in headers and not any(name.lower() == "cookie" for name in policy.vary)
+
+
+def _storable(headers: Headers) -> bool:
+    if any(name in headers for name in _UNCACHEABLE_HEADERS):
+        return False
+    directives = headers.get("cache-control", "").lower()
+    return "no-store" not in directives and "private" not in directives and headers.get("vary") != "*"
+
+
+def _build_cached(start: Message, body: bytes, policy: ResponseCachePolicy) -> CachedResponse:
+    headers = MutableHeaders(raw=list(start["headers"]))
+    etag = headers.get("etag") or make_etag(body)
+    headers["etag"] = etag
+    if policy.cache_control and "cache-control" not in headers:
+        headers["cache-control"] = policy.cache_control
+    vary = [*policy.vary, api_key_header.model.name] if policy.vary_api_key else list(policy.vary)
+    for name in vary:
+        headers.add_vary_header(name)
+    return CachedResponse(status=start["status"], headers=headers.raw, body=body, etag=etag)
+
+
+async def _send_cached(send: Send, cached: CachedResponse, *, not_modified: bool) -> None:
+    if not_modified:
+        headers = [(name, value) for name, value in cached.headers if name.lower() in _NOT_MODIFIED_HEADERS]
+        await send({"type": "http.response.start", "status": 304, "headers": headers})
+        await send({"type": "http.response.body", "body": b""})
+        return
+    await send({"type": "http.response.start", "status": cached.status, "headers": cached.headers})
+    await send({"type": "http.response.body", "body": cached.body})
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Слабое сравнение (RFC 9110, 13.1.2)
+    weak = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == weak for candidate in if_none_match.split(","))
+
+
+def _cache_key(scope: Scope, headers: Headers, policy: ResponseCachePolicy) -> str:
+    parts: list[Any] = [scope["path"], sorted(scope.get("query_string", b"").decode("latin-1").split("&"))]
+    parts.extend(headers.get(name, "") for name in policy.vary)
+    if policy.vary_api_key:
+        parts.append(headers.get(api_key_header.model.name, ""))
+    digest = hashlib.sha256(repr(parts).encode()).hexdigest()
+    return f"{CACHE_KEY_PREFIX}:{scope['path']}:{digest}"
+
+
+def _count(route: BaseRoute, result: str) -> None:
+    if HTTP_RESPONSE_CACHE_TOTAL:
+        HTTP_RESPONSE_CACHE_TOTAL.labels(route=getattr(route, "path_format", None) or "", result=result).inc()
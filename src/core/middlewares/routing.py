@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from starlette.routing import BaseRoute, Match
+from starlette.types import Scope
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Результат сопоставления хранится в scope вместе с роутером: смонтированное приложение со своими
+# middleware получает тот же scope, но ищет маршрут в своём роутере
+_ROUTE_MATCH_KEY = "src.route_match"
+
+
+def matched_route(scope: Scope, *, partial: bool = False) -> BaseRoute | None:
+    """
+    Маршрут запроса из app.router.routes: первое полное совпадение, а с partial=True — иначе первое
+    частичное (путь совпал, метод нет). Маршруты перебираются один раз на запрос для всех middleware.
+    """
+    router = getattr(scope.get("app"), "router", None)
+    cached = scope.get(_ROUTE_MATCH_KEY)
+    if cached is None or cached[0] is not router:
+        cached = scope[_ROUTE_MATCH_KEY] = (router, *_match(router, scope))
+    _, route, match = cached
+    if match == Match.FULL or (partial and match == Match.PARTIAL):
+        return route
+    return None
+
+
+def route_template(scope: Scope) -> str:
+    route = matched_route(scope, partial=True)
+    if route is None:
+        return UNMATCHED_ROUTE
+    return getattr(route, "path_format", None) or getattr(route, "path", UNMATCHED_ROUTE)
+
+
+def _match(router, scope: Scope) -> tuple[BaseRoute | None, Match]:
+    partial_route = None
+    for route in getattr(router, "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route, Match.FULL
+        if match == Match.PARTIAL and partial_route is None:
+            partial_route = route
+    return (partial_route, Match.PARTIAL) if partial_route is not None else (None, Match.NONE)
@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import logging
+import math
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+from redis.exceptions import RedisError
+
+from src.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+KEY_PREFIX = "rate"
+POLICY_ATTR = "_rate_limit_policy"
+KEY_TYPES = ("api_key", "ip", "route")
+
+# Token bucket: refill по времени, списание только при разрешении. Дробные значения
+# возвращаются строками — числа Lua в ответе Redis обрезаются до целых.
+_TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """rate запросов в секунду с запасом burst на ключ: API-ключ (или IP без него), IP или маршрут целиком."""
+
+    rate: float
+    burst: int | None = None
+    key: str = "api_key"
+
+    def __post_init__(self) -> None:
+        if self.key not in KEY_TYPES:
+            raise ValueError(f"Unknown rate limit key {self.key!r}, expected one of {KEY_TYPES}")
+
+    @property
+    def capacity(self) -> int:
+        return self.burst if self.burst is not None else max(math.ceil(self.rate), 1)
+
+
+def rate_limit(rate: float, *, burst: int | None = None, key: str = "api_key") -> Callable[[F], F]:
+    """Отдельный лимит для маршрута вместо общего RATE_LIMIT_RATE; ставится под декоратор маршрута."""
+    policy = RateLimitPolicy(rate=rate, burst=burst, key=key)
+
+    def decorator(func: F) -> F:
+        setattr(func, POLICY_ATTR, policy)
+        return func
+
+    return decorator
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    remaining: float
+    retry_after: float
+
+
+class _LocalBucket:
+    __slots__ = ("tokens", "ts")
+
+    def __init__(self, tokens: float, ts: float) -> None:
+        self.tokens = tokens
+        self.ts = ts
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket в Redis (атомарный Lua-скрипт) с локальной копией корзины на процесс.
+
+    Локальная корзина синхронизируется с остатком из Redis после каждого запроса к нему и дальше
+    тратится только запросами этого процесса, поэтому токенов в ней не меньше, чем в общей. Если
+    локально токенов нет — общий лимит тоже исчерпан, и запрос отклоняется без обращения к Redis.
+    Без Redis или при его ошибке лимит считается только локально.
+    """
+
+    def __init__(self, redis: Any | None = None, *, local_max_keys: int = 10_000) -> None:
+        self.redis = redis
+        self.local_max_keys = local_max_keys
+        self._local: OrderedDict[str, _LocalBucket] = OrderedDict()
+        self._script = redis.register_script(_TOKEN_BUCKET_SCRIPT) if redis is not None else None
+
+    async def acquire(self, key: str, policy: RateLimitPolicy) -> RateLimitResult:
+        now = time.time()
+        capacity = policy.capacity
+        bucket = self._bucket(key, capacity, now)
+        bucket.tokens = min(capacity, bucket.tokens + (now - bucket.ts) * policy.rate)
+        bucket.ts = now
+        if bucket.tokens < 1:
+            return RateLimitResult(False, bucket.tokens, (1 - bucket.tokens) / policy.rate)
+
+        if self._script is not None:
+            try:
+                allowed, remaining, retry_after = await self._script(
+                    keys=[f"{KEY_PREFIX}:{key}"], args=[policy.rate, capacity, now]
+                )
+            except RedisError:
+                logger.warning("Rate limiter unavailable, using the local bucket", exc_info=True)
+            else:
+                bucket.tokens = float(remaining)
+                return RateLimitResult(bool(int(allowed)), bucket.tokens, float(retry_after))
+
+        bucket.tokens -= 1
+        return RateLimitResult(True, bucket.tokens, 0.0)
+
+    def _bucket(self, key: str, capacity: int, now: float) -> _LocalBucket:
+        bucket = self._local.get(key)
+        if bucket is None:
+            bucket = self._local[key] = _LocalBucket(capacity, now)
+            while len(self._local) > self.local_max_keys:
+                self._local.popitem(last=False)
+        else:
+            self._local.move_to_end(key)
+        return bucket
+
+
+def create_rate_limiter(redis: Any | None) -> TokenBucketLimiter | None:
+    if not settings.RATE_LIMIT_ENABLED:
+        return None
+    if not (settings.RATE_LIMIT_CLIENT_IP_HEADER or settings.RATE_LIMIT_TRUST_CLIENT_ADDR):
+        logger.warning(
+            "Rate limiting by client IP is off: set RATE_LIMIT_CLIENT_IP_HEADER or RATE_LIMIT_TRUST_CLIENT_ADDR"
+        )
+    return TokenBucketLimiter(redis, local_max_keys=settings.RATE_LIMIT_LOCAL_MAX_KEYS)
+
+
+def default_rate_limit_policy() -> RateLimitPolicy | None:
+    if not settings.RATE_LIMIT_RATE:
+        return None
+    return RateLimitPolicy(rate=settings.RATE_LIMIT_RATE, burst=settings.RATE_LIMIT_BURST, key=settings.RATE_LIMIT_KEY)
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from typing import Any, TypeVar
+
+from redis.exceptions import RedisError
+from starlette.routing import BaseRoute
+
+from src.core.config import settings
+from src.database.cache import LocalLRU
+from src.database.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+CACHE_KEY_PREFIX = "http"
+POLICY_ATTR = "_response_cache_policy"
+
+
+@dataclass(frozen=True)
+class ResponseCachePolicy:
+    """
+    Политика кэширования GET-ответа маршрута. Ставится декоратором cache_response или зависимостью:
+    @router.get(..., dependencies=[Depends(ResponseCachePolicy(ttl=30))]).
+
+    vary_api_key разделяет записи по X-API-KEY: ответ из кэша отдаётся без выполнения обработчика,
+    в том числе без проверки get_api_key, поэтому у маршрутов с ключом его не отключают.
+    """
+
+    ttl: int = 60
+    vary: tuple[str, ...] = ()
+    vary_api_key: bool = True
+    cache_control: str | None = None
+
+    def __call__(self) -> None:
+        # Как зависимость ничего не делает: политику читает ResponseCacheMiddleware
+        return None
+
+
+def cache_response(
+    ttl: int = 60, *, vary: Iterable[str] = (), vary_api_key: bool = True, cache_control: str | None = None
+) -> Callable[[F], F]:
+    policy = ResponseCachePolicy(ttl=ttl, vary=tuple(vary), vary_api_key=vary_api_key, cache_control=cache_control)
+
+    def decorator(func: F) -> F:
+        setattr(func, POLICY_ATTR, policy)
+        return func
+
+    return decorator
+
+
+def route_policy(route: BaseRoute) -> ResponseCachePolicy | None:
+    policy = getattr(getattr(route, "endpoint", None), POLICY_ATTR, None)
+    if policy is not None:
+        return policy
+    for dependency in getattr(route, "dependencies", ()):
+        if isinstance(dependency.dependency, ResponseCachePolicy):
+            return dependency.dependency
+    return None
+
+
+@dataclass
+class CachedResponse:
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+    etag: str = field(default="")
+
+    def encode(self) -> bytes:
+        headers = [[name.decode("latin-1"), value.decode("latin-1")] for name, value in self.headers]
+        return dumps([self.status, headers, self.etag]) + b"\n" + self.body
+
+    @classmethod
+    def decode(cls, raw: bytes) -> CachedResponse:
+        meta, _, body = raw.partition(b"\n")
+        status, headers, etag = loads(meta)
+        return cls(
+            status=status,
+            headers=[(name.encode("latin-1"), value.encode("latin-1")) for name, value in headers],
+            body=body,
+            etag=etag,
+        )
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+class ResponseCache:
+    """Хранилище ответов для ResponseCacheMiddleware: локальный LRU процесса и (опционально) Redis."""
+
+    def __init__(self, redis: Any | None = None, *, local_max_size: int = 1024, local_ttl: float = 5.0) -> None:
+        self.redis = redis
+        self.local_ttl = local_ttl
+        self.local = LocalLRU(max_size=local_max_size)
+
+    async def get(self, key: str) -> CachedResponse | None:
+        cached = self.local.get(key)
+        if cached is not None or self.redis is None:
+            return cached
+        try:
+            raw = await self.redis.get(key)
+        except RedisError:
+            logger.warning("Response cache read failed for %s", key, exc_info=True)
+            return None
+        if raw is None:
+            return None
+        cached = CachedResponse.decode(raw)
+        self.local.set(key, cached, self.local_ttl)
+        return cached
+
+    async def set(self, key: str, cached: CachedResponse, ttl: int) -> None:
+        self.local.set(key, cached, min(self.local_ttl, ttl) if self.redis is not None else ttl)
+        if self.redis is None:
+            return
+        try:
+            await self.redis.set(key, cached.encode(), ex=ttl)
+        except RedisError:
+            logger.warning("Response cache write failed for %s", key, exc_info=True)
+
+
+def create_response_cache(redis: Any | None) -> ResponseCache | None:
+    if not settings.RESPONSE_CACHE_ENABLED:
+        return None
+    return ResponseCache(
+        redis if settings.RESPONSE_CACHE_REDIS else None,
+        local_max_size=settings.RESPONSE_CACHE_LOCAL_MAX_SIZE,
+        local_ttl=settings.RESPONSE_CACHE_LOCAL_TTL,
+    )
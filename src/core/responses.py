@@ -1,16 +1,94 @@
+import json
+import math
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any
+
 from fastapi import status
+from fastapi.encoders import decimal_encoder, jsonable_encoder
 from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+_ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+
+def _default(value: Any) -> Any:
+    # Модели — как прежний model_dump() + jsonable_encoder: Decimal числом, а не строкой JSON-режима pydantic
+    if isinstance(value, Decimal):
+        return decimal_encoder(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    return jsonable_encoder(value)
+
+
+def _finite(value: Any) -> Any:
+    # NaN/Infinity — null, как у orjson
+    if isinstance(value, float):
+        return value if math.isfinite(value) else None
+    if isinstance(value, dict):
+        return {key: _finite(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_finite(item) for item in value]
+    return value
+
+
+def render_json(content: Any) -> bytes:
+    if orjson:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+    # Как JSONResponse.render
+    encoded = jsonable_encoder(content, custom_encoder={BaseModel: lambda model: jsonable_encoder(model.model_dump())})
+    return json.dumps(_finite(encoded), ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode(
+        "utf-8"
+    )
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    JSONResponse на orjson (если установлен): Pydantic-модели, datetime, UUID и dataclass
+    сериализуются без промежуточного jsonable_encoder. Уже готовые bytes отдаются как есть.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return render_json(content)
+
+
+@lru_cache(maxsize=256)
+def _list_adapter(model: type[BaseModel]) -> TypeAdapter:
+    return TypeAdapter(list[model])
+
+
+def _render_data(data: Any) -> bytes:
+    # Список однотипных моделей pydantic-core выгружает одним вызовом, а не model_dump на каждый элемент
+    if orjson and isinstance(data, list) and data and isinstance(data[0], BaseModel):
+        model = type(data[0])
+        if all(type(item) is model for item in data):
+            return render_json(_list_adapter(model).dump_python(data))
+    return render_json(data)
 
 
 def error_response(code: str, message: str, details=None, status_code: int = status.HTTP_500_INTERNAL_SERVER_ERROR):
-    return JSONResponse(
+    return FastJSONResponse(
         status_code=status_code,
         content={"status": "error", "error": {"code": code, "message": message, "details": details or {}}},
     )
 
 
-def success_response(data=None, message="Request processed successfully", status_code=status.HTTP_200_OK):
-    return JSONResponse(
-        status_code=status_code,
-        content={"status": "success", "data": data if data is not None else [], "message": message},
-    )
+def success_response(
+    data=None, message="Request processed successfully", status_code=status.HTTP_200_OK, pagination=None
+):
+    """
+    Конверт SuccessResponse, собранный прямо в bytes: data может быть списком моделей или моделью,
+    без предварительного model_dump.
+    """
+    body = b'{"status":"success","data":' + _render_data(data if data is not None else [])
+    body += b',"message":' + render_json(message)
+    if pagination is not None:
+        body += b',"pagination":' + _render_data(pagination)
+    return FastJSONResponse(status_code=status_code, content=body + b"}")
@@ -10,10 +10,16 @@ class Pagination(BaseModel):
     last_page: int
 
 
+class CursorPagination(BaseModel):
+    per_page: int
+    next_cursor: str | None = None
+    has_more: bool = False
+
+
 class SuccessResponse(BaseModel):
     status: str = "success"
     data: Union[List[Any], Dict] = {}
-    pagination: Pagination | None = None
+    pagination: Pagination | CursorPagination | None = None
     message: str = ""
 
 
@@ -4,16 +4,47 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from src.core.config import settings
-from src.core.middlewares import RequestLoggingMiddleware
+from src.core.http_client import http_clients
+from src.core.logging_config import stop_log_queue
+from src.core.loop_lag import EventLoopLagMonitor
+from src.core.metrics.http_metrics import mark_metrics_process_dead, metrics_endpoint
+from src.core.middlewares import (
+    CompressionMiddleware,
+    DeadlineMiddleware,
+    HttpMetricsMiddleware,
+    LoadSheddingMiddleware,
+    RateLimitMiddleware,
+    RequestLoggingMiddleware,
+    ResponseCacheMiddleware,
+)
+from src.core.rate_limit import create_rate_limiter, default_rate_limit_policy
 from src.core.redis_lifecycle import close_redis_pool, init_redis_pool
+from src.core.response_cache import create_response_cache
+from src.core.responses import FastJSONResponse
 from src.core.sentry import init_sentry
+from src.database import replica_set
+from src.database.cache import create_repository_cache
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_redis_pool(app)
+    app.state.repository_cache = create_repository_cache(app.state.redis)
+    app.state.response_cache = create_response_cache(app.state.redis)
+    app.state.rate_limiter = create_rate_limiter(app.state.redis)
+    app.state.loop_lag_monitor = EventLoopLagMonitor.from_settings()
+    app.state.loop_lag_monitor.start()
+    if replica_set:
+        replica_set.start()
+    await http_clients.start()
     yield
+    await app.state.loop_lag_monitor.stop()
+    await http_clients.aclose()
+    if replica_set:
+        await replica_set.stop()
     await close_redis_pool(app)
+    mark_metrics_process_dead()
+    stop_log_queue()
 
 
 def create_app() -> FastAPI:
@@ -25,6 +56,7 @@ def create_app() -> FastAPI:
         redoc_url=None if settings.is_prod() else "/redoc",
         openapi_url=f"{settings.API_V1_STR}/openapi.json",
         lifespan=lifespan,
+        default_response_class=FastJSONResponse,
     )
     setup_routers(app)
     setup_middlewares(app)
@@ -33,10 +65,21 @@ def create_app() -> FastAPI:
 
 
 def setup_routers(app: FastAPI) -> None:
-    pass
+    if settings.HTTP_METRICS_ENABLED:
+        app.add_route(settings.HTTP_METRICS_PATH, metrics_endpoint, include_in_schema=False)
 
 
 def setup_middlewares(app: FastAPI) -> None:
+    # Самый внутренний: ответы из кэша проходят через CORS, логирование и метрики
+    app.add_middleware(ResponseCacheMiddleware, max_body_size=settings.RESPONSE_CACHE_MAX_BODY_BYTES)
+    # Внутри CORS: браузер должен видеть 429
+    app.add_middleware(
+        RateLimitMiddleware,
+        default_policy=default_rate_limit_policy(),
+        excluded_paths=[settings.HTTP_METRICS_PATH, settings.HEALTHCHECK_PATH],
+        client_ip_header=settings.RATE_LIMIT_CLIENT_IP_HEADER,
+        trust_client_addr=settings.RATE_LIMIT_TRUST_CLIENT_ADDR,
+    )
     app.add_middleware(
         CORSMiddleware,
         allow_origins=settings.CORS_ORIGINS or ["*"],
@@ -44,6 +87,7 @@ def setup_middlewares(app: FastAPI) -> None:
         allow_methods=["*"],
         allow_headers=settings.CORS_HEADERS or ["*"],
     )
+    app.add_middleware(DeadlineMiddleware, default_budget=settings.HTTP_REQUEST_BUDGET)
     app.add_middleware(
         RequestLoggingMiddleware,
         service_name=settings.SERVICE_NAME,
@@ -55,4 +99,30 @@ def setup_middlewares(app: FastAPI) -> None:
         generate_server_uuid=settings.GENERATE_UUID_SERVER,
         log_request_body=settings.LOG_REQUEST_BODY,
         log_request_body_max_bytes=settings.LOG_REQUEST_BODY_MAX_BYTES,
+        stream_request_body=settings.LOG_REQUEST_BODY_STREAMING,
+        log_request_body_content_types=settings.LOG_REQUEST_BODY_CONTENT_TYPES,
+        log_request_body_paths=settings.LOG_REQUEST_BODY_PATHS,
+    )
+    if settings.COMPRESSION_ENABLED:
+        # Снаружи логирования, внутри метрик: http_response_size_bytes считает байты на проводе
+        app.add_middleware(
+            CompressionMiddleware,
+            minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+            content_types=settings.COMPRESSION_CONTENT_TYPES,
+            encodings=settings.COMPRESSION_ENCODINGS,
+            offload_threshold=settings.COMPRESSION_OFFLOAD_THRESHOLD,
+            gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+            brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+            zstd_level=settings.COMPRESSION_ZSTD_LEVEL,
+        )
+    # Снаружи всего, кроме метрик: при перегрузке отказ стоит как можно меньше
+    app.add_middleware(
+        LoadSheddingMiddleware,
+        max_in_flight=settings.LOAD_SHED_MAX_IN_FLIGHT,
+        max_loop_lag=settings.LOAD_SHED_MAX_LOOP_LAG,
+        retry_after=settings.LOAD_SHED_RETRY_AFTER,
+        # Проба оркестратора не должна перезапускать под именно тогда, когда он под нагрузкой
+        excluded_paths=[settings.HTTP_METRICS_PATH, settings.HEALTHCHECK_PATH],
     )
+    if settings.HTTP_METRICS_ENABLED:
+        app.add_middleware(HttpMetricsMiddleware, excluded_paths=[settings.HTTP_METRICS_PATH])
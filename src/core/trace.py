@@ -5,6 +5,8 @@ from uuid import UUID, uuid4
 
 REQUEST_UUID_HEADER = "X-Request-UUID"
 SERVER_UUID_HEADER = "X-Server-UUID"
+# kwargs задачи ARQ, в котором enqueue_jobs передаёт заголовки трассировки; снимается в instrument_job
+TRACE_HEADERS_KWARG = "_trace_headers"
 
 request_uuid_ctx: ContextVar[str | None] = ContextVar("request_uuid", default=None)
 server_uuid_ctx: ContextVar[str | None] = ContextVar("server_uuid", default=None)
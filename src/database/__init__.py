@@ -1,10 +1,17 @@
+import inspect
+from contextlib import asynccontextmanager
 from datetime import datetime
+from typing import Annotated, AsyncIterator
 
-from sqlalchemy import DateTime, func
+from fastapi import Depends
+from sqlalchemy import DateTime, func, make_url
 from sqlalchemy.ext.asyncio import AsyncAttrs, AsyncSession, create_async_engine
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, sessionmaker
 
-from src.core.config import settings
+from src.core.config import PrePingStrategy, settings
+from src.database.instrumentation import InstrumentedQueuePool, instrument_engine
+from src.database.routing import REPLICA_SET_INFO_KEY, ReplicaSet, RoutingSession
+from src.database.unit_of_work import UnitOfWork
 
 
 class Base(AsyncAttrs, DeclarativeBase):
@@ -24,20 +31,75 @@ class Base(AsyncAttrs, DeclarativeBase):
     )
 
 
-engine = create_async_engine(
-    str(settings.DATABASE_URL),
-    pool_size=5,
-    max_overflow=4,
-    pool_pre_ping=True,
-    echo=settings.LOGGING_LEVEL == "DEBUG",
-)
-async_session = sessionmaker(
-    bind=engine,
-    expire_on_commit=False,
-    class_=AsyncSession,
-)
+def _create_engine(url: str, *, name: str):
+    connect_args = {}
+    if make_url(url).get_driver_name() == "asyncpg":
+        connect_args["prepared_statement_cache_size"] = settings.DB_PREPARED_STATEMENT_CACHE_SIZE
+    engine = create_async_engine(
+        url,
+        connect_args=connect_args,
+        query_cache_size=settings.DB_QUERY_CACHE_SIZE,
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING == PrePingStrategy.ALWAYS,
+        pool_logging_name=name,
+        echo=settings.LOGGING_LEVEL == "DEBUG",
+    )
+    return instrument_engine(
+        engine,
+        name=name,
+        slow_query_threshold=settings.DB_SLOW_QUERY_THRESHOLD,
+        pre_ping=settings.DB_POOL_PRE_PING,
+        pre_ping_idle_seconds=settings.DB_POOL_PRE_PING_IDLE_SECONDS,
+    )
+
+
+engine = _create_engine(str(settings.DATABASE_URL), name="primary")
+
+replica_set: ReplicaSet | None = None
+if settings.DATABASE_REPLICA_URLS:
+    replica_set = ReplicaSet(
+        [_create_engine(str(url), name=f"replica-{index}") for index, url in enumerate(settings.DATABASE_REPLICA_URLS)],
+        check_interval=settings.DATABASE_REPLICA_CHECK_INTERVAL,
+    )
+    async_session = sessionmaker(
+        bind=engine,
+        expire_on_commit=False,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        info={REPLICA_SET_INFO_KEY: replica_set},
+    )
+else:
+    async_session = sessionmaker(
+        bind=engine,
+        expire_on_commit=False,
+        class_=AsyncSession,
+    )
+
+
+@asynccontextmanager
+async def transactional_session() -> AsyncIterator[AsyncSession]:
+    async with async_session() as session, UnitOfWork(session):
+        yield session
 
 
 async def get_db() -> AsyncSession:
-    async with async_session() as session:
+    """
+    Сессия запроса в UnitOfWork. Подключать через DBSession: с Depends(get_db) FastAPI >= 0.118
+    выполняет commit уже после отправки ответа, и ошибка commit не доходит до клиента.
+    """
+    async with transactional_session() as session:
         yield session
+
+
+def _function_scope_depends(dependency):
+    # scope="function" (FastAPI >= 0.118) закрывает зависимость до отправки ответа, как делали 0.106–0.117
+    if "scope" in inspect.signature(Depends).parameters:
+        return Depends(dependency, scope="function")
+    return Depends(dependency)
+
+
+DBSession = Annotated[AsyncSession, _function_scope_depends(get_db)]
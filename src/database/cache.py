@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from typing import Any
+
+from redis.exceptions import RedisError
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import instance_state, set_committed_value
+from starlette.requests import Request
+
+from src.core.config import settings
+from src.core.metrics.db_metrics import REPOSITORY_CACHE_REQUESTS_TOTAL
+from src.database.serialization import decoder_for, dumps, loads
+
+logger = logging.getLogger(__name__)
+
+CACHE_KEY_PREFIX = "repo"
+
+Row = tuple[Any, ...]
+
+
+class RowCodec:
+    """Компактное представление строки модели: JSON-массив значений колонок в порядке маппера."""
+
+    def __init__(self, model: type) -> None:
+        mapper = sa_inspect(model)
+        self.model = model
+        self.keys = [attr.key for attr in mapper.column_attrs]
+        self.decoders = [decoder_for(attr.columns[0].type) for attr in mapper.column_attrs]
+
+    def dump(self, obj: Any) -> Row | None:
+        loaded = instance_state(obj).dict
+        if any(key not in loaded for key in self.keys):
+            return None
+        return tuple(loaded[key] for key in self.keys)
+
+    def encode(self, rows: list[Row]) -> bytes:
+        return dumps(rows)
+
+    def decode(self, raw: bytes | str) -> list[Row]:
+        return [
+            tuple(
+                decoder(value) if decoder is not None and value is not None else value
+                for decoder, value in zip(self.decoders, row, strict=True)
+            )
+            for row in loads(raw)
+        ]
+
+    def build(self, row: Row) -> Any:
+        obj = self.model.__mapper__.class_manager.new_instance()
+        for key, value in zip(self.keys, row, strict=True):
+            set_committed_value(obj, key, value)
+        make_transient_to_detached(obj)
+        return obj
+
+
+class LocalLRU:
+    def __init__(self, *, max_size: int = 1024) -> None:
+        self.max_size = max_size
+        self._items: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any | None:
+        item = self._items.get(key)
+        if item is None:
+            return None
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            self._items.pop(key, None)
+            return None
+        self._items.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        if self.max_size <= 0 or ttl <= 0:
+            return
+        self._items[key] = (time.monotonic() + ttl, value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def delete(self, *keys: str) -> None:
+        for key in keys:
+            self._items.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        for key in [key for key in self._items if key.startswith(prefix)]:
+            del self._items[key]
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+class RepositoryCache:
+    """
+    Двухуровневый кэш для CachedRepository: локальный LRU процесса перед Redis.
+
+    Локальный уровень инвалидируется только записями из этого же процесса,
+    поэтому его TTL (local_ttl) ограничивает устаревание между процессами.
+    """
+
+    def __init__(
+        self,
+        redis: Any | None = None,
+        *,
+        default_ttl: int = 60,
+        local_max_size: int = 1024,
+        local_ttl: float = 5.0,
+    ) -> None:
+        self.redis = redis
+        self.default_ttl = default_ttl
+        self.local_ttl = local_ttl
+        self.local = LocalLRU(max_size=local_max_size)
+
+    @staticmethod
+    def row_key(table: str, model_id: Any) -> str:
+        return f"{CACHE_KEY_PREFIX}:{table}:{model_id}"
+
+    @staticmethod
+    def lists_key(table: str) -> str:
+        return f"{CACHE_KEY_PREFIX}:{table}:lists"
+
+    @staticmethod
+    def filters_field(filters: dict[str, Any] | None) -> str:
+        return dumps(sorted((filters or {}).items())).decode()
+
+    async def get(self, table: str, key: str, codec: RowCodec, field: str | None = None) -> list[Row] | None:
+        local_key = f"{key}:{field}" if field else key
+        rows = self.local.get(local_key)
+        if rows is not None:
+            _count(table, "local", "hit")
+            return rows
+        _count(table, "local", "miss")
+
+        if self.redis is None:
+            return None
+
+        try:
+            raw = await (self.redis.hget(key, field) if field else self.redis.get(key))
+        except RedisError:
+            logger.warning("Repository cache read failed for %s", key, exc_info=True)
+            return None
+
+        if raw is None:
+            _count(table, "redis", "miss")
+            return None
+
+        _count(table, "redis", "hit")
+        rows = codec.decode(raw)
+        self.local.set(local_key, rows, self.local_ttl)
+        return rows
+
+    async def set(
+        self, table: str, key: str, codec: RowCodec, rows: list[Row], ttl: int, field: str | None = None
+    ) -> None:
+        local_key = f"{key}:{field}" if field else key
+        self.local.set(local_key, rows, min(self.local_ttl, ttl))
+
+        if self.redis is None:
+            return
+
+        raw = codec.encode(rows)
+        try:
+            if field:
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    pipe.hset(key, field, raw)
+                    pipe.expire(key, ttl)
+                    await pipe.execute()
+            else:
+                await self.redis.set(key, raw, ex=ttl)
+        except RedisError:
+            logger.warning("Repository cache write failed for %s", key, exc_info=True)
+
+    async def invalidate(self, table: str, *model_ids: Any) -> None:
+        keys = [self.row_key(table, model_id) for model_id in model_ids]
+        lists_key = self.lists_key(table)
+
+        self.local.delete(*keys)
+        self.local.delete_prefix(f"{lists_key}:")
+
+        if self.redis is None:
+            return
+
+        try:
+            await self.redis.delete(*keys, lists_key)
+        except RedisError:
+            logger.warning("Repository cache invalidation failed for %s", table, exc_info=True)
+
+
+def _count(table: str, layer: str, result: str) -> None:
+    if REPOSITORY_CACHE_REQUESTS_TOTAL:
+        REPOSITORY_CACHE_REQUESTS_TOTAL.labels(model=table, layer=layer, result=result).inc()
+
+
+def create_repository_cache(redis: Any | None) -> RepositoryCache | None:
+    if not settings.REPOSITORY_CACHE_ENABLED:
+        return None
+    return RepositoryCache(
+        redis,
+        default_ttl=settings.REPOSITORY_CACHE_DEFAULT_TTL,
+        local_max_size=settings.REPOSITORY_CACHE_LOCAL_MAX_SIZE,
+        local_ttl=settings.REPOSITORY_CACHE_LOCAL_TTL,
+    )
+
+
+def get_repository_cache(request: Request) -> RepositoryCache | None:
+    return getattr(request.app.state, "repository_cache", None)
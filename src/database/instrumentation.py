@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import logging
+import time
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine.interfaces import CacheStats
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src.core.config import PrePingStrategy
+from src.core.metrics.db_metrics import (
+    DB_COMPILED_CACHE_TOTAL,
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_CHECKOUT_TIMEOUTS_TOTAL,
+    DB_POOL_CHECKOUT_WAIT_SECONDS,
+    DB_POOL_OVERFLOW,
+    DB_QUERY_DURATION_SECONDS,
+    DB_SLOW_QUERIES_TOTAL,
+)
+
+slow_query_logger = logging.getLogger("db.slow_query")
+
+_QUERY_START_KEY = "query_start_time"
+_CHECKIN_TIME_KEY = "checkin_time"
+
+_CACHE_RESULTS = {
+    CacheStats.CACHE_HIT: "hit",
+    CacheStats.CACHE_MISS: "miss",
+    CacheStats.CACHING_DISABLED: "disabled",
+    CacheStats.NO_CACHE_KEY: "no_key",
+    CacheStats.NO_DIALECT_SUPPORT: "unsupported",
+}
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool, публикующий занятость пула, время ожидания и таймауты checkout."""
+
+    @property
+    def metrics_name(self) -> str:
+        return self._orig_logging_name or "default"
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except exc.TimeoutError:
+            if DB_POOL_CHECKOUT_TIMEOUTS_TOTAL:
+                DB_POOL_CHECKOUT_TIMEOUTS_TOTAL.labels(pool=self.metrics_name).inc()
+            raise
+        finally:
+            if DB_POOL_CHECKOUT_WAIT_SECONDS:
+                DB_POOL_CHECKOUT_WAIT_SECONDS.labels(pool=self.metrics_name).observe(time.perf_counter() - start)
+        self._publish_usage()
+        return record
+
+    def _do_return_conn(self, record) -> None:
+        super()._do_return_conn(record)
+        self._publish_usage()
+
+    def saturation(self) -> float:
+        capacity = self.size() + max(self._max_overflow, 0)
+        return self.checkedout() / capacity if capacity else 0.0
+
+    def _publish_usage(self) -> None:
+        if DB_POOL_CHECKED_OUT:
+            DB_POOL_CHECKED_OUT.labels(pool=self.metrics_name).set(self.checkedout())
+        if DB_POOL_OVERFLOW:
+            DB_POOL_OVERFLOW.labels(pool=self.metrics_name).set(max(self.overflow(), 0))
+
+
+def instrument_engine(
+    engine: AsyncEngine,
+    *,
+    name: str,
+    slow_query_threshold: float | None = None,
+    pre_ping: PrePingStrategy | str = PrePingStrategy.ALWAYS,
+    pre_ping_idle_seconds: float = 30.0,
+) -> AsyncEngine:
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault(_QUERY_START_KEY, []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+        starts = conn.info.get(_QUERY_START_KEY)
+        if not starts:
+            return
+        duration = time.perf_counter() - starts.pop()
+        if DB_QUERY_DURATION_SECONDS:
+            DB_QUERY_DURATION_SECONDS.labels(pool=name).observe(duration)
+        cache_result = _CACHE_RESULTS.get(getattr(context, "cache_hit", None))
+        if DB_COMPILED_CACHE_TOTAL and cache_result:
+            DB_COMPILED_CACHE_TOTAL.labels(pool=name, result=cache_result).inc()
+        if slow_query_threshold is not None and duration >= slow_query_threshold:
+            if DB_SLOW_QUERIES_TOTAL:
+                DB_SLOW_QUERIES_TOTAL.labels(pool=name).inc()
+            slow_query_logger.warning(
+                "Slow query",
+                extra={"pool": name, "duration": round(duration, 6), "statement": statement[:2000]},
+            )
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context: Any) -> None:
+        conn = context.connection
+        if conn is not None and conn.info.get(_QUERY_START_KEY):
+            conn.info[_QUERY_START_KEY].pop()
+
+    if PrePingStrategy(pre_ping) is PrePingStrategy.IDLE:
+        _install_idle_pre_ping(engine, pre_ping_idle_seconds)
+
+    return engine
+
+
+def _install_idle_pre_ping(engine: AsyncEngine, idle_seconds: float) -> None:
+    sync_engine = engine.sync_engine
+
+    @event.listens_for(sync_engine.pool, "checkin")
+    def on_checkin(dbapi_connection, connection_record) -> None:
+        connection_record.info[_CHECKIN_TIME_KEY] = time.monotonic()
+
+    @event.listens_for(sync_engine.pool, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        checkin_time = connection_record.info.get(_CHECKIN_TIME_KEY)
+        if checkin_time is None or time.monotonic() - checkin_time < idle_seconds:
+            return
+        try:
+            ping_ok = sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception:
+            ping_ok = False
+        if not ping_ok:
+            raise exc.DisconnectionError("Idle connection failed pre-ping")
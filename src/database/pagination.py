@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any
+
+from src.core.exceptions import InvalidCursorException
+from src.core.schema import CursorPagination
+from src.database.serialization import decoder_for, dumps, loads
+
+
+@dataclass
+class KeysetPage:
+    items: list[Any]
+    per_page: int
+    next_cursor: str | None = None
+
+    @property
+    def has_more(self) -> bool:
+        return self.next_cursor is not None
+
+    def pagination(self) -> CursorPagination:
+        return CursorPagination(per_page=self.per_page, next_cursor=self.next_cursor, has_more=self.has_more)
+
+
+def encode_cursor(values: Sequence[Any], *, order_by: str, descending: bool) -> str:
+    raw = dumps({"o": order_by, "d": descending, "v": list(values)})
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, *, order_by: str, descending: bool, columns: Sequence[Any]) -> list[Any]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = loads(raw)
+        values = payload["v"]
+        if payload["o"] != order_by or payload["d"] != descending or len(values) != len(columns):
+            raise InvalidCursorException()
+        decoded = []
+        for column, value in zip(columns, values, strict=True):
+            decoder = decoder_for(column.type)
+            decoded.append(decoder(value) if decoder is not None and value is not None else value)
+        return decoded
+    # ArithmeticError: decimal.InvalidOperation из подменённого значения Numeric-колонки
+    except (binascii.Error, ValueError, TypeError, KeyError, ArithmeticError):
+        raise InvalidCursorException()
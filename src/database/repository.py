@@ -1,8 +1,16 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any, Callable, Dict, List, Tuple
 
-from sqlalchemy import delete, insert, select, update
+from sqlalchemy import bindparam, delete, insert, literal, select, tuple_, update
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql.expression import ClauseElement
+
+from src.core.exceptions import InvalidPageSizeException
+from src.database.cache import RepositoryCache, RowCodec
+from src.database.pagination import KeysetPage, decode_cursor, encode_cursor
+from src.database.unit_of_work import get_unit_of_work
 
 
 class AbstractRepository(ABC):
@@ -26,41 +34,402 @@ class AbstractRepository(ABC):
     async def delete_one(self, profile_id: int):
         raise NotImplementedError
 
+    @abstractmethod
+    async def add_many(self, rows: Sequence[Dict[str, Any]]):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def upsert_many(self, rows: Sequence[Dict[str, Any]]):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def update_many(self, rows: Sequence[Dict[str, Any]]):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_many(self, model_ids: Sequence[int]):
+        raise NotImplementedError
+
+
+def _chunked(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    if size <= 0:
+        raise ValueError("chunk_size must be positive")
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _has_sql_expressions(data: Dict[str, Any]) -> bool:
+    # Выражения (Post.views + 1, func.now()) нельзя передать через bindparam: для них оператор строится без кэша
+    return any(isinstance(value, ClauseElement) for value in data.values())
+
+
+# Значения в закэшированных UPDATE/DELETE приходят через bindparam, которые ORM не умеет
+# вычислять в Python ("evaluate"): identity map синхронизируется из RETURNING/fetch.
+_UPDATE_OPTIONS = {"synchronize_session": False, "populate_existing": True}
+_DELETE_OPTIONS = {"synchronize_session": "fetch"}
+
 
 class BaseRepository(AbstractRepository):
+    """
+    Операторы строятся один раз на модель и набор полей фильтра/данных и переиспользуются
+    с bindparam: SQLAlchemy не пересобирает конструкцию и не считает cache key заново.
+    """
+
+    bulk_chunk_size: int = 1000
+    _statements: Dict[Tuple[Any, ...], Any] = {}
+
     def __init__(self, model, session: AsyncSession):
         self.model = model
         self.session = session
 
     async def add_one(self, data: dict):
-        stmt = insert(self.model).values(**data).returning(self.model)
-        res = await self.session.execute(stmt)
-        await self.session.commit()
+        if _has_sql_expressions(data):
+            res = await self.session.execute(insert(self.model).values(**data).returning(self.model))
+        else:
+            stmt = self._statement(
+                "add_one",
+                tuple(sorted(data)),
+                lambda: (
+                    insert(self.model)
+                    .values({field: bindparam(f"value_{field}") for field in data})
+                    .returning(self.model)
+                ),
+            )
+            res = await self.session.execute(stmt, {f"value_{field}": value for field, value in data.items()})
+        await self._commit()
         return res.scalar_one()
 
     async def find_all(self, filters: Dict[str, Any] = None):
-        stmt = select(self.model)
+        stmt, params = self._filtered_select(filters)
+        res = await self.session.execute(stmt, params)
+        return res.scalars().all()
 
-        if filters:
-            for field, value in filters.items():
-                stmt = stmt.where(getattr(self.model, field) == value)
+    async def find_page(
+        self,
+        filters: Dict[str, Any] = None,
+        *,
+        limit: int = 50,
+        cursor: str | None = None,
+        order_by: str = "id",
+        descending: bool = False,
+        columns: Sequence[str] | None = None,
+    ) -> KeysetPage:
+        if limit < 1:
+            raise InvalidPageSizeException()
+        order_column = getattr(self.model, order_by)
+        key_columns = [order_column] if order_by == "id" else [order_column, self.model.id]
+
+        stmt = self._apply_filters(self._select(columns, key_columns), filters)
+        if cursor:
+            values = decode_cursor(cursor, order_by=order_by, descending=descending, columns=key_columns)
+            key = tuple_(*key_columns)
+            bound = tuple_(*(literal(value, column.type) for column, value in zip(key_columns, values, strict=True)))
+            stmt = stmt.where(key < bound if descending else key > bound)
+        stmt = stmt.order_by(*(column.desc() if descending else column.asc() for column in key_columns))
+        stmt = stmt.limit(limit + 1)
 
         res = await self.session.execute(stmt)
-        return res.scalars().all()
+        items = list(res.scalars().all() if columns is None else res.mappings().all())
+
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            last = items[-1]
+            values = [last[column.key] if columns else getattr(last, column.key) for column in key_columns]
+            next_cursor = encode_cursor(values, order_by=order_by, descending=descending)
+        return KeysetPage(items=items, per_page=limit, next_cursor=next_cursor)
+
+    async def stream_all(
+        self,
+        filters: Dict[str, Any] = None,
+        *,
+        columns: Sequence[str] | None = None,
+        order_by: str | None = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Any]:
+        stmt = self._apply_filters(self._select(columns), filters)
+        if order_by:
+            stmt = stmt.order_by(getattr(self.model, order_by))
+        stmt = stmt.execution_options(yield_per=batch_size)
+
+        result = await self.session.stream(stmt)
+        rows = result.scalars() if columns is None else result.mappings()
+        async for row in rows:
+            yield row
 
     async def get_one(self, model_id: int):
-        stmt = select(self.model).where(self.model.id == model_id)
-        res = await self.session.execute(stmt)
+        stmt = self._statement("get_one", (), lambda: select(self.model).where(self.model.id == bindparam("model_id")))
+        res = await self.session.execute(stmt, {"model_id": model_id})
         return res.scalar_one_or_none()
 
     async def update_one(self, model_id: int, data: Dict[str, Any]):
-        stmt = update(self.model).where(self.model.id == model_id).values(**data).returning(self.model)
-        res = await self.session.execute(stmt)
-        await self.session.commit()
+        if _has_sql_expressions(data):
+            stmt = update(self.model).where(self.model.id == model_id).values(**data).returning(self.model)
+            res = await self.session.execute(stmt, execution_options=_UPDATE_OPTIONS)
+        else:
+            stmt = self._statement(
+                "update_one",
+                tuple(sorted(data)),
+                lambda: (
+                    update(self.model)
+                    .where(self.model.id == bindparam("model_id"))
+                    .values({field: bindparam(f"value_{field}") for field in data})
+                    .returning(self.model)
+                ),
+            )
+            params = {f"value_{field}": value for field, value in data.items()}
+            params["model_id"] = model_id
+            res = await self.session.execute(stmt, params, execution_options=_UPDATE_OPTIONS)
+        await self._commit()
         return res.scalar_one_or_none()
 
     async def delete_one(self, profile_id: int):
-        stmt = delete(self.model).where(self.model.id == profile_id)
-        res = await self.session.execute(stmt)
-        await self.session.commit()
+        stmt = self._statement(
+            "delete_one", (), lambda: delete(self.model).where(self.model.id == bindparam("model_id"))
+        )
+        res = await self.session.execute(stmt, {"model_id": profile_id}, execution_options=_DELETE_OPTIONS)
+        await self._commit()
         return res.rowcount > 0
+
+    async def add_many(
+        self, rows: Sequence[Dict[str, Any]], *, chunk_size: int | None = None, return_ids: bool = False
+    ) -> List[Any]:
+        returning = self.model.id if return_ids else self.model
+        results: List[Any] = []
+        for chunk in _chunked(rows, chunk_size or self.bulk_chunk_size):
+            res = await self.session.execute(insert(self.model).returning(returning), list(chunk))
+            results.extend(res.scalars().all())
+            await self._commit()
+        return results
+
+    async def upsert_many(
+        self,
+        rows: Sequence[Dict[str, Any]],
+        *,
+        conflict_columns: Sequence[str] = ("id",),
+        update_columns: Sequence[str] | None = None,
+        chunk_size: int | None = None,
+        return_ids: bool = False,
+    ) -> List[Any]:
+        if not rows:
+            return []
+
+        if update_columns is None:
+            update_columns = [column for column in rows[0] if column not in conflict_columns]
+        stmt = self._upsert_statement(conflict_columns, update_columns, return_ids)
+
+        results: List[Any] = []
+        for chunk in _chunked(rows, chunk_size or self.bulk_chunk_size):
+            res = await self.session.execute(stmt, list(chunk), execution_options={"populate_existing": True})
+            results.extend(res.scalars().all())
+            await self._commit()
+        return results
+
+    async def update_many(self, rows: Sequence[Dict[str, Any]], *, chunk_size: int | None = None) -> None:
+        for chunk in _chunked(rows, chunk_size or self.bulk_chunk_size):
+            await self.session.execute(update(self.model), list(chunk))
+            await self._commit()
+
+    async def delete_many(self, model_ids: Sequence[int], *, chunk_size: int | None = None) -> int:
+        stmt = self._statement(
+            "delete_many",
+            (),
+            lambda: delete(self.model).where(self.model.id.in_(bindparam("model_ids", expanding=True))),
+        )
+        deleted = 0
+        for chunk in _chunked(model_ids, chunk_size or self.bulk_chunk_size):
+            res = await self.session.execute(stmt, {"model_ids": list(chunk)}, execution_options=_DELETE_OPTIONS)
+            deleted += res.rowcount
+            await self._commit()
+        return deleted
+
+    async def _commit(self) -> None:
+        if get_unit_of_work(self.session) is None:
+            await self.session.commit()
+
+    def _select(self, columns: Sequence[str] | None, required_columns: Sequence[Any] = ()):
+        if columns is None:
+            return select(self.model)
+        selected = [getattr(self.model, column) for column in columns]
+        selected += [column for column in required_columns if column.key not in columns]
+        return select(*selected)
+
+    def _apply_filters(self, stmt, filters: Dict[str, Any] | None):
+        if filters:
+            for field, value in filters.items():
+                stmt = stmt.where(getattr(self.model, field) == value)
+        return stmt
+
+    def _statement(self, kind: str, shape: Tuple[Any, ...], build: Callable[[], Any]):
+        key = (self.model, kind, shape)
+        stmt = self._statements.get(key)
+        if stmt is None:
+            stmt = self._statements[key] = build()
+        return stmt
+
+    def _filtered_select(self, filters: Dict[str, Any] | None):
+        filters = filters or {}
+        # None сравнивается через IS NULL, поэтому входит в форму оператора, а не в параметры
+        shape = tuple(sorted((field, value is None) for field, value in filters.items()))
+
+        def build():
+            stmt = select(self.model)
+            for field, is_null in shape:
+                column = getattr(self.model, field)
+                stmt = stmt.where(column.is_(None) if is_null else column == bindparam(f"filter_{field}"))
+            return stmt
+
+        stmt = self._statement("find_all", shape, build)
+        return stmt, {f"filter_{field}": value for field, value in filters.items() if value is not None}
+
+    def _upsert_statement(self, conflict_columns: Sequence[str], update_columns: Sequence[str], return_ids: bool):
+        stmt = postgresql.insert(self.model)
+        if update_columns:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=list(conflict_columns),
+                set_={column: stmt.excluded[column] for column in update_columns},
+            )
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=list(conflict_columns))
+        return stmt.returning(self.model.id if return_ids else self.model)
+
+
+class CachedRepository(BaseRepository):
+    """
+    Read-through кэш поверх BaseRepository: get_one и find_all читают из RepositoryCache,
+    add_one/update_one/delete_one инвалидируют записи модели.
+
+    Без cache ведёт себя как BaseRepository. TTL задаётся атрибутом cache_ttl в наследнике
+    или аргументом конструктора.
+    """
+
+    cache_ttl: int | None = None
+    _codecs: Dict[type, RowCodec] = {}
+
+    def __init__(
+        self, model, session: AsyncSession, cache: RepositoryCache | None = None, cache_ttl: int | None = None
+    ):
+        super().__init__(model, session)
+        self.cache = cache
+        if cache_ttl is not None:
+            self.cache_ttl = cache_ttl
+        self.table = model.__tablename__
+
+    @property
+    def codec(self) -> RowCodec:
+        codec = self._codecs.get(self.model)
+        if codec is None:
+            codec = self._codecs[self.model] = RowCodec(self.model)
+        return codec
+
+    @property
+    def ttl(self) -> int:
+        if self.cache_ttl is not None:
+            return self.cache_ttl
+        return self.cache.default_ttl
+
+    async def add_one(self, data: dict):
+        obj = await super().add_one(data)
+        if self.cache:
+            await self._invalidate()
+        return obj
+
+    async def find_all(self, filters: Dict[str, Any] = None):
+        if not self._cache_readable():
+            return await super().find_all(filters)
+
+        key = self.cache.lists_key(self.table)
+        field = self.cache.filters_field(filters)
+        rows = await self.cache.get(self.table, key, self.codec, field=field)
+        if rows is not None:
+            return [await self._attach(row) for row in rows]
+
+        objs = await super().find_all(filters)
+        dumped = [self.codec.dump(obj) for obj in objs]
+        if all(row is not None for row in dumped):
+            await self.cache.set(self.table, key, self.codec, dumped, self.ttl, field=field)
+        return objs
+
+    async def get_one(self, model_id: int):
+        if not self._cache_readable():
+            return await super().get_one(model_id)
+
+        key = self.cache.row_key(self.table, model_id)
+        rows = await self.cache.get(self.table, key, self.codec)
+        if rows:
+            return await self._attach(rows[0])
+
+        obj = await super().get_one(model_id)
+        if obj is not None:
+            row = self.codec.dump(obj)
+            if row is not None:
+                await self.cache.set(self.table, key, self.codec, [row], self.ttl)
+        return obj
+
+    async def update_one(self, model_id: int, data: Dict[str, Any]):
+        obj = await super().update_one(model_id, data)
+        if self.cache:
+            await self._invalidate(model_id)
+        return obj
+
+    async def delete_one(self, profile_id: int):
+        deleted = await super().delete_one(profile_id)
+        if self.cache:
+            await self._invalidate(profile_id)
+        return deleted
+
+    async def add_many(
+        self, rows: Sequence[Dict[str, Any]], *, chunk_size: int | None = None, return_ids: bool = False
+    ) -> List[Any]:
+        results = await super().add_many(rows, chunk_size=chunk_size, return_ids=return_ids)
+        if self.cache:
+            await self._invalidate()
+        return results
+
+    async def upsert_many(
+        self,
+        rows: Sequence[Dict[str, Any]],
+        *,
+        conflict_columns: Sequence[str] = ("id",),
+        update_columns: Sequence[str] | None = None,
+        chunk_size: int | None = None,
+        return_ids: bool = False,
+    ) -> List[Any]:
+        results = await super().upsert_many(
+            rows,
+            conflict_columns=conflict_columns,
+            update_columns=update_columns,
+            chunk_size=chunk_size,
+            return_ids=return_ids,
+        )
+        if self.cache:
+            ids = results if return_ids else [obj.id for obj in results]
+            await self._invalidate(*ids)
+        return results
+
+    async def update_many(self, rows: Sequence[Dict[str, Any]], *, chunk_size: int | None = None) -> None:
+        await super().update_many(rows, chunk_size=chunk_size)
+        if self.cache:
+            await self._invalidate(*(row["id"] for row in rows))
+
+    async def delete_many(self, model_ids: Sequence[int], *, chunk_size: int | None = None) -> int:
+        deleted = await super().delete_many(model_ids, chunk_size=chunk_size)
+        if self.cache:
+            await self._invalidate(*model_ids)
+        return deleted
+
+    def _cache_readable(self) -> bool:
+        if not self.cache:
+            return False
+        unit_of_work = get_unit_of_work(self.session)
+        return unit_of_work is None or self.table not in unit_of_work.written_tables
+
+    async def _invalidate(self, *model_ids: Any) -> None:
+        await self.cache.invalidate(self.table, *model_ids)
+        unit_of_work = get_unit_of_work(self.session)
+        if unit_of_work is not None:
+            unit_of_work.written_tables.add(self.table)
+            unit_of_work.after_commit(lambda: self.cache.invalidate(self.table, *model_ids))
+
+    async def _attach(self, row):
+        return await self.session.merge(self.codec.build(row), load=False)
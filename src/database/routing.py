@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import itertools
+import logging
+from collections.abc import Sequence
+from typing import Any
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+REPLICA_SET_INFO_KEY = "replica_set"
+USE_PRIMARY_INFO_KEY = "use_primary"
+
+
+class ReplicaSet:
+    """
+    Пул реплик для чтения с round-robin выбором. Реплика выводится из ротации при ошибке
+    соединения и возвращается после успешной фоновой проверки.
+    """
+
+    def __init__(self, engines: Sequence[AsyncEngine], *, check_interval: float = 5.0) -> None:
+        self.engines = list(engines)
+        self.check_interval = check_interval
+        self._healthy = list(self.engines)
+        self._counter = itertools.count()
+        self._task: asyncio.Task | None = None
+
+        for engine in self.engines:
+            event.listen(engine.sync_engine, "handle_error", self._make_error_listener(engine))
+
+    @property
+    def healthy(self) -> list[AsyncEngine]:
+        return list(self._healthy)
+
+    def choose(self) -> AsyncEngine | None:
+        healthy = self._healthy
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    def mark_unhealthy(self, engine: AsyncEngine) -> None:
+        if engine in self._healthy:
+            logger.warning("Read replica %s taken out of rotation", engine.url.render_as_string())
+            self._healthy = [healthy for healthy in self._healthy if healthy is not engine]
+
+    def mark_healthy(self, engine: AsyncEngine) -> None:
+        if engine not in self._healthy:
+            logger.info("Read replica %s back in rotation", engine.url.render_as_string())
+            self._healthy = [
+                candidate for candidate in self.engines if candidate in self._healthy or candidate is engine
+            ]
+
+    async def check(self) -> None:
+        for engine in self.engines:
+            try:
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 1"))
+            except Exception:
+                self.mark_unhealthy(engine)
+            else:
+                self.mark_healthy(engine)
+
+    def start(self) -> None:
+        if self._task is None and self.engines:
+            self._task = asyncio.create_task(self._run_checks())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def dispose(self) -> None:
+        await self.stop()
+        for engine in self.engines:
+            await engine.dispose()
+
+    async def _run_checks(self) -> None:
+        while True:
+            await asyncio.sleep(self.check_interval)
+            await self.check()
+
+    def _make_error_listener(self, engine: AsyncEngine):
+        def on_error(context: Any) -> None:
+            if context.is_disconnect or context.connection is None:
+                self.mark_unhealthy(engine)
+
+        return on_error
+
+
+class RoutingSession(Session):
+    """
+    Отправляет SELECT на реплики, а записи, SELECT ... FOR UPDATE и flush — на primary.
+    После первой записи сессия «прилипает» к primary (read-your-writes в пределах запроса).
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs: Any):
+        replica_set: ReplicaSet | None = self.info.get(REPLICA_SET_INFO_KEY)
+        if replica_set is None or self.info.get(USE_PRIMARY_INFO_KEY):
+            return super().get_bind(mapper, clause=clause, **kwargs)
+
+        if self._flushing or not _is_plain_select(clause):
+            self.info[USE_PRIMARY_INFO_KEY] = True
+            return super().get_bind(mapper, clause=clause, **kwargs)
+
+        replica = replica_set.choose()
+        if replica is None:
+            return super().get_bind(mapper, clause=clause, **kwargs)
+        return replica.sync_engine
+
+
+def _is_plain_select(clause: Any) -> bool:
+    if clause is None or not getattr(clause, "is_select", False):
+        return False
+    return getattr(clause, "_for_update_arg", None) is None
+
+
+def use_primary(session: Any) -> None:
+    session.info[USE_PRIMARY_INFO_KEY] = True
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import base64
+import json
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+from datetime import time as dt_time
+from decimal import Decimal
+from enum import Enum
+from typing import Any
+from uuid import UUID
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    # LargeBinary и Interval: str() для них не восстанавливается обратно
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return base64.b64encode(value).decode("ascii")
+    if isinstance(value, timedelta):
+        return value.total_seconds()
+    return str(value)
+
+
+def dumps(value: Any) -> bytes:
+    if orjson:
+        return orjson.dumps(value, default=_json_default, option=orjson.OPT_PASSTHROUGH_DATACLASS)
+    return json.dumps(value, default=_json_default, separators=(",", ":")).encode()
+
+
+def loads(raw: bytes | str) -> Any:
+    if orjson:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def decoder_for(column_type: Any) -> Callable[[Any], Any] | None:
+    try:
+        python_type = column_type.python_type
+    except NotImplementedError:
+        return None
+
+    if issubclass(python_type, datetime):
+        return datetime.fromisoformat
+    if issubclass(python_type, date):
+        return date.fromisoformat
+    if issubclass(python_type, dt_time):
+        return dt_time.fromisoformat
+    if issubclass(python_type, (Decimal, UUID, Enum)):
+        return python_type
+    if issubclass(python_type, bytes):
+        return base64.b64decode
+    if issubclass(python_type, timedelta):
+        return _timedelta
+    return None
+
+
+def _timedelta(seconds: float) -> timedelta:
+    return timedelta(seconds=seconds)
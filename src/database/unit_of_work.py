@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+_SESSION_INFO_KEY = "unit_of_work"
+
+
+class UnitOfWork:
+    """
+    Одна транзакция на запрос или задачу: репозитории внутри не вызывают commit,
+    commit выполняется один раз при выходе, при исключении — rollback.
+    Вложенный UnitOfWork на той же сессии переиспользует внешний.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+        self._after_commit: list[Callable[[], Awaitable[Any]]] = []
+        self._owner = False
+        self.written_tables: set[str] = set()
+
+    async def __aenter__(self) -> UnitOfWork:
+        current = get_unit_of_work(self.session)
+        if current is not None:
+            return current
+        self.session.info[_SESSION_INFO_KEY] = self
+        self._owner = True
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if not self._owner:
+            return
+        try:
+            if exc_type is None:
+                await self.session.commit()
+            else:
+                await self.session.rollback()
+        finally:
+            self.session.info.pop(_SESSION_INFO_KEY, None)
+            self._owner = False
+            self.written_tables.clear()
+
+        callbacks, self._after_commit = self._after_commit, []
+        if exc_type is None:
+            for callback in callbacks:
+                try:
+                    await callback()
+                except Exception:
+                    logger.exception("after_commit callback failed")
+
+    def after_commit(self, callback: Callable[[], Awaitable[Any]]) -> None:
+        self._after_commit.append(callback)
+
+    def savepoint(self):
+        return self.session.begin_nested()
+
+
+def get_unit_of_work(session: AsyncSession) -> UnitOfWork | None:
+    return session.info.get(_SESSION_INFO_KEY)
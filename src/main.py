@@ -7,11 +7,16 @@ from src.core.error_handlers import general_exception_handler, http_exception_ha
 from src.core.logging_config import configure_logging
 from src.core.setup_app import create_app
 
-configure_logging(logging_level=settings.LOGGING_LEVEL, service_name=settings.SERVICE_NAME)
+configure_logging(
+    logging_level=settings.LOGGING_LEVEL,
+    service_name=settings.SERVICE_NAME,
+    log_queue=settings.log_queue_config(),
+    fast_formatter=settings.LOG_FAST_FORMATTER,
+)
 app = create_app()
 
 
-@app.get("/healthcheck", include_in_schema=False)
+@app.get(settings.HEALTHCHECK_PATH, include_in_schema=False)
 async def healthcheck():
     return JSONResponse(content={"status": "ok"}, status_code=200)
 
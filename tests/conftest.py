@@ -3,6 +3,8 @@ import sys
 from pathlib import Path
 
 import pytest
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]
 if str(PROJECT_ROOT) not in sys.path:
@@ -14,6 +16,46 @@ os.environ.setdefault(
 )
 
 
+class ModelBase(DeclarativeBase):
+    """Общая база тестовых моделей: таблицы создаются в каждом движке из sqlite_engine_factory."""
+
+
 @pytest.fixture
 def anyio_backend():
     return "asyncio"
+
+
+@pytest.fixture
+async def sqlite_engine_factory(tmp_path):
+    """Создаёт aiosqlite-движки (в памяти или файл в tmp_path) и закрывает их после теста."""
+    pytest.importorskip("aiosqlite")
+    engines = []
+
+    async def create(filename: str | None = None, *, create_tables: bool = True, **kwargs):
+        url = f"sqlite+aiosqlite:///{tmp_path / filename}" if filename else "sqlite+aiosqlite:///:memory:"
+        engine = create_async_engine(url, **kwargs)
+        engines.append(engine)
+        if create_tables:
+            async with engine.begin() as conn:
+                await conn.run_sync(ModelBase.metadata.create_all)
+        return engine
+
+    yield create
+    for engine in engines:
+        await engine.dispose()
+
+
+@pytest.fixture
+async def sqlite_engine(sqlite_engine_factory):
+    return await sqlite_engine_factory()
+
+
+@pytest.fixture
+def session_factory(sqlite_engine):
+    return async_sessionmaker(sqlite_engine, expire_on_commit=False)
+
+
+@pytest.fixture
+async def session(sqlite_engine):
+    async with AsyncSession(sqlite_engine, expire_on_commit=False) as session:
+        yield session
@@ -0,0 +1,138 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import Interval, LargeBinary, Numeric, String, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database.cache import RepositoryCache
+from src.database.repository import CachedRepository
+from tests.conftest import ModelBase
+
+
+class Item(ModelBase):
+    __tablename__ = "cached_item"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(50))
+    price: Mapped[Decimal] = mapped_column(Numeric(10, 2))
+    created_at: Mapped[datetime] = mapped_column()
+    thumbnail: Mapped[bytes | None] = mapped_column(LargeBinary, nullable=True)
+    lifetime: Mapped[timedelta | None] = mapped_column(Interval, nullable=True)
+
+
+class _FakePipeline:
+    def __init__(self, redis: "_FakeRedis") -> None:
+        self.redis = redis
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    def hset(self, key, field, value):
+        self.commands.append(("hset", key, field, value))
+
+    def expire(self, key, ttl):
+        self.commands.append(("expire", key, ttl))
+
+    async def execute(self):
+        for command, key, *args in self.commands:
+            if command == "hset":
+                self.redis.data.setdefault(key, {})[args[0]] = args[1]
+
+
+class _FakeRedis:
+    def __init__(self) -> None:
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def hget(self, key, field):
+        return self.data.get(key, {}).get(field)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+async def _count_queries(session, coro):
+    statements = []
+
+    def before_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    sync_engine = session.bind.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", before_execute)
+    try:
+        result = await coro
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", before_execute)
+    return result, len(statements)
+
+
+@pytest.mark.anyio
+async def test_cached_repository_reads_through_and_invalidates(session):
+    redis = _FakeRedis()
+    cache = RepositoryCache(redis, local_ttl=0)
+    repository = CachedRepository(Item, session, cache)
+    created_at = datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc).replace(tzinfo=None)
+
+    item = await repository.add_one(
+        {
+            "id": 1,
+            "name": "first",
+            "price": Decimal("9.99"),
+            "created_at": created_at,
+            "thumbnail": b"\x89PNG\x00",
+            "lifetime": timedelta(days=1, microseconds=500),
+        }
+    )
+    session.expunge_all()
+
+    first, queries = await _count_queries(session, repository.get_one(item.id))
+    assert queries == 1
+    session.expunge_all()
+
+    cached, queries = await _count_queries(session, repository.get_one(item.id))
+    assert queries == 0
+    assert (cached.id, cached.name, cached.price, cached.created_at) == (1, "first", Decimal("9.99"), created_at)
+    assert (cached.thumbnail, cached.lifetime) == (b"\x89PNG\x00", timedelta(days=1, microseconds=500))
+
+    listed, queries = await _count_queries(session, repository.find_all({"name": "first"}))
+    assert queries == 1
+    session.expunge_all()
+    listed, queries = await _count_queries(session, repository.find_all({"name": "first"}))
+    assert queries == 0
+    assert [obj.id for obj in listed] == [1]
+
+    await repository.update_one(item.id, {"name": "renamed"})
+    session.expunge_all()
+    updated, queries = await _count_queries(session, repository.get_one(item.id))
+    assert queries == 1
+    assert updated.name == "renamed"
+    assert await repository.find_all({"name": "first"}) == []
+
+
+@pytest.mark.anyio
+async def test_cached_repository_local_layer_without_redis(session):
+    repository = CachedRepository(Item, session, RepositoryCache(None), cache_ttl=30)
+    created_at = datetime(2024, 1, 1)
+    await repository.add_one({"id": 1, "name": "first", "price": Decimal("1.00"), "created_at": created_at})
+    await repository.get_one(1)
+
+    cached, queries = await _count_queries(session, repository.get_one(1))
+    assert queries == 0
+    assert cached.name == "first"
+
+    assert await repository.delete_one(1)
+    assert await repository.get_one(1) is None
@@ -0,0 +1,104 @@
+import gzip
+import zlib
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from prometheus_client import REGISTRY
+
+from src.core.middlewares import CompressionMiddleware
+
+PAYLOAD = {"items": [{"id": index, "name": f"item {index}"} for index in range(200)]}
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _app(**kwargs) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500, **kwargs)
+
+    @app.get("/compression-test/items")
+    async def items():
+        return PAYLOAD
+
+    @app.get("/compression-test/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/compression-test/tagged")
+    async def tagged():
+        return PlainTextResponse("x" * 1000, headers={"ETag": '"abc"'})
+
+    @app.get("/compression-test/binary")
+    async def binary():
+        return Response(b"\0" * 1000, media_type="application/octet-stream")
+
+    @app.get("/compression-test/stream")
+    async def stream():
+        async def rows():
+            for index in range(100):
+                yield f'{{"id": {index}}}\n'.encode()
+
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
+
+    return app
+
+
+async def _get(app: FastAPI, path: str, accept_encoding: str = "gzip") -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        return await client.get(path, headers={"Accept-Encoding": accept_encoding})
+
+
+@pytest.mark.anyio
+async def test_large_json_is_gzipped_and_small_or_binary_is_not():
+    app = _app()
+    ratio_count = _sample("http_response_compression_ratio_count", encoding="gzip")
+
+    response = await _get(app, "/compression-test/items")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json() == PAYLOAD
+    assert _sample("http_response_compression_ratio_count", encoding="gzip") == ratio_count + 1
+    assert _sample("http_response_compression_seconds_count", encoding="gzip") >= 1
+
+    for path in ("/compression-test/small", "/compression-test/binary"):
+        assert "content-encoding" not in (await _get(app, path)).headers
+    assert "content-encoding" not in (await _get(app, "/compression-test/items", "gzip;q=0, identity")).headers
+    assert "content-encoding" not in (await _get(app, "/compression-test/items", "deflate")).headers
+
+    tagged = await _get(app, "/compression-test/tagged")
+    assert tagged.headers["etag"] == 'W/"abc"'
+    assert tagged.text == "x" * 1000
+
+
+@pytest.mark.anyio
+async def test_streaming_response_is_compressed_per_chunk_and_offloaded():
+    app = _app(offload_threshold=1)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        request = client.build_request("GET", "/compression-test/stream", headers={"Accept-Encoding": "gzip"})
+        response = await client.send(request, stream=True)
+        raw = b"".join([chunk async for chunk in response.aiter_raw()])
+        await response.aclose()
+
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    lines = gzip.decompress(raw).decode().splitlines()
+    assert lines[0] == '{"id": 0}'
+    assert len(lines) == 100
+
+    # Каждый кусок сброшен Z_SYNC_FLUSH: первая строка читается без конца потока
+    first_line = zlib.decompressobj(16 + zlib.MAX_WBITS).decompress(raw[: len(raw) // 2])
+    assert first_line.startswith(b'{"id": 0}\n')
+
+
+@pytest.mark.anyio
+async def test_brotli_is_preferred_when_installed():
+    pytest.importorskip("brotli")
+    response = await _get(_app(), "/compression-test/items", "gzip, br")
+    assert response.headers["content-encoding"] == "br"
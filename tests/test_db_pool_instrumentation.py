@@ -0,0 +1,48 @@
+import logging
+
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import exc, text
+
+from src.database.instrumentation import InstrumentedQueuePool, instrument_engine
+
+
+def _sample(name: str, pool: str) -> float:
+    return REGISTRY.get_sample_value(name, {"pool": pool}) or 0.0
+
+
+@pytest.mark.anyio
+async def test_pool_metrics_and_slow_queries(sqlite_engine_factory, caplog):
+    engine = await sqlite_engine_factory(
+        "pool.db",
+        create_tables=False,
+        poolclass=InstrumentedQueuePool,
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05,
+        pool_logging_name="test-pool",
+    )
+    instrument_engine(engine, name="test-pool", slow_query_threshold=0.0, pre_ping="idle", pre_ping_idle_seconds=0)
+    timeouts_before = _sample("db_pool_checkout_timeouts_total", "test-pool")
+    slow_before = _sample("db_slow_queries_total", "test-pool")
+
+    try:
+        with caplog.at_level(logging.WARNING, logger="db.slow_query"):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                assert _sample("db_pool_checked_out_connections", "test-pool") == 1
+
+                with pytest.raises(exc.TimeoutError):
+                    async with engine.connect():
+                        pass
+
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+    finally:
+        await engine.dispose()
+
+    assert _sample("db_pool_checked_out_connections", "test-pool") == 0
+    assert _sample("db_pool_checkout_timeouts_total", "test-pool") == timeouts_before + 1
+    assert _sample("db_pool_checkout_wait_seconds_count", "test-pool") >= 3
+    assert _sample("db_slow_queries_total", "test-pool") == slow_before + 2
+    assert [record.statement for record in caplog.records] == ["SELECT 1", "SELECT 1"]
@@ -0,0 +1,95 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.core.export import ExportFormat, export_response
+from src.database.repository import BaseRepository
+from tests.conftest import ModelBase
+
+
+class Reading(ModelBase):
+    __tablename__ = "export_reading"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    sensor: Mapped[str] = mapped_column(String(20))
+    taken_at: Mapped[datetime] = mapped_column()
+    value: Mapped[float | None] = mapped_column()
+
+
+@pytest.fixture
+async def session_factory(session_factory):
+    async with session_factory() as session:
+        await BaseRepository(Reading, session).add_many(
+            [
+                {"id": i, "sensor": f"s{i % 3}", "taken_at": datetime(2024, 1, 1, 0, i), "value": None if i == 2 else i}
+                for i in range(1, 51)
+            ]
+        )
+    return session_factory
+
+
+def _app(session_factory) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/export-test/readings")
+    async def export_readings(format: ExportFormat = ExportFormat.NDJSON, sensor: str | None = None):
+        filters = {"sensor": sensor} if sensor else None
+        return export_response(
+            lambda session: BaseRepository(Reading, session).stream_all(filters, order_by="id", batch_size=7),
+            format=format,
+            filename="readings",
+            session_factory=session_factory,
+            flush_bytes=256,
+        )
+
+    return app
+
+
+@pytest.mark.anyio
+async def test_ndjson_export_streams_in_chunks(session_factory):
+    transport = httpx.ASGITransport(app=_app(session_factory))
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.get("/export-test/readings")
+
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["content-disposition"] == 'attachment; filename="readings.ndjson"'
+    rows = [json.loads(line) for line in response.content.splitlines()]
+    assert [row["id"] for row in rows] == list(range(1, 51))
+    assert rows[1] == {"id": 2, "sensor": "s2", "taken_at": "2024-01-01T00:02:00", "value": None}
+
+    # ASGITransport собирает тело целиком, поэтому куски проверяются на самом итераторе ответа
+    response = export_response(
+        lambda session: BaseRepository(Reading, session).stream_all(order_by="id"),
+        session_factory=session_factory,
+        flush_bytes=256,
+    )
+    chunks = [chunk async for chunk in response.body_iterator]
+    assert len(chunks) > 5
+    assert all(chunk.endswith(b"\n") for chunk in chunks)
+    assert b"".join(chunks).splitlines()[0].startswith(b'{"id":1,')
+
+
+@pytest.mark.anyio
+async def test_csv_export_with_filters_and_mappings(session_factory):
+    transport = httpx.ASGITransport(app=_app(session_factory))
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.get("/export-test/readings", params={"format": "csv", "sensor": "s2"})
+
+    assert response.headers["content-type"] == "text/csv; charset=utf-8"
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "sensor", "taken_at", "value"]
+    assert rows[1] == ["2", "s2", "2024-01-01T00:02:00", ""]
+    assert [int(row[0]) for row in rows[1:]] == list(range(2, 51, 3))
+
+    async with session_factory() as session:
+        mappings = BaseRepository(Reading, session).stream_all(columns=["id", "value"], order_by="id")
+        response = export_response(mappings, format="csv", columns=["value", "id"])
+        body = b"".join([chunk async for chunk in response.body_iterator])
+    assert body.decode().splitlines()[:3] == ["1.0,1", ",2", "3.0,3"]
@@ -0,0 +1,55 @@
+import json
+import logging
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+from src.core.logging_config import FastJobJsonFormatter, FastJsonFormatter, JobJsonFormatter, JsonFormatter
+from src.core.logging_ctx import job_context
+from src.core.trace import request_uuid_ctx
+
+
+def _make_record(created: float, exc_info=None) -> logging.LogRecord:
+    record = logging.LogRecord(
+        name="test",
+        level=logging.WARNING,
+        pathname=__file__,
+        lineno=1,
+        msg="hello %s",
+        args=("world",),
+        exc_info=exc_info,
+    )
+    record.created = created
+    record.payload = {"url": "http://testserver/ping", "body": "привет", 1: "non-str key"}
+    record.request_method = "GET"
+    record.when = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    record.empty = None
+    return record
+
+
+@pytest.mark.parametrize("created", [1_700_000_000.0, 1_700_000_000.5, 1_700_000_000.9999996, 1_700_000_001.000123])
+@pytest.mark.parametrize(
+    ("formatter_class", "fast_formatter_class"),
+    [(JsonFormatter, FastJsonFormatter), (JobJsonFormatter, FastJobJsonFormatter)],
+)
+def test_fast_formatters_match_reference_output(formatter_class, fast_formatter_class, created):
+    formatter = formatter_class(service_name="WEB")
+    fast_formatter = fast_formatter_class(service_name="WEB")
+
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        exc_info = sys.exc_info()
+
+    for record_exc_info in (None, exc_info):
+        token = request_uuid_ctx.set("request-1")
+        try:
+            with job_context(job_id="job-1"):
+                expected = json.loads(formatter.format(_make_record(created, record_exc_info)))
+                actual = json.loads(fast_formatter.format(_make_record(created, record_exc_info)))
+        finally:
+            request_uuid_ctx.reset(token)
+
+        assert actual == expected
+        assert list(actual) == list(expected)
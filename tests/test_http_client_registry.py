@@ -0,0 +1,75 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from prometheus_client import REGISTRY
+
+from src.core.http_client import HttpClientRegistry
+from src.core.trace import request_uuid_ctx
+
+
+async def _serve_echo_request_uuid(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            head = await reader.readuntil(b"\r\n\r\n")
+            headers = dict(line.split(": ", 1) for line in head.decode().split("\r\n")[1:] if ": " in line)
+            body = headers.get("X-Request-UUID", "").encode()
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n%s" % (len(body), body))
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        writer.close()
+
+
+@pytest.fixture
+async def upstream():
+    server = await asyncio.start_server(_serve_echo_request_uuid, "127.0.0.1", 0)
+    host, port = server.sockets[0].getsockname()[:2]
+    yield f"http://{host}:{port}"
+    server.close()
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.anyio
+async def test_registry_reuses_pooled_per_host_clients_with_trace_headers(upstream):
+    registry = HttpClientRegistry()
+    await registry.start()
+    opened_before = _sample("http_client_connections_opened_total", client=upstream)
+    waits_before = _sample("http_client_pool_wait_seconds_count", client=upstream)
+
+    client = registry.get(f"{upstream}/some/path")
+    assert registry.get(upstream) is client
+    assert registry.get() is not client
+
+    request_uuid = str(uuid4())
+    token = request_uuid_ctx.set(request_uuid)
+    try:
+        responses = [await client.get("/ping") for _ in range(3)]
+    finally:
+        request_uuid_ctx.reset(token)
+
+    assert [response.text for response in responses] == [request_uuid] * 3
+    assert _sample("http_client_connections_opened_total", client=upstream) == opened_before + 1
+    assert _sample("http_client_pool_wait_seconds_count", client=upstream) == waits_before + 3
+    assert _sample("http_client_connections", client=upstream, state="idle") == 1
+
+    await registry.aclose()
+    assert client.is_closed
+    assert registry.get(upstream) is not client
+    await registry.aclose()
+
+
+@pytest.mark.anyio
+async def test_shared_client_pool_is_labelled_by_client_name(upstream):
+    registry = HttpClientRegistry()
+    await registry.start()
+    opened_before = _sample("http_client_connections_opened_total", client="default")
+
+    try:
+        await registry.get().get(f"{upstream}/ping")
+        assert _sample("http_client_connections_opened_total", client="default") == opened_before + 1
+        assert _sample("http_client_connections", client="default", state="idle") == 1
+    finally:
+        await registry.aclose()
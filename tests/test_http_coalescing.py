@@ -0,0 +1,120 @@
+import asyncio
+from uuid import uuid4
+
+import httpx
+import pytest
+
+from src.core.http_client import create_traced_async_client
+from src.core.http_coalescing import CoalescingTransport
+from src.core.http_resilience import REQUEST_TIMEOUT_HEADER, DeadlineExceeded, ResilientTransport, deadline_scope
+from src.core.trace import REQUEST_UUID_HEADER, request_uuid_ctx
+
+
+class Upstream:
+    def __init__(self, *, headers=None, delay: float = 0.05) -> None:
+        self.headers = headers or {}
+        self.delay = delay
+        self.requests: list[httpx.Request] = []
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        await asyncio.sleep(self.delay)
+        etag = self.headers.get("ETag")
+        if etag and request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers=self.headers)
+        return httpx.Response(200, headers=self.headers, json={"calls": len(self.requests)})
+
+
+def _client(upstream: Upstream, **kwargs) -> httpx.AsyncClient:
+    transport = CoalescingTransport(httpx.MockTransport(upstream), **kwargs)
+    return create_traced_async_client(transport=transport, base_url="http://upstream.test")
+
+
+async def _get_within(client: httpx.AsyncClient, budget: float) -> httpx.Response:
+    with deadline_scope(budget):
+        return await _get(client, str(uuid4()))
+
+
+async def _get(client: httpx.AsyncClient, request_uuid: str, **kwargs) -> httpx.Response:
+    token = request_uuid_ctx.set(request_uuid)
+    try:
+        return await client.get("/items", **kwargs)
+    finally:
+        request_uuid_ctx.reset(token)
+
+
+@pytest.mark.anyio
+async def test_concurrent_identical_gets_share_one_upstream_call():
+    upstream = Upstream()
+    uuids = [str(uuid4()) for _ in range(5)]
+    async with _client(upstream) as client:
+        responses = await asyncio.gather(*(_get(client, request_uuid) for request_uuid in uuids))
+        other = await _get(client, uuids[0], headers={"Accept-Language": "ru"})
+        await asyncio.gather(
+            *(_get(client, request_uuid, extensions={"coalesce": False}) for request_uuid in uuids[:2])
+        )
+
+    assert [response.json() for response in responses] == [{"calls": 1}] * 5
+    assert upstream.requests[0].headers[REQUEST_UUID_HEADER] == uuids[0]
+    assert other.json() == {"calls": 2}
+    assert len(upstream.requests) == 4
+    # Без TTL ответ не кэшируется
+    async with _client(upstream) as client:
+        assert (await _get(client, uuids[1])).json() == {"calls": 5}
+    assert upstream.requests[-1].headers[REQUEST_UUID_HEADER] == uuids[1]
+
+
+@pytest.mark.anyio
+async def test_requests_with_credentials_outside_the_key_are_not_shared():
+    upstream = Upstream()
+    async with _client(upstream, cache_ttl=60) as client:
+        for header in ("Cookie", "X-API-KEY"):
+            await asyncio.gather(*(_get(client, str(uuid4()), headers={header: user}) for user in ("a", "b", "a")))
+        assert len(upstream.requests) == 6
+        # Authorization входит в ключ по умолчанию: одинаковые токены объединяются, разные — нет
+        await asyncio.gather(
+            *(_get(client, str(uuid4()), headers={"Authorization": f"Bearer {user}"}) for user in ("a", "b", "a"))
+        )
+    assert len(upstream.requests) == 8
+
+
+@pytest.mark.anyio
+async def test_cached_response_is_revalidated_with_etag():
+    upstream = Upstream(headers={"ETag": '"v1"', "Cache-Control": "max-age=0"}, delay=0)
+    async with _client(upstream, cache_ttl=60) as client:
+        first = await _get(client, str(uuid4()))
+        second = await _get(client, str(uuid4()))
+
+    assert first.json() == second.json() == {"calls": 1}
+    assert second.status_code == 200
+    assert upstream.requests[1].headers["If-None-Match"] == '"v1"'
+
+
+@pytest.mark.anyio
+async def test_cache_honours_max_age_and_no_store():
+    fresh = Upstream(headers={"Cache-Control": "max-age=30"}, delay=0)
+    async with _client(fresh, cache_ttl=60) as client:
+        assert [(await _get(client, str(uuid4()))).json()["calls"] for _ in range(3)] == [1, 1, 1]
+        assert (await _get(client, str(uuid4()), headers={"Cache-Control": "no-cache"})).json() == {"calls": 2}
+
+    no_store = Upstream(headers={"Cache-Control": "no-store"}, delay=0)
+    async with _client(no_store, cache_ttl=60) as client:
+        assert [(await _get(client, str(uuid4()))).json()["calls"] for _ in range(2)] == [1, 2]
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("budgets", [(0.05, 5.0), (5.0, 0.05)])
+async def test_each_waiter_keeps_its_own_deadline(budgets):
+    upstream = Upstream(delay=0.2)
+    transport = CoalescingTransport(
+        ResilientTransport(httpx.MockTransport(upstream), deadline_origins=["http://upstream.test"])
+    )
+    async with create_traced_async_client(transport=transport, base_url="http://upstream.test") as client:
+        results = await asyncio.gather(*(_get_within(client, budget) for budget in budgets), return_exceptions=True)
+
+    by_budget = dict(zip(budgets, results))
+    assert isinstance(by_budget[0.05], DeadlineExceeded)
+    assert by_budget[5.0].json() == {"calls": 1}
+    assert len(upstream.requests) == 1
+    # Общий запрос не ограничен бюджетом первого вызывающего
+    assert REQUEST_TIMEOUT_HEADER not in upstream.requests[0].headers
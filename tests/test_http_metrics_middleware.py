@@ -0,0 +1,76 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from prometheus_client import REGISTRY
+
+from src.core.metrics.http_metrics import metrics_endpoint
+from src.core.middlewares.http_metrics import HttpMetricsMiddleware
+from src.core.middlewares.rate_limit import RateLimitMiddleware
+from src.core.middlewares.response_cache import ResponseCacheMiddleware
+from src.core.middlewares.routing import UNMATCHED_ROUTE
+from src.core.rate_limit import TokenBucketLimiter
+from src.core.response_cache import ResponseCache
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.anyio
+async def test_http_metrics_are_labelled_by_route_template():
+    app = FastAPI()
+    app.add_middleware(HttpMetricsMiddleware, excluded_paths=["/metrics"])
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
+    @app.post("/metrics-test/items/{item_id}")
+    async def create_item(item_id: int):
+        return {"item_id": item_id}
+
+    route = "/metrics-test/items/{item_id}"
+    before_total = _sample("http_requests_total", method="POST", route=route, status_class="2xx")
+    before_unmatched = _sample("http_requests_total", method="GET", route=UNMATCHED_ROUTE, status_class="4xx")
+    before_request_bytes = _sample("http_request_size_bytes_sum", method="POST", route=route)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        for item_id in (1, 2, 3):
+            response = await client.post(f"/metrics-test/items/{item_id}", content=b"12345")
+            assert response.status_code == 200
+        assert (await client.get("/metrics-test/missing")).status_code == 404
+        metrics_response = await client.get("/metrics")
+
+    assert _sample("http_requests_total", method="POST", route=route, status_class="2xx") == before_total + 3
+    unmatched = _sample("http_requests_total", method="GET", route=UNMATCHED_ROUTE, status_class="4xx")
+    assert unmatched == before_unmatched + 1
+    assert _sample("http_request_size_bytes_sum", method="POST", route=route) == before_request_bytes + 15
+    assert _sample("http_requests_in_progress", method="POST", route=route) == 0
+    assert _sample("http_requests_total", method="GET", route="/metrics", status_class="2xx") == 0
+
+    assert metrics_response.status_code == 200
+    assert 'route="/metrics-test/items/{item_id}"' in metrics_response.text
+
+
+@pytest.mark.anyio
+async def test_route_is_matched_once_for_all_middlewares(monkeypatch):
+    app = FastAPI()
+    app.state.response_cache = ResponseCache()
+    app.state.rate_limiter = TokenBucketLimiter()
+    app.add_middleware(ResponseCacheMiddleware)
+    app.add_middleware(RateLimitMiddleware)
+    app.add_middleware(HttpMetricsMiddleware)
+
+    @app.get("/metrics-test/matched")
+    async def matched():
+        return {"ok": True}
+
+    route = app.router.routes[-1]
+    calls = []
+    matches = route.matches
+    monkeypatch.setattr(route, "matches", lambda scope: calls.append(scope["path"]) or matches(scope))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        assert (await client.get("/metrics-test/matched")).status_code == 200
+
+    # Один раз для всех middleware и один раз в самом роутере
+    assert calls == ["/metrics-test/matched"] * 2
@@ -0,0 +1,165 @@
+import asyncio
+
+import httpx
+import pytest
+from prometheus_client import REGISTRY
+
+from src.core.http_resilience import (
+    REQUEST_TIMEOUT_HEADER,
+    CircuitBreakerRegistry,
+    CircuitOpenError,
+    DeadlineExceeded,
+    ResilientTransport,
+    RetryPolicy,
+    deadline_scope,
+    inbound_budget,
+)
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _client(handler, *, breakers: CircuitBreakerRegistry | None = None, **kwargs) -> httpx.AsyncClient:
+    transport = ResilientTransport(
+        httpx.MockTransport(handler),
+        retry_policy=RetryPolicy(attempts=3, backoff_base=0.001, backoff_max=0.001),
+        breakers=breakers,
+        **kwargs,
+    )
+    return httpx.AsyncClient(transport=transport, base_url="http://upstream.test")
+
+
+@pytest.mark.anyio
+async def test_retries_only_idempotent_requests():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request.method)
+        if len(calls) < 3:
+            return httpx.Response(503, headers={"Retry-After": "0"})
+        return httpx.Response(200)
+
+    retries_before = _sample("http_client_retries_total", host="upstream.test", reason="503")
+    async with _client(handler) as client:
+        assert (await client.get("/items")).status_code == 200
+        assert calls == ["GET"] * 3
+
+        calls.clear()
+        assert (await client.post("/items", json={})).status_code == 503
+        assert calls == ["POST"]
+
+        calls.clear()
+        response = await client.post("/items", json={}, headers={"Idempotency-Key": "abc"})
+        assert response.status_code == 200
+        assert len(calls) == 3
+
+    assert _sample("http_client_retries_total", host="upstream.test", reason="503") == retries_before + 4
+
+
+@pytest.mark.anyio
+async def test_retry_after_is_capped():
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(503 if len(calls) == 1 else 200, headers={"Retry-After": "3600"})
+
+    transport = ResilientTransport(
+        httpx.MockTransport(handler), retry_policy=RetryPolicy(attempts=2, backoff_max=0.001, retry_after_max=0.01)
+    )
+    async with httpx.AsyncClient(transport=transport, base_url="http://upstream.test") as client:
+        response = await asyncio.wait_for(client.get("/items"), 1)
+    assert response.status_code == 200
+    assert len(calls) == 2
+
+
+@pytest.mark.anyio
+async def test_circuit_breaker_fails_fast_and_recovers():
+    breakers = CircuitBreakerRegistry(failure_threshold=2, reset_timeout=0.05)
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        raise httpx.ConnectError("refused", request=request)
+
+    async with _client(handler, breakers=breakers) as client:
+        with pytest.raises(CircuitOpenError):
+            await client.get("/items")
+        assert calls == 2
+        assert _sample("http_client_circuit_state", host="upstream.test") == 2
+
+        with pytest.raises(CircuitOpenError):
+            await client.post("/items")
+        assert calls == 2
+
+    async with _client(lambda request: httpx.Response(200), breakers=breakers) as client:
+        breakers.get("upstream.test")._opened_at -= 1
+        assert (await client.get("/items")).status_code == 200
+    assert _sample("http_client_circuit_state", host="upstream.test") == 0
+
+
+@pytest.mark.anyio
+async def test_cancelled_half_open_probe_releases_the_breaker():
+    breakers = CircuitBreakerRegistry(failure_threshold=1, reset_timeout=0)
+    breaker = breakers.get("upstream.test")
+    breaker.record_failure()
+
+    async def hanging(request: httpx.Request) -> httpx.Response:
+        await asyncio.sleep(10)
+
+    async with _client(hanging, breakers=breakers) as client:
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(client.get("/items"), 0.01)
+
+    def broken(request: httpx.Request) -> httpx.Response:
+        raise RuntimeError("bug")
+
+    async with _client(broken, breakers=breakers) as client:
+        with pytest.raises(RuntimeError):
+            await client.get("/items")
+
+    async with _client(lambda request: httpx.Response(200), breakers=breakers) as client:
+        assert (await client.get("/items")).status_code == 200
+    assert _sample("http_client_circuit_state", host="upstream.test") == 0
+
+
+@pytest.mark.anyio
+async def test_deadline_caps_timeouts_and_stops_calls():
+    seen = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen["header"] = float(request.headers[REQUEST_TIMEOUT_HEADER])
+        seen["timeout"] = request.extensions["timeout"]
+        return httpx.Response(200)
+
+    async with _client(handler, deadline_origins=["http://upstream.test"]) as client:
+        with deadline_scope(inbound_budget({REQUEST_TIMEOUT_HEADER: "0.5"}, default=30.0)):
+            await client.get("/items", timeout=10.0)
+        assert 0 < seen["header"] <= 0.5
+        assert all(0 < value <= 0.5 for value in seen["timeout"].values())
+
+        missed_before = _sample("http_client_deadline_exceeded_total", host="upstream.test")
+        with deadline_scope(0), pytest.raises(DeadlineExceeded):
+            await client.get("/items")
+        assert _sample("http_client_deadline_exceeded_total", host="upstream.test") == missed_before + 1
+
+
+@pytest.mark.anyio
+async def test_deadline_header_is_sent_only_to_opted_in_origins():
+    seen = {}
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen[request.url.host] = (request.headers.get(REQUEST_TIMEOUT_HEADER), request.extensions["timeout"])
+        return httpx.Response(200)
+
+    async with _client(handler, deadline_origins=["http://internal.test"]) as client:
+        with deadline_scope(0.5):
+            await client.get("http://internal.test/items")
+            await client.get("https://thirdparty.test/items")
+
+    assert seen["internal.test"][0] is not None
+    header, timeout = seen["thirdparty.test"]
+    assert header is None
+    assert all(0 < value <= 0.5 for value in timeout.values())
@@ -0,0 +1,104 @@
+import asyncio
+
+import pytest
+
+from src.core.job_concurrency import (
+    LIMITER_CTX_KEY,
+    AdaptiveConcurrencyLimiter,
+    Priority,
+    job_concurrency,
+    limit_concurrency,
+)
+
+
+@pytest.mark.anyio
+async def test_waiters_are_served_by_priority_and_per_job_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, max_limit=2, window=1000)
+    started = []
+    gates = {name: asyncio.Event() for name in ("first", "second", "low", "high", "export-1", "export-2")}
+
+    @job_concurrency(priority="low")
+    async def low(ctx, name):
+        started.append(name)
+        await gates[name].wait()
+
+    @job_concurrency(priority=Priority.HIGH, max_concurrency=1)
+    async def export(ctx, name):
+        started.append(name)
+        await gates[name].wait()
+
+    ctx = {LIMITER_CTX_KEY: limiter}
+    run_low, run_export = limit_concurrency(low), limit_concurrency(export)
+    tasks = [asyncio.create_task(run_low(ctx, name)) for name in ("first", "second", "low")]
+    await asyncio.sleep(0)
+    tasks += [asyncio.create_task(run_export(ctx, name)) for name in ("export-1", "export-2")]
+    await asyncio.sleep(0)
+    assert started == ["first", "second"]
+
+    gates["first"].set()
+    await asyncio.sleep(0.01)
+    assert started == ["first", "second", "export-1"]
+
+    gates["second"].set()
+    await asyncio.sleep(0.01)
+    # export-2 выше по приоритету, но упирается в max_concurrency=1
+    assert started == ["first", "second", "export-1", "low"]
+
+    gates["export-1"].set()
+    gates["low"].set()
+    gates["export-2"].set()
+    await asyncio.gather(*tasks)
+    assert started[-1] == "export-2"
+    assert limiter.in_flight == 0
+
+
+@pytest.mark.anyio
+async def test_limit_grows_under_contention_and_backs_off_on_errors_and_saturation():
+    saturation = 0.0
+    # Задержки asyncio.sleep нестабильны: рост времени выполнения здесь не проверяется
+    limiter = AdaptiveConcurrencyLimiter(
+        initial_limit=1, max_limit=3, window=2, latency_tolerance=1e9, saturation=lambda: saturation
+    )
+
+    async def run(fail: bool = False):
+        async with limiter.slot("job"):
+            await asyncio.sleep(0.001)
+            if fail:
+                raise RuntimeError("boom")
+
+    await asyncio.gather(run(), run())
+    assert limiter.limit == 2
+    await asyncio.gather(*(run() for _ in range(4)))
+    assert limiter.limit == 3
+
+    await asyncio.gather(run(fail=True), run(fail=True), return_exceptions=True)
+    assert limiter.limit == 2
+
+    saturation = 0.95
+    await asyncio.gather(run(), run())
+    assert limiter.limit == 1
+
+
+def test_limit_backs_off_when_jobs_slow_down():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=4, window=2, latency_tolerance=2.0)
+    for duration in (1.0, 1.0, 5.0, 5.0):
+        limiter._start("job")
+        limiter.release("job", duration)
+    assert limiter.limit == 3
+
+
+@pytest.mark.anyio
+async def test_timeout_starts_after_the_slot_is_acquired():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, max_limit=1, window=1000)
+    ctx = {LIMITER_CTX_KEY: limiter}
+
+    async def job(ctx, duration):
+        await asyncio.sleep(duration)
+        return duration
+
+    run = limit_concurrency(job, timeout=0.1)
+    # Вторая задача ждёт слот дольше timeout, но сама укладывается в него
+    assert await asyncio.gather(run(ctx, 0.08), run(ctx, 0.01), run(ctx, 0.08)) == [0.08, 0.01, 0.08]
+    with pytest.raises(asyncio.TimeoutError):
+        await run(ctx, 1)
+    assert limiter.in_flight == 0
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+from arq.connections import ArqRedis
+from prometheus_client import REGISTRY
+
+from src.core.job_dedup import deduplicate_job, idempotency_key
+from src.core.metrics.worker_metrics import instrument_job
+from src.core.trace import TRACE_HEADERS_KWARG
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def _count(result: str) -> float:
+    return REGISTRY.get_sample_value("job_dedup_total", {"job_name": "build_report", "result": result}) or 0.0
+
+
+@pytest.fixture
+async def redis():
+    redis = ArqRedis(connection_pool=fakeredis.FakeAsyncRedis().connection_pool)
+    yield redis
+    await redis.aclose()
+
+
+@pytest.mark.anyio
+async def test_duplicates_collapse_and_results_are_cached(redis):
+    calls = []
+    release = asyncio.Event()
+
+    async def build_report(ctx, account_id, *, month):
+        calls.append((account_id, month))
+        await release.wait()
+        return {"account_id": account_id, "month": month}
+
+    job = instrument_job(deduplicate_job(build_report, ttl=60))
+    before = {result: _count(result) for result in ("hit", "miss", "collapsed")}
+
+    first = asyncio.create_task(job({"redis": redis}, 7, month="2024-01"))
+    second = asyncio.create_task(job({"redis": redis}, 7, month="2024-01", **{TRACE_HEADERS_KWARG: {}}))
+    await asyncio.sleep(0.01)
+    release.set()
+    assert await first == await second == {"account_id": 7, "month": "2024-01"}
+
+    assert await job({"redis": redis}, 7, month="2024-01") == {"account_id": 7, "month": "2024-01"}
+    await job({"redis": redis}, 8, month="2024-01")
+
+    assert calls == [(7, "2024-01"), (8, "2024-01")]
+    assert _count("miss") - before["miss"] == 2
+    assert _count("collapsed") - before["collapsed"] == 1
+    assert _count("hit") - before["hit"] == 1
+    assert await redis.ttl(idempotency_key("build_report", (7,), {"month": "2024-01"})) == 60
+
+
+@pytest.mark.anyio
+async def test_failures_are_not_cached(redis):
+    attempts = []
+
+    @deduplicate_job
+    async def flaky(ctx):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RuntimeError("first attempt fails")
+        return "ok"
+
+    with pytest.raises(RuntimeError):
+        await flaky({"redis": redis})
+    assert await flaky({"redis": redis}) == "ok"
+    assert await redis.get(idempotency_key("flaky", (), {}) + ":lock") is None
+
+
+@pytest.mark.anyio
+async def test_owner_past_lock_timeout_keeps_the_new_owners_lock(redis):
+    pytest.importorskip("lupa")
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def build_report(ctx, account_id):
+        started.set()
+        await release.wait()
+        return account_id
+
+    job = deduplicate_job(build_report, ttl=60, lock_timeout=0.05)
+    lock_key = idempotency_key("build_report", (1,), {}) + ":lock"
+    slow_owner = asyncio.create_task(job({"redis": redis}, 1))
+    await started.wait()
+    await asyncio.sleep(0.1)
+    # lock истёк, его взял другой воркер
+    await redis.set(lock_key, b"other-worker", px=60_000)
+
+    release.set()
+    assert await slow_owner == 1
+    assert await redis.get(lock_key) == b"other-worker"
@@ -0,0 +1,63 @@
+import logging
+import os
+from uuid import uuid4
+
+import pytest
+from prometheus_client import REGISTRY
+
+from src.core.job_offload import cpu_bound, shutdown_job_executors
+from src.core.logging_ctx import JobContextFilter, get_job_id, job_context
+from src.core.metrics.worker_metrics import instrument_job
+from src.core.trace import get_server_uuid
+
+
+@cpu_bound
+def checksum(values, *, seed=0):
+    record = logging.LogRecord("job", logging.INFO, __file__, 1, "checksum", (), None)
+    JobContextFilter().filter(record)
+    return {
+        "sum": seed + sum(values),
+        "pid": os.getpid(),
+        "job_id": get_job_id(),
+        "job_name": record.job_name,
+        "server_uuid": get_server_uuid(),
+    }
+
+
+@cpu_bound(executor="thread")
+def checksum_in_thread(values):
+    return sum(values), get_job_id()
+
+
+def _phase_count(phase: str) -> float:
+    return REGISTRY.get_sample_value("job_phase_duration_seconds_count", {"job_name": "checksum", "phase": phase}) or 0
+
+
+@pytest.fixture(autouse=True)
+def _executors():
+    yield
+    shutdown_job_executors()
+
+
+@pytest.mark.anyio
+async def test_cpu_bound_job_runs_in_child_process_with_job_context():
+    job_id, server_uuid = str(uuid4()), str(uuid4())
+    before = _phase_count("execution")
+
+    job = instrument_job(checksum)
+    result = await job(
+        {"job_id": job_id, "job_try": 1}, [1, 2, 3], seed=4, _trace_headers={"X-Server-UUID": server_uuid}
+    )
+
+    assert result["sum"] == 10
+    assert result["pid"] != os.getpid()
+    assert (result["job_id"], result["job_name"], result["server_uuid"]) == (job_id, "checksum", server_uuid)
+    assert _phase_count("execution") == before + 1
+    assert _phase_count("pool_wait") >= 1 and _phase_count("ipc") >= 1
+
+
+@pytest.mark.anyio
+async def test_cpu_bound_job_in_thread_pool():
+    job_id = str(uuid4())
+    with job_context(job_name="checksum_in_thread", job_id=job_id):
+        assert await checksum_in_thread({}, [5, 6]) == (11, job_id)
@@ -0,0 +1,80 @@
+import asyncio
+from uuid import uuid4
+
+import pytest
+from arq.connections import ArqRedis
+from arq.worker import Worker
+
+from src.core.job_queue import JobSpec, enqueue_jobs, gather_job_results
+from src.core.logging_ctx import parent_request_uuid_ctx
+from src.core.metrics.worker_metrics import instrument_job
+from src.core.trace import get_server_uuid, request_uuid_ctx, server_uuid_ctx
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+
+@pytest.fixture
+async def redis(monkeypatch):
+    async def skip_redis_info(redis, log_func):
+        pass
+
+    # fakeredis не поддерживает INFO, которым Worker логирует версию сервера
+    monkeypatch.setattr("arq.worker.log_redis_info", skip_redis_info)
+    redis = ArqRedis(connection_pool=fakeredis.FakeAsyncRedis().connection_pool)
+    yield redis
+    await redis.aclose()
+
+
+async def square(ctx, value):
+    return {
+        "value": value * value,
+        "parent": parent_request_uuid_ctx.get(),
+        "server": get_server_uuid(),
+    }
+
+
+async def fail(ctx):
+    raise ValueError("boom")
+
+
+@pytest.mark.anyio
+async def test_enqueue_jobs_in_one_call_and_gather_results(redis):
+    request_uuid, server_uuid = str(uuid4()), str(uuid4())
+    request_token = request_uuid_ctx.set(request_uuid)
+    server_token = server_uuid_ctx.set(server_uuid)
+    try:
+        jobs = await enqueue_jobs(
+            redis,
+            [JobSpec("square", (value,)) for value in range(5)] + [JobSpec("square", (1,), job_id="fixed")],
+        )
+        duplicate = await enqueue_jobs(redis, [JobSpec("square", (2,), job_id="fixed")])
+    finally:
+        request_uuid_ctx.reset(request_token)
+        server_uuid_ctx.reset(server_token)
+
+    assert all(jobs)
+    assert duplicate == [None]
+    assert await redis.zcard("arq:queue") == 6
+
+    worker = Worker(functions=[instrument_job(square)], redis_pool=redis, burst=True, poll_delay=0.01)
+    await worker.main()
+
+    results = await gather_job_results(redis, jobs + duplicate, timeout=1)
+    assert [result["value"] for result in results[:6]] == [0, 1, 4, 9, 16, 1]
+    assert results[6] is None
+    assert {(result["parent"], result["server"]) for result in results[:6]} == {(request_uuid, server_uuid)}
+
+
+@pytest.mark.anyio
+async def test_gather_job_results_reports_failures_and_deadline(redis):
+    failed, pending = await enqueue_jobs(redis, [JobSpec("fail"), JobSpec("never_run", queue_name="idle")])
+    worker = Worker(functions=[instrument_job(fail)], redis_pool=redis, burst=True, poll_delay=0.01, max_tries=1)
+    await worker.main()
+
+    with pytest.raises(ValueError, match="boom"):
+        await gather_job_results(redis, [failed], timeout=1)
+
+    results = await gather_job_results(redis, [failed, pending], timeout=0.05, return_exceptions=True)
+    assert isinstance(results[0], ValueError)
+    assert isinstance(results[1], asyncio.TimeoutError)
@@ -0,0 +1,108 @@
+import json
+import logging
+import sys
+from io import StringIO
+
+from prometheus_client import REGISTRY
+
+from src.core.logging_config import JsonFormatter
+from src.core.logging_queue import BatchingQueueHandler
+from src.core.trace import request_uuid_ctx
+
+
+def _make_record(msg: str) -> logging.LogRecord:
+    return logging.LogRecord(
+        name="test",
+        level=logging.INFO,
+        pathname=__file__,
+        lineno=1,
+        msg=msg,
+        args=(),
+        exc_info=None,
+    )
+
+
+def _make_handler(stream: StringIO, **kwargs) -> BatchingQueueHandler:
+    target = logging.StreamHandler(stream)
+    target.setFormatter(JsonFormatter(service_name="WEB"))
+    return BatchingQueueHandler(target, **kwargs)
+
+
+def test_batching_queue_handler_formats_with_emitting_context():
+    stream = StringIO()
+    handler = _make_handler(stream)
+
+    token = request_uuid_ctx.set("request-1")
+    try:
+        handler.handle(_make_record("first"))
+    finally:
+        request_uuid_ctx.reset(token)
+    handler.handle(_make_record("second"))
+    handler.stop()
+
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [event["message"] for event in events] == ["first", "second"]
+    assert events[0]["uuid"] == "request-1"
+    assert "uuid" not in events[1]
+    assert handler.stats() == {"queued": 2, "pending": 0, "dropped": 0}
+
+
+def test_batching_queue_handler_drops_on_overflow():
+    stream = StringIO()
+    handler = _make_handler(stream, max_size=1, overflow_policy="drop")
+
+    handler.target.acquire()
+    try:
+        for i in range(5):
+            handler.handle(_make_record(f"message {i}"))
+    finally:
+        handler.target.release()
+    handler.stop()
+
+    stats = handler.stats()
+    assert stats["dropped"] >= 3
+    assert stats["queued"] + stats["dropped"] == 5
+    assert len(stream.getvalue().splitlines()) == stats["queued"]
+
+
+def test_batching_queue_handler_writes_synchronously_after_stop():
+    stream = StringIO()
+    handler = _make_handler(stream)
+    handler.stop()
+
+    handler.handle(_make_record("late"))
+
+    assert json.loads(stream.getvalue())["message"] == "late"
+
+
+def test_batching_queue_handler_renders_message_and_traceback_on_emit():
+    stream = StringIO()
+    handler = _make_handler(stream)
+    queued_before = REGISTRY.get_sample_value("log_records_queued_total") or 0.0
+
+    items = ["first"]
+    handler.target.acquire()
+    try:
+        record = _make_record("items: %s")
+        record.args = (items,)
+        handler.handle(record)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            failed = _make_record("failed")
+            failed.exc_info = sys.exc_info()
+            handler.handle(failed)
+        # Запись вызывающего не меняется: её после handlers читают другие (Sentry LoggingIntegration)
+        assert failed.exc_info[0] is ValueError
+        assert record.args == (items,)
+        assert not hasattr(record, "_log_context")
+        items.append("second")
+        assert REGISTRY.get_sample_value("log_records_queued_total") == queued_before + 2
+    finally:
+        handler.target.release()
+    handler.stop()
+
+    events = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert events[0]["message"] == "items: ['first']"
+    assert events[1]["message"] == "failed"
+    assert "ValueError: boom" in events[1]["exception"]
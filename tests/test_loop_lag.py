@@ -0,0 +1,57 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from src.core.loop_lag import EventLoopLagMonitor
+from src.core.trace import request_uuid_ctx
+
+prometheus_client = pytest.importorskip("prometheus_client")
+
+
+def _blocking_handler():
+    time.sleep(0.2)
+
+
+@pytest.mark.anyio
+async def test_blocked_loop_is_reported_with_stack_and_request_uuid(caplog):
+    registry = prometheus_client.REGISTRY
+    lag_count = registry.get_sample_value("event_loop_lag_seconds_count") or 0
+    blocked_total = registry.get_sample_value("event_loop_blocked_total") or 0
+    monitor = EventLoopLagMonitor(interval=0.01, blocking_threshold=0.05)
+
+    async def request():
+        request_uuid_ctx.set("2f1c4c54-5c4f-4a43-9a39-7d3f8d2a0b11")
+        _blocking_handler()
+
+    with caplog.at_level(logging.WARNING, logger="src.core.loop_lag"):
+        monitor.start()
+        await asyncio.sleep(0.03)
+        await asyncio.create_task(request())
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+
+    records = [record for record in caplog.records if record.name == "src.core.loop_lag"]
+    assert len(records) == 1
+    assert records[0].uuid == "2f1c4c54-5c4f-4a43-9a39-7d3f8d2a0b11"
+    assert "_blocking_handler" in records[0].getMessage()
+    assert monitor.lag >= 0
+    assert registry.get_sample_value("event_loop_blocked_total") == blocked_total + 1
+    assert registry.get_sample_value("event_loop_lag_seconds_count") > lag_count
+    # Блокировка на 0.2 с попала в корзину выше 0.1
+    assert registry.get_sample_value("event_loop_lag_seconds_bucket", {"le": "0.1"}) < registry.get_sample_value(
+        "event_loop_lag_seconds_count"
+    )
+
+
+@pytest.mark.anyio
+async def test_zero_interval_disables_the_monitor():
+    monitor = EventLoopLagMonitor(interval=0, blocking_threshold=0.05)
+    monitor.start()
+    assert monitor._task is None
+    assert monitor._watchdog is None
+    await monitor.stop()
+
+    with pytest.raises(ValueError):
+        EventLoopLagMonitor(interval=-1)
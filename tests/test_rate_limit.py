@@ -0,0 +1,135 @@
+import asyncio
+from types import SimpleNamespace
+from uuid import uuid4
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.core.config import settings
+from src.core.middlewares import LoadSheddingMiddleware, RateLimitMiddleware
+from src.core.rate_limit import RateLimitPolicy, TokenBucketLimiter, rate_limit
+
+
+@pytest.mark.anyio
+async def test_redis_token_bucket_with_local_precheck():
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    redis = fakeredis.FakeAsyncRedis()
+    first, second = TokenBucketLimiter(redis), TokenBucketLimiter(redis)
+    policy = RateLimitPolicy(rate=1, burst=3)
+
+    # Корзина общая для процессов: 3 токена на двоих
+    results = [await limiter.acquire("client", policy) for limiter in (first, second, first, second)]
+    assert [result.allowed for result in results] == [True, True, True, False]
+    assert 0 < results[-1].retry_after <= 1
+
+    calls = 0
+    original = second._script
+
+    async def counting_script(**kwargs):
+        nonlocal calls
+        calls += 1
+        return await original(**kwargs)
+
+    second._script = counting_script
+    # Локальная корзина уже знает, что токенов нет: Redis не спрашиваем
+    assert not (await second.acquire("client", policy)).allowed
+    assert calls == 0
+    await redis.aclose()
+
+
+def _app(limiter: TokenBucketLimiter | None, **middleware_kwargs) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, default_policy=RateLimitPolicy(rate=0.001, burst=2), **middleware_kwargs)
+    app.state.rate_limiter = limiter
+
+    @app.get("/rate-test/default")
+    async def default():
+        return {}
+
+    @app.get("/rate-test/strict")
+    @rate_limit(0.001, burst=1, key="route")
+    async def strict():
+        return {}
+
+    return app
+
+
+@pytest.mark.anyio
+async def test_rate_limit_middleware_returns_429_with_retry_after():
+    transport = httpx.ASGITransport(app=_app(TokenBucketLimiter(), trust_client_addr=True))
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        valid_key = [
+            (await client.get("/rate-test/default", headers={"X-API-KEY": settings.SECRET_KEY})).status_code
+            for _ in range(3)
+        ]
+        # Непроверенные ключи не дают своих корзин: все они считаются по IP клиента
+        random_keys = [
+            (await client.get("/rate-test/default", headers={"X-API-KEY": str(uuid4())})).status_code for _ in range(3)
+        ]
+        strict = [await client.get("/rate-test/strict", headers={"X-API-KEY": key}) for key in ("c", "d")]
+
+    assert valid_key == [200, 200, 429]
+    assert random_keys == [200, 200, 429]
+    assert [response.status_code for response in strict] == [200, 429]
+    assert int(strict[1].headers["retry-after"]) >= 1
+    assert strict[1].json()["error"]["code"] == "RATE_LIMITED"
+
+    transport = httpx.ASGITransport(app=_app(None))
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        assert {(await client.get("/rate-test/default")).status_code for _ in range(3)} == {200}
+
+
+@pytest.mark.anyio
+async def test_rate_limit_by_ip_needs_a_trusted_client_address():
+    # Без заголовка прокси и доверия к scope["client"] адрес клиента неизвестен: по IP не ограничиваем
+    transport = httpx.ASGITransport(app=_app(TokenBucketLimiter()))
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        assert {(await client.get("/rate-test/default")).status_code for _ in range(3)} == {200}
+
+    transport = httpx.ASGITransport(app=_app(TokenBucketLimiter(), client_ip_header="X-Forwarded-For"))
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        # Адрес, который клиент дописал сам, не влияет: корзина — по последнему адресу от прокси
+        first = [
+            (await client.get("/rate-test/default", headers={"X-Forwarded-For": f"{uuid4()}, 10.0.0.1"})).status_code
+            for _ in range(3)
+        ]
+        second = (await client.get("/rate-test/default", headers={"X-Forwarded-For": "10.0.0.2"})).status_code
+
+    assert first == [200, 200, 429]
+    assert second == 200
+
+
+@pytest.mark.anyio
+async def test_load_shedder_rejects_over_in_flight_and_loop_lag():
+    app = FastAPI()
+    app.add_middleware(LoadSheddingMiddleware, max_in_flight=2, max_loop_lag=0.5, retry_after=2)
+    app.state.loop_lag_monitor = SimpleNamespace(lag=0.0)
+    release = asyncio.Event()
+
+    @app.get("/shed-test/slow")
+    async def slow():
+        await release.wait()
+        return {}
+
+    @app.get("/shed-test/fast")
+    async def fast():
+        return {}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        slow_requests = [asyncio.ensure_future(client.get("/shed-test/slow")) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        shed = await client.get("/shed-test/fast")
+        release.set()
+        assert [response.status_code for response in await asyncio.gather(*slow_requests)] == [200, 200]
+        assert (await client.get("/shed-test/fast")).status_code == 200
+
+        app.state.loop_lag_monitor.lag = 1.0
+        lagging = await client.get("/shed-test/fast")
+
+    assert shed.status_code == 503
+    assert shed.headers["retry-after"] == "2"
+    assert shed.json()["error"]["code"] == "SERVICE_OVERLOADED"
+    assert lagging.status_code == 503
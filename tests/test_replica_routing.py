@@ -0,0 +1,69 @@
+import pytest
+from sqlalchemy import String
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database.repository import BaseRepository
+from src.database.routing import REPLICA_SET_INFO_KEY, ReplicaSet, RoutingSession
+from tests.conftest import ModelBase
+
+
+class City(ModelBase):
+    __tablename__ = "routed_city"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(50))
+
+
+@pytest.fixture
+async def engines(sqlite_engine_factory):
+    primary = await sqlite_engine_factory("primary.db")
+    replica = await sqlite_engine_factory("replica.db")
+    for engine, name in ((primary, "primary"), (replica, "replica")):
+        async with engine.begin() as conn:
+            await conn.execute(City.__table__.insert().values(id=1, name=name))
+    return primary, replica
+
+
+def _session(primary, replica_set):
+    return AsyncSession(
+        bind=primary,
+        expire_on_commit=False,
+        sync_session_class=RoutingSession,
+        info={REPLICA_SET_INFO_KEY: replica_set},
+    )
+
+
+@pytest.mark.anyio
+async def test_reads_go_to_replica_until_first_write(engines):
+    primary, replica = engines
+    replica_set = ReplicaSet([replica])
+
+    async with _session(primary, replica_set) as session:
+        repository = BaseRepository(City, session)
+        assert (await repository.get_one(1)).name == "replica"
+
+        await repository.add_one({"id": 2, "name": "new"})
+        session.expunge_all()
+        assert (await repository.get_one(1)).name == "primary"
+        assert (await repository.get_one(2)).name == "new"
+
+    async with _session(primary, replica_set) as session:
+        assert [city.name for city in await BaseRepository(City, session).find_all()] == ["replica"]
+
+
+@pytest.mark.anyio
+async def test_unhealthy_replica_falls_back_to_primary(engines, sqlite_engine_factory):
+    primary, replica = engines
+    broken = await sqlite_engine_factory("missing/replica.db", create_tables=False)
+    replica_set = ReplicaSet([broken, replica])
+
+    await replica_set.check()
+    assert replica_set.healthy == [replica]
+
+    replica_set.mark_unhealthy(replica)
+    async with _session(primary, replica_set) as session:
+        assert (await BaseRepository(City, session).get_one(1)).name == "primary"
+
+    await replica_set.check()
+    assert replica_set.healthy == [replica]
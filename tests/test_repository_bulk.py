@@ -0,0 +1,49 @@
+import pytest
+from sqlalchemy import String, event, func, select
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database.repository import BaseRepository
+from tests.conftest import ModelBase
+
+
+class Tag(ModelBase):
+    __tablename__ = "bulk_tag"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    name: Mapped[str] = mapped_column(String(50))
+
+
+@pytest.mark.anyio
+async def test_bulk_writes_commit_once_per_chunk(session):
+    repository = BaseRepository(Tag, session)
+    commits = []
+    event.listen(session.sync_session, "after_commit", lambda _: commits.append(1))
+
+    ids = await repository.add_many(
+        [{"id": i, "name": f"tag-{i}"} for i in range(1, 11)], chunk_size=4, return_ids=True
+    )
+    assert ids == list(range(1, 11))
+    assert len(commits) == 3
+
+    await repository.update_many([{"id": 2, "name": "second"}, {"id": 3, "name": "third"}])
+    assert (await repository.get_one(2)).name == "second"
+
+    assert await repository.delete_many(list(range(5, 11)), chunk_size=3) == 6
+    remaining = await session.scalar(select(func.count()).select_from(Tag))
+    assert remaining == 4
+
+
+def _compiled(stmt) -> str:
+    return " ".join(str(stmt.compile(dialect=postgresql.dialect())).split())
+
+
+def test_upsert_emits_postgres_on_conflict():
+    repository = BaseRepository(Tag, session=None)
+
+    update = _compiled(repository._upsert_statement(("id",), ["name"], return_ids=True))
+    assert update.startswith("INSERT INTO bulk_tag (id, name) VALUES")
+    assert update.endswith("ON CONFLICT (id) DO UPDATE SET name = excluded.name RETURNING bulk_tag.id")
+
+    nothing = _compiled(repository._upsert_statement(("name",), [], return_ids=False))
+    assert nothing.endswith("ON CONFLICT (name) DO NOTHING RETURNING bulk_tag.id, bulk_tag.name")
@@ -0,0 +1,98 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import Column, Numeric, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database.pagination import decode_cursor, encode_cursor
+from src.database.repository import BaseRepository
+from tests.conftest import ModelBase
+
+
+class Event(ModelBase):
+    __tablename__ = "paged_event"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    kind: Mapped[str] = mapped_column(String(20))
+    happened_at: Mapped[datetime] = mapped_column()
+
+
+@pytest.fixture
+async def repository(session):
+    repository = BaseRepository(Event, session)
+    start = datetime(2024, 1, 1)
+    await repository.add_many(
+        [
+            {"id": i, "kind": "even" if i % 2 == 0 else "odd", "happened_at": start + timedelta(minutes=i // 2)}
+            for i in range(1, 11)
+        ]
+    )
+    return repository
+
+
+async def _collect_pages(repository, **kwargs):
+    pages = []
+    cursor = None
+    while True:
+        page = await repository.find_page(cursor=cursor, **kwargs)
+        pages.append(page)
+        if not page.has_more:
+            return pages
+        cursor = page.next_cursor
+
+
+@pytest.mark.anyio
+async def test_find_page_walks_keyset_with_ties(repository):
+    pages = await _collect_pages(repository, limit=3, order_by="happened_at", descending=True)
+
+    ids = [event.id for page in pages for event in page.items]
+    assert ids == [10, 9, 8, 7, 6, 5, 4, 3, 2, 1]
+    assert [len(page.items) for page in pages] == [3, 3, 3, 1]
+    assert pages[0].pagination().model_dump() == {"per_page": 3, "next_cursor": pages[0].next_cursor, "has_more": True}
+
+
+@pytest.mark.anyio
+async def test_find_page_projection_and_filters(repository):
+    pages = await _collect_pages(repository, filters={"kind": "even"}, limit=2, columns=["kind"])
+
+    rows = [dict(row) for page in pages for row in page.items]
+    assert rows == [{"kind": "even", "id": i} for i in (2, 4, 6, 8, 10)]
+
+
+@pytest.mark.anyio
+async def test_find_page_rejects_foreign_cursor(repository):
+    page = await repository.find_page(limit=2)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await repository.find_page(limit=2, cursor=page.next_cursor, order_by="happened_at")
+    assert exc_info.value.status_code == 400
+
+    with pytest.raises(HTTPException):
+        await repository.find_page(cursor="not-a-cursor")
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("limit", [0, -1])
+async def test_find_page_rejects_non_positive_limit(repository, limit):
+    with pytest.raises(HTTPException) as exc_info:
+        await repository.find_page(limit=limit)
+    assert exc_info.value.status_code == 422
+
+
+def test_tampered_numeric_cursor_is_invalid():
+    price = Column("price", Numeric(10, 2))
+    cursor = encode_cursor(["not-a-number"], order_by="price", descending=False)
+
+    with pytest.raises(HTTPException) as exc_info:
+        decode_cursor(cursor, order_by="price", descending=False, columns=[price])
+    assert exc_info.value.status_code == 400
+
+
+@pytest.mark.anyio
+async def test_stream_all_yields_rows_in_batches(repository):
+    ids = [event.id async for event in repository.stream_all(order_by="id", batch_size=4)]
+    kinds = [row["kind"] async for row in repository.stream_all({"kind": "odd"}, columns=["kind"], batch_size=2)]
+
+    assert ids == list(range(1, 11))
+    assert kinds == ["odd"] * 5
@@ -0,0 +1,72 @@
+import pytest
+from prometheus_client import REGISTRY
+from sqlalchemy import String, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database.instrumentation import instrument_engine
+from src.database.repository import BaseRepository
+from tests.conftest import ModelBase
+
+
+class Note(ModelBase):
+    __tablename__ = "statement_note"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    title: Mapped[str] = mapped_column(String(50))
+    author: Mapped[str | None] = mapped_column(String(50), nullable=True)
+
+
+def _cache_hits() -> float:
+    return REGISTRY.get_sample_value("db_compiled_cache_total", {"pool": "statements", "result": "hit"}) or 0.0
+
+
+@pytest.fixture
+def sqlite_engine(sqlite_engine):
+    return instrument_engine(sqlite_engine, name="statements")
+
+
+@pytest.mark.anyio
+async def test_statements_are_built_once_per_shape(session):
+    repository = BaseRepository(Note, session)
+    first = await repository.add_one({"title": "first", "author": "ann"})
+    await repository.add_one({"author": None, "title": "second"})
+
+    hits_before = _cache_hits()
+    assert (await repository.get_one(first.id)).title == "first"
+    assert (await repository.get_one(first.id + 1)).title == "second"
+    assert _cache_hits() >= hits_before + 1
+
+    statement = BaseRepository._statements[(Note, "get_one", ())]
+    await BaseRepository(Note, session).get_one(first.id)
+    assert BaseRepository._statements[(Note, "get_one", ())] is statement
+
+    assert [note.title for note in await repository.find_all(filters={"author": "ann"})] == ["first"]
+    assert [note.title for note in await repository.find_all(filters={"author": None})] == ["second"]
+    assert len(await repository.find_all()) == 2
+
+
+@pytest.mark.anyio
+async def test_cached_writes_keep_identity_map_in_sync(session):
+    repository = BaseRepository(Note, session)
+    note = await repository.add_one({"title": "draft"})
+    other = await repository.add_one({"title": "other"})
+
+    updated = await repository.update_one(note.id, {"title": "final"})
+    assert updated is note
+    assert note.title == "final"
+
+    assert await repository.delete_one(other.id) is True
+    assert other not in session
+    assert await repository.delete_one(other.id) is False
+    assert await repository.delete_many([note.id]) == 1
+
+
+@pytest.mark.anyio
+async def test_sql_expression_values_are_not_bound_as_parameters(session):
+    repository = BaseRepository(Note, session)
+    note = await repository.add_one({"title": func.upper("draft"), "author": "ann"})
+    assert note.title == "DRAFT"
+
+    updated = await repository.update_one(note.id, {"title": Note.title + "!"})
+    assert updated.title == "DRAFT!"
+    assert (await repository.update_one(note.id, {"title": "plain"})).title == "plain"
@@ -5,7 +5,7 @@ from uuid import uuid4
 
 import httpx
 import pytest
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 
 from src.core.logging_config import JsonFormatter
 from src.core.middlewares.request_logging import RequestLoggingMiddleware
@@ -136,3 +136,80 @@ async def test_request_logging_optional_server_uuid():
         assert "uuid_server" not in log_event
     finally:
         _restore_logger(logger, prev_handlers, prev_propagate, prev_level)
+
+
+@pytest.mark.anyio
+async def test_request_logging_streaming_keeps_bounded_prefix():
+    stream, logger, prev_handlers, prev_propagate, prev_level = _capture_http_request_logs()
+    try:
+        app = FastAPI()
+        app.add_middleware(
+            RequestLoggingMiddleware,
+            service_name="WEB",
+            stream_request_body=True,
+            log_request_body_max_bytes=8,
+        )
+
+        @app.post("/upload")
+        async def upload(request: Request):
+            body = await request.body()
+            return {"size": len(body)}
+
+        async def chunks():
+            for _ in range(4):
+                yield b"x" * 1024
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            response = await client.post("/upload", content=chunks())
+
+        assert response.status_code == 200
+        assert response.json() == {"size": 4096}
+
+        log_lines = [line for line in stream.getvalue().splitlines() if line.strip()]
+        log_event = next(event for event in map(json.loads, log_lines) if event.get("request_method") == "POST")
+        assert log_event["payload"]["body"] == "xxxxxxxx<truncated length=4096 bytes>"
+    finally:
+        _restore_logger(logger, prev_handlers, prev_propagate, prev_level)
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("stream_request_body", [False, True])
+async def test_request_logging_skips_body_outside_allowlist(stream_request_body):
+    stream, logger, prev_handlers, prev_propagate, prev_level = _capture_http_request_logs()
+    try:
+        app = FastAPI()
+        app.add_middleware(
+            RequestLoggingMiddleware,
+            service_name="WEB",
+            stream_request_body=stream_request_body,
+            log_request_body_content_types=["application/json"],
+            log_request_body_paths=["/api"],
+        )
+
+        @app.post("/api/ping")
+        async def api_ping(request: Request):
+            return {"size": len(await request.body())}
+
+        @app.post("/upload")
+        async def upload(request: Request):
+            return {"size": len(await request.body())}
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            json_headers = {"Content-Type": "application/json; charset=utf-8"}
+            json_response = await client.post("/api/ping", content=b'{"a":1}', headers=json_headers)
+            binary_response = await client.post(
+                "/api/ping", content=b"\x00\x01", headers={"Content-Type": "application/octet-stream"}
+            )
+            other_path_response = await client.post("/upload", content=b'{"a":1}', headers=json_headers)
+
+        assert json_response.json() == {"size": 7}
+        assert binary_response.json() == {"size": 2}
+        assert other_path_response.json() == {"size": 7}
+
+        log_lines = [line for line in stream.getvalue().splitlines() if line.strip()]
+        bodies = [event["payload"].get("body") for event in map(json.loads, log_lines)]
+        assert bodies == ['{"a":1}', None, None]
+    finally:
+        _restore_logger(logger, prev_handlers, prev_propagate, prev_level)
@@ -0,0 +1,127 @@
+import httpx
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.responses import Response
+from prometheus_client import REGISTRY
+
+from src.core.middlewares import ResponseCacheMiddleware
+from src.core.response_cache import ResponseCache, ResponseCachePolicy, cache_response
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def _app(cache: ResponseCache | None) -> tuple[FastAPI, list[str]]:
+    app = FastAPI()
+    app.add_middleware(ResponseCacheMiddleware, max_body_size=64)
+    app.state.response_cache = cache
+    calls: list[str] = []
+
+    @app.get("/cache-test/items/{item_id}")
+    @cache_response(ttl=60, vary=["Accept-Language"], cache_control="private, max-age=60")
+    async def get_item(item_id: int):
+        calls.append("item")
+        return {"item_id": item_id, "calls": len(calls)}
+
+    @app.get("/cache-test/settings", dependencies=[Depends(ResponseCachePolicy(ttl=60, vary_api_key=False))])
+    async def get_settings():
+        calls.append("settings")
+        return {"theme": "dark"}
+
+    @app.get("/cache-test/large")
+    @cache_response(ttl=60)
+    async def get_large():
+        calls.append("large")
+        return Response(b"x" * 100)
+
+    @app.get("/cache-test/plain")
+    async def get_plain():
+        calls.append("plain")
+        return {}
+
+    return app, calls
+
+
+@pytest.mark.anyio
+async def test_cached_route_skips_handler_and_answers_not_modified():
+    app, calls = _app(ResponseCache())
+    route = "/cache-test/items/{item_id}"
+    before = {result: _sample("http_response_cache_total", route=route, result=result) for result in ("hit", "miss")}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        first = await client.get("/cache-test/items/1", headers={"X-API-KEY": "a"})
+        second = await client.get("/cache-test/items/1", headers={"X-API-KEY": "a"})
+        not_modified = await client.get(
+            "/cache-test/items/1", headers={"X-API-KEY": "a", "If-None-Match": first.headers["etag"]}
+        )
+        other_key = await client.get("/cache-test/items/1", headers={"X-API-KEY": "b"})
+        other_language = await client.get("/cache-test/items/1", headers={"X-API-KEY": "a", "Accept-Language": "ru"})
+        bypass = await client.get("/cache-test/items/1", headers={"X-API-KEY": "a", "Cache-Control": "no-cache"})
+        cookies = [
+            await client.get("/cache-test/items/1", headers={"X-API-KEY": "a", "Cookie": f"session={user}"})
+            for user in ("u1", "u2")
+        ]
+
+    assert first.json() == second.json() == {"item_id": 1, "calls": 1}
+    assert second.headers["etag"] == first.headers["etag"]
+    assert first.headers["cache-control"] == "private, max-age=60"
+    assert first.headers["vary"] == "Accept-Language, X-API-KEY"
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert not_modified.headers["etag"] == first.headers["etag"]
+    assert other_key.json()["calls"] == 2
+    assert other_language.json()["calls"] == 3
+    assert bypass.json()["calls"] == 4
+    assert [response.json()["calls"] for response in cookies] == [5, 6]
+    assert _sample("http_response_cache_total", route=route, result="hit") == before["hit"] + 1
+    assert _sample("http_response_cache_total", route=route, result="miss") == before["miss"] + 3
+
+
+@pytest.mark.anyio
+async def test_dependency_policy_and_uncached_routes():
+    app, calls = _app(ResponseCache())
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        settings_responses = [await client.get("/cache-test/settings", headers={"X-API-KEY": key}) for key in "ab"]
+        # Первый ответ на промахе тоже отвечает 304, если ETag клиента совпал
+        revalidated = await client.get(
+            "/cache-test/settings?fresh=1", headers={"If-None-Match": settings_responses[0].headers["etag"]}
+        )
+        large = [await client.get("/cache-test/large") for _ in range(2)]
+        for _ in range(2):
+            await client.get("/cache-test/plain")
+
+    assert [response.json() for response in settings_responses] == [{"theme": "dark"}] * 2
+    assert revalidated.status_code == 304
+    assert [response.content for response in large] == [b"x" * 100] * 2
+    assert "etag" not in large[0].headers
+    assert calls == ["settings", "settings", "large", "large", "plain", "plain"]
+
+    app, calls = _app(None)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        for _ in range(2):
+            await client.get("/cache-test/settings")
+    assert calls == ["settings", "settings"]
+
+
+@pytest.mark.anyio
+async def test_responses_are_shared_through_redis():
+    fakeredis = pytest.importorskip("fakeredis")
+    redis = fakeredis.FakeAsyncRedis()
+    first_app, first_calls = _app(ResponseCache(redis))
+    second_app, second_calls = _app(ResponseCache(redis))
+
+    responses = []
+    for app in (first_app, second_app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+            responses.append(await client.get("/cache-test/items/7", headers={"X-API-KEY": "a"}))
+    await redis.aclose()
+
+    assert first_calls == ["item"]
+    assert second_calls == []
+    assert responses[1].json() == responses[0].json() == {"item_id": 7, "calls": 1}
+    assert responses[1].headers["etag"] == responses[0].headers["etag"]
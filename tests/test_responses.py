@@ -0,0 +1,94 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from uuid import uuid4
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+from src.core import responses
+from src.core.responses import FastJSONResponse, error_response, render_json, success_response
+from src.core.schema import Pagination
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+    created_at: datetime
+    price: Decimal
+
+
+def _items(count: int) -> list[Item]:
+    created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        Item(id=index, name=f"item {index}", created_at=created_at, price=Decimal("9.90")) for index in range(count)
+    ]
+
+
+def test_success_response_matches_model_dump_envelope():
+    items = _items(3)
+    pagination = Pagination(total=3, per_page=10, current_page=1, last_page=1)
+
+    response = success_response(items, pagination=pagination)
+
+    assert json.loads(response.body) == {
+        "status": "success",
+        "data": jsonable_encoder([item.model_dump() for item in items]),
+        "message": "Request processed successfully",
+        "pagination": pagination.model_dump(),
+    }
+    assert response.headers["content-length"] == str(len(response.body))
+    assert json.loads(success_response().body)["data"] == []
+    assert json.loads(success_response({"key": items[0]}, message="ок").body) == {
+        "status": "success",
+        "data": {"key": jsonable_encoder(items[0].model_dump())},
+        "message": "ок",
+    }
+
+
+@pytest.mark.parametrize("backend", ["orjson", "json"])
+def test_backends_render_decimals_as_numbers_and_nan_as_null(backend, monkeypatch):
+    if backend == "json":
+        monkeypatch.setattr(responses, "orjson", None)
+    item = _items(1)[0]
+
+    assert json.loads(success_response([item]).body)["data"][0]["price"] == 9.9
+    assert json.loads(render_json({"item": item, "whole": Decimal("10")})) == {
+        "item": {"id": 0, "name": "item 0", "created_at": "2024-01-01T00:00:00+00:00", "price": 9.9},
+        "whole": 10,
+    }
+    assert render_json({"nan": float("nan"), "values": [float("inf"), 1.5]}) == b'{"nan":null,"values":[null,1.5]}'
+
+
+def test_error_response_shape():
+    response = error_response("NOT_FOUND", "Missing", status_code=404)
+    assert response.status_code == 404
+    assert json.loads(response.body) == {
+        "status": "error",
+        "error": {"code": "NOT_FOUND", "message": "Missing", "details": {}},
+    }
+
+
+@pytest.mark.anyio
+async def test_fast_json_response_as_default_response_class():
+    app = FastAPI(default_response_class=FastJSONResponse)
+    item_id = uuid4()
+
+    @app.get("/responses-test")
+    async def endpoint():
+        return {"id": item_id, "items": _items(2), 1: "non-str key"}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.get("/responses-test")
+
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == {
+        "id": str(item_id),
+        # Возвращаемое значение маршрута FastAPI кодирует сам (jsonable_encoder в JSON-режиме pydantic)
+        "items": [item.model_dump(mode="json") for item in _items(2)],
+        "1": "non-str key",
+    }
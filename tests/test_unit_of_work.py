@@ -0,0 +1,104 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import String, event, func, select
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database import DBSession, get_db
+from src.database.cache import RepositoryCache
+from src.database.repository import BaseRepository, CachedRepository
+from src.database.unit_of_work import UnitOfWork
+from tests.conftest import ModelBase
+
+
+class Note(ModelBase):
+    __tablename__ = "uow_note"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    text: Mapped[str] = mapped_column(String(50))
+
+
+async def _count_notes(session_factory) -> int:
+    async with session_factory() as session:
+        return await session.scalar(select(func.count()).select_from(Note))
+
+
+@pytest.mark.anyio
+async def test_unit_of_work_commits_once(session_factory):
+    async with session_factory() as session:
+        commits = []
+        event.listen(session.sync_session, "after_commit", lambda _: commits.append(1))
+        repository = BaseRepository(Note, session)
+
+        async with UnitOfWork(session):
+            await repository.add_one({"id": 1, "text": "first"})
+            await repository.update_one(1, {"text": "updated"})
+            await repository.add_many([{"id": 2, "text": "second"}, {"id": 3, "text": "third"}], chunk_size=1)
+            async with UnitOfWork(session):
+                await repository.delete_one(3)
+            assert commits == []
+
+        assert commits == [1]
+    assert await _count_notes(session_factory) == 2
+
+
+@pytest.mark.anyio
+async def test_unit_of_work_rolls_back_and_supports_savepoints(session_factory):
+    async with session_factory() as session:
+        repository = BaseRepository(Note, session)
+        async with UnitOfWork(session) as unit_of_work:
+            await repository.add_one({"id": 1, "text": "kept"})
+            with pytest.raises(RuntimeError):
+                async with unit_of_work.savepoint():
+                    await repository.add_one({"id": 2, "text": "discarded"})
+                    raise RuntimeError("nested failure")
+    assert await _count_notes(session_factory) == 1
+
+    async with session_factory() as session:
+        repository = BaseRepository(Note, session)
+        with pytest.raises(RuntimeError):
+            async with UnitOfWork(session):
+                await repository.add_one({"id": 3, "text": "discarded"})
+                raise RuntimeError("request failed")
+    assert await _count_notes(session_factory) == 1
+
+
+@pytest.mark.anyio
+async def test_unit_of_work_bypasses_cache_for_uncommitted_writes(session_factory):
+    cache = RepositoryCache(None)
+    async with session_factory() as session:
+        repository = CachedRepository(Note, session, cache)
+        with pytest.raises(RuntimeError):
+            async with UnitOfWork(session):
+                await repository.add_one({"id": 1, "text": "uncommitted"})
+                assert (await repository.get_one(1)).text == "uncommitted"
+                raise RuntimeError("request failed")
+
+    async with session_factory() as session:
+        assert await CachedRepository(Note, session, cache).get_one(1) is None
+
+
+@pytest.mark.anyio
+async def test_failed_commit_is_reported_to_the_client(session_factory):
+    app = FastAPI()
+
+    @app.post("/notes", status_code=201)
+    async def create_note(session: DBSession):
+        await BaseRepository(Note, session).add_one({"id": 1, "text": "lost"})
+        return {}
+
+    def fail_commit(session):
+        raise RuntimeError("commit failed")
+
+    async def failing_db():
+        async with session_factory() as session, UnitOfWork(session):
+            event.listen(session.sync_session, "before_commit", fail_commit)
+            yield session
+
+    app.dependency_overrides[get_db] = failing_db
+    transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+    async with httpx.AsyncClient(transport=transport, base_url="http://testserver") as client:
+        response = await client.post("/notes")
+
+    assert response.status_code == 500
+    assert await _count_notes(session_factory) == 0
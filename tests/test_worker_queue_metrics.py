@@ -0,0 +1,52 @@
+import asyncio
+import time
+
+import pytest
+from prometheus_client import REGISTRY
+
+from src.core.metrics.worker_metrics import instrument_job, sample_queue_lengths
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+def _sample(name: str, **labels: str) -> float:
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+@pytest.mark.anyio
+async def test_queue_lengths_split_ready_and_deferred():
+    redis = fakeredis.FakeAsyncRedis()
+    now_ms = int(time.time() * 1000)
+    await redis.zadd("metrics-queue", {"a": now_ms - 1000, "b": now_ms - 10, "c": now_ms + 60_000})
+
+    await sample_queue_lengths(redis, ["metrics-queue"])
+
+    assert _sample("job_queue_length", queue="metrics-queue", state="ready") == 2
+    assert _sample("job_queue_length", queue="metrics-queue", state="deferred") == 1
+    await redis.aclose()
+
+
+@pytest.mark.anyio
+async def test_job_start_wait_retry_in_flight_and_timeout():
+    in_flight = []
+
+    async def sync_report(ctx):
+        in_flight.append(_sample("jobs_in_flight", job_name="sync_report"))
+        await asyncio.sleep(ctx.get("sleep", 0))
+
+    job = instrument_job(sync_report, timeout=0.05)
+    waits_before = _sample("job_queue_wait_seconds_count", job_name="sync_report")
+    wait_sum_before = _sample("job_queue_wait_seconds_sum", job_name="sync_report")
+
+    await job({"job_try": 3, "score": int(time.time() * 1000) - 2000})
+    assert in_flight == [1]
+    assert _sample("jobs_in_flight", job_name="sync_report") == 0
+    assert _sample("job_queue_wait_seconds_count", job_name="sync_report") == waits_before + 1
+    assert _sample("job_queue_wait_seconds_sum", job_name="sync_report") - wait_sum_before >= 2
+    assert _sample("job_retries_total", job_name="sync_report", job_try="3") == 1
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(job({"job_try": 1, "sleep": 1}), timeout=0.05)
+    assert _sample("job_timeouts_total", job_name="sync_report") == 1
+    assert _sample("jobs_total", job_name="sync_report", status="timeout") == 1
+    assert _sample("jobs_in_flight", job_name="sync_report") == 0